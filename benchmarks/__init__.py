@@ -0,0 +1,6 @@
+"""
+Benchmarks reproducing the measurements quoted in the commit history.
+Not part of the test suite, run one from the repository root with e.g.:
+
+    python -m benchmarks.bench_fetch_pool
+"""
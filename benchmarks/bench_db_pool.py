@@ -0,0 +1,158 @@
+"""
+SQLite contention: reader threads running the dashboard's GROUP BY while
+writer threads update automation progress, with a new connection per
+statement on the rollback journal (the old db.py) against the pooled
+WAL connections of db.get_db().
+
+    python -m benchmarks.bench_db_pool --panels 600 --readers 8 --writers 2 --seconds 3
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import Flask
+
+from omegaApp import db as omega_db
+
+READ_QUERY = "SELECT room, COUNT(*) FROM panels GROUP BY room"
+WRITE_QUERY = "UPDATE automations SET progress = ? WHERE instance_id = 'benchmark'"
+SCHEMA = os.path.join(os.path.dirname(omega_db.__file__), "schema.sql")
+
+
+def create_database(path: str, panels: int):
+    db = sqlite3.connect(path)
+    with open(SCHEMA) as f:
+        db.executescript(f.read())
+    rng = random.Random(1)
+    db.executemany(
+        "INSERT INTO panels (dcim_id, room, name, rack, u, interface, destination, status)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                f"D{index}",
+                f"ROOM{rng.randint(1, 12)}",
+                f"Panel {index}",
+                f"A{rng.randint(1, 40):02d}-C{rng.randint(1, 20):02d}",
+                str(rng.randint(1, 42)),
+                rng.choice(["MM-LC", "SM-LC", "RJ"]),
+                f"A{rng.randint(1, 40):02d}-C{rng.randint(1, 20):02d}",
+                "True",
+            )
+            for index in range(panels)
+        ],
+    )
+    db.execute("INSERT INTO automations (instance_id) VALUES ('benchmark')")
+    db.commit()
+    db.close()
+
+
+def run(seconds: float, readers: int, writers: int, read, write):
+    """Run the reader and writer threads, :return: (reads, writes, errors) per second"""
+    stop = time.monotonic() + seconds
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            counts[name] += 1
+
+    def reader():
+        while time.monotonic() < stop:
+            try:
+                read()
+                count("reads")
+            except sqlite3.Error:
+                count("errors")
+
+    def writer():
+        progress = 0
+        while time.monotonic() < stop:
+            try:
+                write(progress)
+                count("writes")
+            except sqlite3.Error:
+                count("errors")
+            progress += 1
+            time.sleep(0.002)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts["reads"] / seconds, counts["writes"] / seconds, counts["errors"]
+
+
+def unpooled(path: str):
+    """A connection opened and closed around every statement, default journal"""
+    def connect():
+        db = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def read():
+        db = connect()
+        try:
+            db.execute(READ_QUERY).fetchall()
+        finally:
+            db.close()
+
+    def write(progress):
+        db = connect()
+        try:
+            db.execute(WRITE_QUERY, (progress,))
+            db.commit()
+        finally:
+            db.close()
+
+    return read, write
+
+
+def pooled(path: str):
+    """The application's pooled connections, every thread inside an app context"""
+    app = Flask(__name__)
+    app.config["DATABASE"] = path
+    contexts = threading.local()
+
+    def app_context():
+        if not hasattr(contexts, "context"):
+            contexts.context = app.app_context()
+            contexts.context.push()
+
+    def read():
+        app_context()
+        omega_db.execute_query(READ_QUERY)
+
+    def write(progress):
+        app_context()
+        db = omega_db.get_db()
+        db.execute(WRITE_QUERY, (progress,))
+        db.commit()
+
+    return read, write
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--panels", type=int, default=600)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.panels} panels, {args.readers} readers, {args.writers} writers, {args.seconds:g}s per run")
+        for name, mode in (("connection per statement", unpooled), ("pooled WAL", pooled)):
+            path = os.path.join(directory, f"{mode.__name__}.sqlite")
+            create_database(path, args.panels)
+            reads, writes, errors = run(args.seconds, args.readers, args.writers, *mode(path))
+            print(f"  {name:<24}: {reads:7.0f} reads/s {writes:6.0f} writes/s {errors} errors")
+
+
+if __name__ == "__main__":
+    main()
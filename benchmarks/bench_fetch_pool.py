@@ -0,0 +1,62 @@
+"""
+Pulling panel details from DCIM: one blocking request per panel (the old
+pullallpanels loop) against DCIMFetchPool, on a local stub DCIM with a
+fixed latency per request.
+
+    python -m benchmarks.bench_fetch_pool --panels 300 --latency 0.02 --in-flight 16
+"""
+import argparse
+import time
+
+import requests
+
+from omegaApp.modules.dcim_fetch_pool import DCIMFetchPool
+from .stub_dcim import StubDCIM
+
+HEADERS = {"Authorization": "Bearer benchmark"}
+
+
+def serial_pull(base_url: str, asset_ids):
+    for asset_id in asset_ids:
+        response = requests.get(
+            f"{base_url}assets/{asset_id}?include=custom_properties", headers=HEADERS, verify=False
+        )
+        response.raise_for_status()
+        response.json()
+
+
+def pooled_pull(base_url: str, asset_ids, in_flight: int) -> int:
+    failed = 0
+    with DCIMFetchPool(base_url, HEADERS, max_in_flight=in_flight) as fetch_pool:
+        fetch = lambda asset_id: fetch_pool.get_json(f"assets/{asset_id}?include=custom_properties")
+        for _, _, error in fetch_pool.map(fetch, asset_ids):
+            failed += error is not None
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--panels", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the stub takes per request")
+    parser.add_argument("--in-flight", type=int, default=16)
+    args = parser.parse_args()
+
+    with StubDCIM(assets=args.panels, latency=args.latency) as dcim:
+        asset_ids = [asset["id"] for asset in dcim.assets]
+
+        start = time.perf_counter()
+        serial_pull(dcim.base_url, asset_ids)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        failed = pooled_pull(dcim.base_url, asset_ids, args.in_flight)
+        pooled = time.perf_counter() - start
+
+    print(f"{args.panels} panels, {args.latency * 1000:.0f} ms per request")
+    print(f"  one request per panel : {serial:.2f}s")
+    print(f"  DCIMFetchPool ({args.in_flight:>2} in flight): {pooled:.2f}s, {failed} failed")
+    print(f"  speedup               : {serial / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Free text panel search on a generated panels table: the old
+room = ? OR rack = ? OR name LIKE '%text%' filter against the panels_fts
+index used by get_panels (first page and total).
+
+    python -m benchmarks.bench_panels_search --panels 100000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from omegaApp.migrations import MIGRATIONS
+from omegaApp.modules.panel_query import panel_filter, search_page_query
+
+from .bench_db_pool import SCHEMA
+
+TERMS = ("A07-C1", "core123", "ROOM3")
+
+LIKE_PAGE = """
+    SELECT * FROM panels
+    WHERE deleted_at IS NULL AND (room = ? OR rack = ? OR name LIKE ?)
+    ORDER BY room, rack, u
+"""
+LIKE_TOTAL = """
+    SELECT COUNT(*) FROM panels
+    WHERE deleted_at IS NULL AND (room = ? OR rack = ? OR name LIKE ?)
+"""
+
+
+def create_database(path: str, panels: int):
+    db = sqlite3.connect(path)
+    with open(SCHEMA) as f:
+        db.executescript(f.read())
+    rng = random.Random(1)
+    rows = []
+    for index in range(panels):
+        rack = f"A{rng.randint(1, 40):02d}-C{rng.randint(1, 20):02d}"
+        destination = f"A{rng.randint(1, 40):02d}-C{rng.randint(1, 20):02d}"
+        rows.append((
+            f"D{index}",
+            f"Panel {rack} to {destination} {rng.choice(['north', 'south', 'core', 'edge'])}{index}",
+            f"ROOM{rng.randint(1, 12)}",
+            rack,
+            str(rng.randint(1, 42)),
+            rng.choice(["MM-LC", "SM-LC", "RJ45"]),
+            destination,
+        ))
+    db.executemany(
+        "INSERT INTO panels (dcim_id, name, room, rack, u, interface, destination) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    # The FTS index is built from the existing rows on creation
+    for migration in MIGRATIONS:
+        migration.migrate(db)
+    db.commit()
+    return db
+
+
+def timed(db, queries, repeat: int):
+    """Mean milliseconds of running the queries, and the total they report"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [db.execute(query, params).fetchall() for query, params in queries]
+    return (time.perf_counter() - start) / repeat * 1000, results[-1][0][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--panels", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = create_database(os.path.join(directory, "panels.sqlite"), args.panels)
+        print(f"{args.panels} panels, page of {args.page_size}, mean of {args.repeat} runs")
+        for term in TERMS:
+            like_params = (term, term, f"%{term}%")
+            like, like_total = timed(db, [
+                (f"{LIKE_PAGE} LIMIT {args.page_size}", like_params),
+                (LIKE_TOTAL, like_params),
+            ], args.repeat)
+
+            where, params, match = panel_filter({"filterTextInput": term})
+            fts, fts_total = timed(db, [
+                search_page_query(match, args.page_size),
+                (f"SELECT COUNT(*) FROM panels {where}", params),
+            ], args.repeat)
+
+            print(f"  {term!r:<10} LIKE {like:6.1f} ms ({like_total} rows)   FTS {fts:6.1f} ms ({fts_total} rows)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
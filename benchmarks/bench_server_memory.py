@@ -0,0 +1,108 @@
+"""
+Memory of the loaded dashboard servers: the whole inventory file json-loaded
+and every server kept as its original dict merged with the normalized fields
+(the old load_server_data) against the streamed parse into ServerRecords,
+which keep the normalized fields only, measured with tracemalloc on a
+generated inventory file. Also times reading the original data of the last
+server back from the file, as get_server does.
+
+    python -m benchmarks.bench_server_memory --servers 50000
+"""
+import argparse
+import gc
+import json
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from omegaApp.modules.server_dashboard import ServerDataManager, parse_server_file
+
+VENDORS = ["HPE", "Dell", "Lenovo"]
+
+
+def make_server(index: int, rng: random.Random) -> dict:
+    return {
+        "Serial": f"SN{index:08d}",
+        "Vendor": rng.choice(VENDORS),
+        "Model": rng.choice(["DL380", "R740", "SR650"]),
+        "HostName": f"host-{index}",
+        "Network": f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+        "TotalSystemMemoryGiB": rng.choice([128, 256, 512]),
+        "Processors": {"CPUCount": 2, "CorePerCPU": rng.choice([16, 24, 32]), "Model": "Xeon Gold 6248"},
+        "Storage": {
+            "Disks": {"RAID.1": [
+                {"Model": "SSD-960", "Id": f"Disk.{n}", "CapacityBytes": 960197124096} for n in range(4)
+            ]},
+            "PCIe": {"Slot1": [{"Name": "NVMe", "class": "storage", "Vendor": "Intel"}]},
+        },
+        "Location": {
+            "DataCenter": "dc1", "Room": f"r{index % 20}", "Row": "a",
+            "Rack": f"a{index % 500:03d}", "U": str(index % 42),
+        },
+        "Power": {"Max": 412.5, "Avg": 301.25, "Min": 200.1},
+        "Temperature": {"Max": 31.0, "Avg": 25.5, "Min": 20.0},
+        "InternalDevices": [{"Name": f"NIC{n}", "class": "network", "Vendor": "Broadcom"} for n in range(3)],
+        "FirmwareVersion": "2.19.1",
+    }
+
+
+def write_inventory(path: Path, count: int):
+    rng = random.Random(1)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({f"k{index}": make_server(index, rng) for index in range(count)}, f)
+
+
+def legacy_load(path: Path) -> dict:
+    """The whole file json-loaded, every server merged with its normalized fields"""
+    with open(path, "rb") as f:
+        file_data = json.loads(f.read())
+    servers = {}
+    for ip, server_data in file_data.items():
+        if 'mgmt_ip' not in server_data and 'Network' not in server_data:
+            server_data['mgmt_ip'] = ip
+        normalized_data = ServerDataManager._normalize_server_data(server_data)
+        servers[normalized_data.get('mgmt_ip', ip)] = {**server_data, **normalized_data}
+    return servers
+
+
+def measure(load, path: Path):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    servers = load(path)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(servers), elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--servers", type=int, default=50000)
+    args = parser.parse_args()
+    # Loading logs every server at debug level
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "inventory.json"
+        write_inventory(path, args.servers)
+        size = path.stat().st_size
+        print(f"{args.servers} servers, {size / 2 ** 20:.0f} MiB inventory file")
+        for name, load in (("json.load + merged dicts", legacy_load), ("streamed ServerRecords", parse_server_file)):
+            count, elapsed, retained, peak = measure(load, path)
+            print(
+                f"  {name:<25}: {count} servers in {elapsed:.1f}s, "
+                f"retained {retained / 2 ** 20:.0f} MiB, peak {peak / 2 ** 20:.0f} MiB"
+            )
+
+        last = list(parse_server_file(path).values())[-1]
+        start = time.perf_counter()
+        assert last.raw_data() is not None
+        print(f"  raw_data of the last server read back in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_assets(count: int):
+    """Patch panel search results and their details, as the DCIM API returns them"""
+    assets, details = [], {}
+    for index in range(count):
+        rack = f"A{index % 6 + 1:02d}-C{index % 9 + 1:02d}"
+        asset_id = f"P{index}"
+        assets.append({
+            "id": asset_id,
+            "name": f"Panel {index} to {rack}",
+            "type": "patch-panel",
+            "roomName": f"ROOM{index % 3}",
+            "location": f"site/ROOM{index % 3}/row/{rack}/{index % 42 + 1}/x",
+        })
+        details[asset_id] = {
+            "id": asset_id,
+            "rackMounted": {"unitHeight": 1},
+            "customProperties": {
+                "interface": {"value": "MM-LC"},
+                "status": {"value": "True"},
+                "how_many_ports_remain": {"value": "12"},
+                "classification": {"value": "red"},
+            },
+        }
+    return assets, details
+
+
+class StubDCIM:
+    """
+    Local DCIM API answering asset search and details with a fixed latency,
+    served from a background thread:
+
+        with StubDCIM(assets=300, latency=0.02) as dcim:
+            requests.get(f"{dcim.base_url}assets/P1")
+    """
+
+    def __init__(self, assets: int = 300, latency: float = 0.02):
+        self.latency = latency
+        self.requests = 0
+        self.assets, self.details = make_assets(assets)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}/api/"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency)
+
+                url = urlparse(self.path)
+                if url.path == "/api/assets/search":
+                    query = parse_qs(url.query)
+                    limit = int(query.get("returnItemsLimit", ["100"])[0])
+                    offset = int(query.get("returnItemsOffset", ["0"])[0])
+                    return self._send(200, stub.assets[offset:offset + limit])
+                asset = stub.details.get(url.path.rsplit("/", 1)[-1])
+                if url.path.startswith("/api/assets/") and asset is not None:
+                    return self._send(200, asset)
+                self._send(404, {"error": "Not found"})
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -21,16 +21,30 @@ def create_app(test_config=None):
     app.config.from_mapping(
         SECRET_KEY="dev",
         DATABASE=os.path.join(app.instance_path, "omegaapp.sqlite"),
+        DATABASE_POOL_SIZE=int(os.getenv("DATABASE_POOL_SIZE", "8")),
+        PANELS_PAGE_SIZE=int(os.getenv("PANELS_PAGE_SIZE", "500")),
+        ROUTE_CACHE_SIZE=int(os.getenv("ROUTE_CACHE_SIZE", "256")),
+        ROUTE_CACHE_TTL=int(os.getenv("ROUTE_CACHE_TTL", "300")),
+        REACHABILITY_DIR=os.getenv("REACHABILITY_DIR", os.path.join(app.instance_path, "reachability")),
         IP_CENTRAL=os.environ.get("CENTRAL"),
         USER_NAME_CENTRAL=os.environ.get("CENTRAL_USER_NAME"),
         PASSWORD_CENTRAL=os.getenv("CENTRAL_PASSWORD"),
         DCIM_BASE_URL=os.getenv("DCIM_BASE_URL"),
         DCIM_PASSWORD=os.getenv("DCIM_PASSWORD"),
         DCIM_USER=os.getenv("DCIM_USER"),
+        DCIM_MAX_IN_FLIGHT=int(os.getenv("DCIM_MAX_IN_FLIGHT", "16")),
+        DCIM_TIMEOUT=(
+            float(os.getenv("DCIM_CONNECT_TIMEOUT", "5")),
+            float(os.getenv("DCIM_READ_TIMEOUT", "30")),
+        ),
+        DCIM_ASSET_TTL=int(os.getenv("DCIM_ASSET_TTL", "900")),
+        DCIM_MATCH_TTL=int(os.getenv("DCIM_MATCH_TTL", "900")),
         MODEL_NAME=os.getenv("MODEL_NAME"),
         MODEL_URL=os.getenv("MODEL_URL"),
         ROOM_NAMES=os.getenv("ROOM_NAMES", ""),
         SERVERS_DATA_DIR=os.getenv("SERVERS_DATA_DIR", os.path.join(os.path.dirname(__file__), 'data', 'servers')),
+        SERVERS_LOAD_WORKERS=int(os.getenv("SERVERS_LOAD_WORKERS", str(min(8, os.cpu_count() or 1)))),
+        SERVERS_PRELOAD=os.getenv("SERVERS_PRELOAD", "true").lower() == "true",
         API_KEY=os.getenv('MODEL_API_KEY', 'YOUR_API_KEY_HERE'),
     )
 
@@ -57,6 +71,12 @@ def create_app(test_config=None):
 
     db.init_app(app)
 
+    with app.app_context():
+        try:
+            db.migrate_db()
+        except db.DatabaseError as e:
+            logger.error(f"Failed to migrate database: {e}")
+
     # Initialize translations after DB is ready
     def initialize_translations():
         with app.app_context():
@@ -95,6 +115,14 @@ def create_app(test_config=None):
     from .routes.server_dashboard import server_dashboard
     app.register_blueprint(server_dashboard)
 
+    # Start loading the dashboard's server data, so the first request doesn't wait for it
+    if app.config["SERVERS_PRELOAD"]:
+        from .routes.server_dashboard import create_server_manager
+        try:
+            create_server_manager(app)
+        except Exception as e:
+            logger.error(f"Error starting the server data load: {str(e)}")
+
     from .routes.dcim_api import dcim_api
     app.register_blueprint(dcim_api)
 
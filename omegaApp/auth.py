@@ -1,12 +1,50 @@
+import base64
+import json
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
 import requests
 from flask import current_app
 
+from .logger_manager import LoggerManager
 
-def authentication_ita():
-    user = current_app.config["DCIM_USER"]
-    password = current_app.config["DCIM_PASSWORD"]
-    dcim_base_url = current_app.config["DCIM_BASE_URL"]
+logger = LoggerManager().get_logger()
+
+# A token is refreshed in the background when it gets this close to expiry
+REFRESH_BEFORE_SECONDS = 60
+
+# Lifetime assumed for tokens that don't say when they expire
+DEFAULT_TOKEN_TTL_SECONDS = 1800
+
+# A failed login is reused for this long, so a DCIM outage isn't hammered
+FAILED_LOGIN_TTL_SECONDS = 5
+
+
+def _token_ttl(body: Dict, token: str) -> float:
+    """Seconds until the token expires: from the response, the JWT exp claim or the default"""
+    for field in ("expiresIn", "expires_in"):
+        try:
+            return float(body[field])
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    parts = token.split(".")
+    if len(parts) == 3:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+            return float(payload["exp"]) - time.time()
+        except (ValueError, KeyError, TypeError):
+            pass
 
+    return DEFAULT_TOKEN_TTL_SECONDS
+
+
+def _login(dcim_base_url: str, user: str, password: str) -> Tuple[bool, Dict[str, str], float]:
+    """
+    Post the credentials to DCIM
+    :return: Tuple of (success, headers, seconds the result stays valid)
+    """
     data = f'{{"password": "{password}", "userName": "{user}"}}'
 
     auth_url = f"{dcim_base_url}authentication"
@@ -18,6 +56,125 @@ def authentication_ita():
     response = requests.post(auth_url, data=data, headers=headers, verify=False)
 
     auth_success = True if response.status_code == 200 else False
-    if auth_success:
-        headers["Authorization"] += response.json()["token"]
-    return auth_success, headers
+    if not auth_success:
+        return False, headers, FAILED_LOGIN_TTL_SECONDS
+
+    body = response.json()
+    headers["Authorization"] += body["token"]
+    return True, headers, _token_ttl(body, body["token"])
+
+
+class _CachedToken:
+    def __init__(self, key: Tuple, success: bool, headers: Dict[str, str], ttl: float):
+        self.key = key
+        self.success = success
+        self.headers = headers
+        self.expires_at = time.monotonic() + ttl
+        # Short-lived tokens are refreshed half way through their life
+        self.refresh_at = self.expires_at - min(REFRESH_BEFORE_SECONDS, ttl / 2)
+
+
+class DCIMTokenCache:
+    """
+    Process-wide cache of the DCIM login.
+    Only one login is in flight at a time, concurrent callers wait for its
+    result. A valid token close to expiry is still served while a background
+    login replaces it.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DCIMTokenCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._cond = threading.Condition()
+        self._token: Optional[_CachedToken] = None
+        self._refreshing = False
+        self._generation = 0  # Number of finished logins
+        self._error: Optional[Exception] = None  # Error of the last login, if it raised
+        self._initialized = True
+
+    def get(self, dcim_base_url: str, user: str, password: str) -> Tuple[bool, Dict[str, str]]:
+        """Cached (success, headers) of the DCIM login, logging in when needed"""
+        key = (dcim_base_url, user, password)
+        with self._cond:
+            generation = self._generation
+            while True:
+                token = self._token if self._token and self._token.key == key else None
+                now = time.monotonic()
+                if token and now < token.expires_at:
+                    if token.success and now >= token.refresh_at and not self._refreshing:
+                        self._refreshing = True
+                        threading.Thread(
+                            target=self._background_refresh, args=(key,), daemon=True
+                        ).start()
+                    return token.success, dict(token.headers)
+
+                # The login we waited for raised, its error is ours too
+                if self._generation != generation and self._error is not None:
+                    raise self._error
+
+                if not self._refreshing:
+                    self._refreshing = True
+                    break
+                self._cond.wait()
+
+        token = self._refresh(key)
+        return token.success, dict(token.headers)
+
+    def invalidate(self, headers: Optional[Dict[str, str]] = None):
+        """Drop the cached token (only if it has the given headers), e.g. after DCIM rejected it"""
+        with self._cond:
+            if self._token and (headers is None or self._token.headers == headers):
+                self._token = None
+
+    def _refresh(self, key: Tuple) -> _CachedToken:
+        try:
+            success, headers, ttl = _login(*key)
+        except Exception as e:
+            with self._cond:
+                self._finish(error=e)
+            raise
+
+        token = _CachedToken(key, success, headers, ttl)
+        with self._cond:
+            self._token = token
+            self._finish()
+        return token
+
+    def _background_refresh(self, key: Tuple):
+        try:
+            success, headers, ttl = _login(*key)
+        except Exception as e:
+            logger.warning(f"Background DCIM login failed: {str(e)}")
+            success = False
+
+        with self._cond:
+            # A failed refresh keeps the current token until it expires
+            if success:
+                self._token = _CachedToken(key, success, headers, ttl)
+            self._finish()
+
+    def _finish(self, error: Optional[Exception] = None):
+        self._refreshing = False
+        self._generation += 1
+        self._error = error
+        self._cond.notify_all()
+
+
+dcim_token_cache = DCIMTokenCache()
+
+
+def authentication_ita():
+    user = current_app.config["DCIM_USER"]
+    password = current_app.config["DCIM_PASSWORD"]
+    dcim_base_url = current_app.config["DCIM_BASE_URL"]
+
+    return dcim_token_cache.get(dcim_base_url, user, password)
@@ -10,6 +10,20 @@ import threading
 # Thread-local storage for database connections
 _local = threading.local()
 
+# Connection tuning applied to every pooled connection.
+# WAL lets readers run alongside a writer, NORMAL sync is safe with WAL.
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),  # KiB, negative means size instead of pages
+    ("mmap_size", 134217728),
+    ("temp_store", "MEMORY"),
+)
+
+BUSY_TIMEOUT_SECONDS = 5
+STATEMENT_CACHE_SIZE = 256
+DEFAULT_POOL_SIZE = 8
+
 class DatabaseError(Exception):
     """Base exception class for database operations"""
     pass
@@ -18,14 +32,79 @@ class ConnectionError(DatabaseError):
     """Exception raised for database connection errors"""
     pass
 
+class ConnectionPool:
+    """
+    Pool of open connections to one database file.
+    Threads borrow a connection instead of opening and closing one per query,
+    idle connections above pool_size are closed when returned.
+    """
+
+    def __init__(self, database: str, pool_size: int = DEFAULT_POOL_SIZE):
+        self.database = database
+        self.pool_size = pool_size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Connection:
+        try:
+            db = sqlite3.connect(
+                self.database,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                timeout=BUSY_TIMEOUT_SECONDS,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False,
+            )
+        except sqlite3.Error as e:
+            raise ConnectionError(f"Failed to connect to database: {e}")
+
+        db.row_factory = sqlite3.Row
+        for pragma, value in PRAGMAS:
+            db.execute(f"PRAGMA {pragma} = {value}")
+        return db
+
+    def acquire(self) -> Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, db: Connection):
+        # Never hand out a connection in the middle of someone else's transaction
+        if db.in_transaction:
+            db.rollback()
+
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(db)
+                return
+        db.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for db in idle:
+            db.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Get the connection pool of the configured database"""
+    database = current_app.config['DATABASE']
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None:
+            pool = _pools[database] = ConnectionPool(
+                database, current_app.config.get('DATABASE_POOL_SIZE', DEFAULT_POOL_SIZE)
+            )
+    return pool
+
 def get_db():
     """Get a database connection for the current thread"""
     if not hasattr(_local, 'db'):
-        _local.db = sqlite3.connect(
-            current_app.config['DATABASE'],
-            detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        _local.db.row_factory = sqlite3.Row
+        pool = get_pool()
+        _local.db = pool.acquire()
+        _local.pool = pool
     
     return _local.db
 
@@ -39,12 +118,14 @@ def get_db_connection():
         close_db()
 
 def close_db(e=None):
-    """Close the database connection for the current thread"""
+    """Return the database connection of the current thread to the pool"""
     try:
         db = getattr(_local, 'db', None)
         if db is not None:
-            db.close()
+            pool = _local.pool
             delattr(_local, 'db')
+            delattr(_local, 'pool')
+            pool.release(db)
     except Exception as e:
         current_app.logger.error(f"Error closing database connection: {str(e)}")
 
@@ -55,6 +136,29 @@ def init_db():
     with current_app.open_resource('schema.sql') as f:
         db.executescript(f.read().decode('utf8'))
 
+    migrate_db()
+
+def migrate_db():
+    """Apply the schema migrations to an existing database"""
+    from .migrations import MIGRATIONS
+
+    db = get_db()
+    try:
+        for migration in MIGRATIONS:
+            migration.migrate(db)
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        current_app.logger.error(f"Database migration error: {e}")
+        raise DatabaseError(f"Migration failed: {e}")
+
+def get_data_version(name: str) -> int:
+    """Change counter of a table, bumped by triggers on every write to it"""
+    row = get_db().execute(
+        "SELECT version FROM data_versions WHERE name = ?", (name,)
+    ).fetchone()
+    return row["version"] if row else 0
+
 @click.command('init-db')
 @with_appcontext
 def init_db_command():
@@ -62,6 +166,13 @@ def init_db_command():
     init_db()
     click.echo('Initialized the database.')
 
+@click.command('migrate-db')
+@with_appcontext
+def migrate_db_command():
+    """Apply schema migrations to the existing tables."""
+    migrate_db()
+    click.echo('Migrated the database.')
+
 def execute_query(query: str, params: tuple = ()) -> Optional[list[Row]]:
     """Execute a database query with error handling."""
     try:
@@ -86,4 +197,5 @@ def execute_write_query(query: str, params: tuple = ()) -> Any:
 def init_app(app: Any) -> None:
     """Register database functions with the Flask app."""
     app.teardown_appcontext(close_db)
-    app.cli.add_command(init_db_command)
\ No newline at end of file
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(migrate_db_command)
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Schema migrations applied to existing databases by db.migrate_db().
+Every migration must be idempotent, they run on each application start.
+"""
+from . import data_versions, dcim_assets, panels_delta_sync, panels_fts, panels_typed_columns, pull_jobs
+
+MIGRATIONS = [
+    panels_delta_sync,
+    panels_typed_columns,
+    pull_jobs,
+    data_versions,
+    panels_fts,
+    dcim_assets,
+]
@@ -0,0 +1,23 @@
+# Tables whose writes bump their version, so caches of derived data can tell they are stale
+VERSIONED_TABLES = ("panels",)
+
+
+def migrate(db):
+    """Per-table change counters maintained by triggers"""
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    for table in VERSIONED_TABLES:
+        db.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            db.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
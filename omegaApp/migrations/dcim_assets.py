@@ -0,0 +1,16 @@
+def migrate(db):
+    """Local mirror of DCIM asset details, read through by the DCIM callers"""
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS dcim_assets (
+            asset_id TEXT PRIMARY KEY,
+            serial TEXT,
+            name TEXT,
+            type TEXT,
+            data TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_dcim_assets_serial ON dcim_assets(serial)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_dcim_assets_name ON dcim_assets(name)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_dcim_assets_type ON dcim_assets(type)")
@@ -0,0 +1,26 @@
+def _columns(db, table: str) -> set:
+    return {row[1] for row in db.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def migrate(db):
+    """
+    Prepare the panels table for delta sync from DCIM:
+    a content hash of the imported fields, a tombstone timestamp for assets
+    removed from DCIM and a unique dcim_id for UPSERTs.
+    """
+    columns = _columns(db, "panels")
+    if not columns:
+        return  # Created with the new columns by init-db
+
+    if "content_hash" not in columns:
+        db.execute("ALTER TABLE panels ADD COLUMN content_hash TEXT")
+    if "deleted_at" not in columns:
+        db.execute("ALTER TABLE panels ADD COLUMN deleted_at TIMESTAMP")
+
+    # Keep only the latest row of duplicated dcim_ids before adding the unique index
+    db.execute("""
+        DELETE FROM panels
+        WHERE dcim_id IS NOT NULL
+          AND id NOT IN (SELECT MAX(id) FROM panels WHERE dcim_id IS NOT NULL GROUP BY dcim_id)
+    """)
+    db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_panels_dcim_id ON panels(dcim_id)")
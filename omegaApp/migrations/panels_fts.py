@@ -0,0 +1,47 @@
+FTS_COLUMNS = ("name", "destination", "room", "rack", "interface")
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+
+TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_panels_fts_insert AFTER INSERT ON panels
+    BEGIN
+        INSERT INTO panels_fts (rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_panels_fts_delete AFTER DELETE ON panels
+    BEGIN
+        INSERT INTO panels_fts (panels_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_panels_fts_update AFTER UPDATE OF {_columns} ON panels
+    BEGIN
+        INSERT INTO panels_fts (panels_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO panels_fts (rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+)
+
+
+def migrate(db):
+    """
+    Full-text index over the searchable panel columns.
+    An external content FTS5 table, kept in sync with panels by triggers.
+    """
+    exists = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'panels_fts'"
+    ).fetchone()
+    if not exists:
+        db.execute(f"""
+            CREATE VIRTUAL TABLE panels_fts USING fts5(
+                {_columns}, content='panels', content_rowid='id'
+            )
+        """)
+        db.execute("INSERT INTO panels_fts (panels_fts) VALUES ('rebuild')")
+
+    for trigger in TRIGGERS:
+        db.execute(trigger)
@@ -0,0 +1,47 @@
+from ..modules.panel_sync import TYPED_FIELDS, typed_columns
+
+TYPED_COLUMNS = {
+    "is_active": "INTEGER NOT NULL DEFAULT 0",
+    "size_units": "INTEGER NOT NULL DEFAULT 0",
+    "ports_free": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# Partial indexes, every panels query filters out tombstoned rows
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_panels_room_rack ON panels(room, rack) WHERE deleted_at IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_panels_rack ON panels(rack) WHERE deleted_at IS NULL",
+    # interface is matched with a case insensitive LIKE prefix, which needs a NOCASE index
+    """CREATE INDEX IF NOT EXISTS idx_panels_route
+       ON panels(is_active, interface COLLATE NOCASE, classification) WHERE deleted_at IS NULL""",
+    # Keyset pagination order of get_panels, see panel_query.ORDER_KEY
+    """CREATE INDEX IF NOT EXISTS idx_panels_order
+       ON panels(COALESCE(room, ''), COALESCE(rack, ''), COALESCE(u, ''), id) WHERE deleted_at IS NULL""",
+)
+
+
+def _columns(db, table: str) -> set:
+    return {row[1] for row in db.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def migrate(db):
+    """
+    Add typed copies of the text status, size and how_many_ports_remain columns
+    and the indexes matching the panels access paths.
+    """
+    columns = _columns(db, "panels")
+    if not columns:
+        return
+
+    missing = [column for column in TYPED_COLUMNS if column not in columns]
+    for column in missing:
+        db.execute(f"ALTER TABLE panels ADD COLUMN {column} {TYPED_COLUMNS[column]}")
+
+    if missing:
+        rows = db.execute("SELECT id, status, size, how_many_ports_remain FROM panels").fetchall()
+        db.executemany(
+            f"UPDATE panels SET {', '.join(f'{field} = ?' for field in TYPED_FIELDS)} WHERE id = ?",
+            [(*typed_columns(dict(row)), row["id"]) for row in rows],
+        )
+
+    for index in INDEXES:
+        db.execute(index)
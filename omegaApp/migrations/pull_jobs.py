@@ -0,0 +1,19 @@
+def migrate(db):
+    """State of the background DCIM panel pull jobs, shared by all workers"""
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS pull_jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            phase TEXT NOT NULL DEFAULT '',
+            fetched INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            eta_seconds REAL,
+            message TEXT NOT NULL DEFAULT '',
+            summary TEXT,
+            error TEXT,
+            started_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            finished_at TEXT
+        )
+    """)
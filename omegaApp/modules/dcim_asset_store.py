@@ -0,0 +1,296 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from flask import current_app, has_app_context
+
+from ..db import get_db
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+# Seconds a stored asset is served without asking DCIM again
+DEFAULT_ASSET_TTL = 900
+
+# A record read after this share of its TTL is refreshed in the background
+REFRESH_AHEAD_FRACTION = 0.8
+
+# Search parameters answered locally, and the asset fields they match
+LOCAL_SEARCH_FIELDS = {
+    "serial": ("serialNumber", "serial", "Serial"),
+    "name": ("name",),
+}
+
+AssetFetcher = Callable[[str], Optional[Dict]]
+AssetsFetcher = Callable[[List[str]], List[Dict]]
+
+
+def _asset_field(asset: Dict, names: Iterable[str]) -> Optional[str]:
+    for name in names:
+        value = asset.get(name)
+        if value:
+            return str(value)
+    return None
+
+
+class DCIMAssetStore:
+    """
+    Local mirror of DCIM asset details, kept in the dcim_assets table and
+    shared by every worker.
+    Reads go through the store: a fresh record is served locally, a missing or
+    expired one is fetched from DCIM with the caller's fetch function and
+    stored. Records close to expiry are refreshed in the background, and an
+    expired record is still served when DCIM can't be reached.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DCIMAssetStore, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dcim-asset-refresh")
+        self._hits = 0
+        self._misses = 0
+        self._stale_served = 0
+        self._refreshes = 0
+        self._initialized = True
+
+    def get(self, asset_id: str, fetch: AssetFetcher) -> Optional[Dict]:
+        """
+        Details of an asset, from the store when fresh
+        :param asset_id: ID of the asset in DCIM
+        :param fetch: Fetches the asset details from DCIM, None if not found
+        :return: Asset data if found, None otherwise
+        """
+        asset_id = str(asset_id)
+        row = self._row(asset_id)
+        now = time.time()
+        if row is not None and now < row["expires_at"]:
+            self._count("_hits")
+            self._refresh_ahead(row, now, lambda: self._fetch_one(asset_id, fetch))
+            return json.loads(row["data"])
+
+        self._count("_misses")
+        try:
+            asset = fetch(asset_id)
+        except Exception:
+            if row is None:
+                raise
+            asset = None
+
+        if asset:
+            self.put(asset)
+            return asset
+        if row is not None:
+            logger.warning(f"Serving expired DCIM asset {asset_id}, DCIM didn't return it")
+            self._count("_stale_served")
+            return json.loads(row["data"])
+        return None
+
+    def get_many(self, asset_ids: Iterable[str], fetch_many: AssetsFetcher) -> List[Dict]:
+        """
+        Details of many assets, the ones not fresh in the store fetched in one call.
+        Assets that couldn't be found are left out, the order of asset_ids is kept.
+        :param fetch_many: Fetches the details of a list of asset ids from DCIM
+        """
+        asset_ids = [str(asset_id) for asset_id in asset_ids]
+        rows = self._rows(asset_ids)
+        now = time.time()
+
+        assets, missing, refresh = {}, [], []
+        for asset_id in asset_ids:
+            row = rows.get(asset_id)
+            if row is not None and now < row["expires_at"]:
+                assets[asset_id] = json.loads(row["data"])
+                if self._should_refresh(row, now):
+                    refresh.append(asset_id)
+            else:
+                missing.append(asset_id)
+
+        with self._lock:
+            self._hits += len(assets)
+            self._misses += len(missing)
+
+        if refresh:
+            self._refresh_later(refresh, lambda: self.put_many(fetch_many(refresh)))
+
+        if missing:
+            try:
+                fetched = fetch_many(missing)
+            except Exception:
+                if not any(asset_id in rows for asset_id in missing):
+                    raise
+                fetched = []
+            self.put_many(fetched)
+            for asset in fetched:
+                assets[str(asset["id"])] = asset
+
+            stale = [
+                asset_id for asset_id in missing
+                if asset_id not in assets and asset_id in rows
+            ]
+            for asset_id in stale:
+                assets[asset_id] = json.loads(rows[asset_id]["data"])
+            if stale:
+                logger.warning(f"Serving {len(stale)} expired DCIM assets, DCIM didn't return them")
+                with self._lock:
+                    self._stale_served += len(stale)
+
+        return [assets[asset_id] for asset_id in asset_ids if asset_id in assets]
+
+    def find(self, field: str, value: str) -> Optional[Dict]:
+        """
+        A fresh stored asset whose serial or name equals the value, None when
+        the store can't answer (unknown field, no record or expired)
+        """
+        if field not in LOCAL_SEARCH_FIELDS or not value:
+            return None
+
+        row = get_db().execute(
+            f"SELECT asset_id, data, fetched_at, expires_at FROM dcim_assets"
+            f" WHERE {field} = ? AND expires_at > ?"
+            f" ORDER BY fetched_at DESC LIMIT 1",
+            (str(value), time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+
+        self._count("_hits")
+        return json.loads(row["data"])
+
+    def put(self, asset: Dict, ttl: Optional[float] = None):
+        """Store the details of an asset"""
+        self.put_many([asset], ttl)
+
+    def put_many(self, assets: Iterable[Dict], ttl: Optional[float] = None):
+        """
+        Store asset details, each record expires ttl seconds from now
+        (DCIM_ASSET_TTL by default)
+        """
+        if ttl is None:
+            ttl = current_app.config.get("DCIM_ASSET_TTL", DEFAULT_ASSET_TTL)
+        now = time.time()
+        records = [
+            (
+                str(asset["id"]),
+                _asset_field(asset, LOCAL_SEARCH_FIELDS["serial"]),
+                _asset_field(asset, LOCAL_SEARCH_FIELDS["name"]),
+                _asset_field(asset, ("type", "assetType")),
+                json.dumps(asset),
+                now,
+                now + ttl,
+            )
+            for asset in assets
+            if asset and asset.get("id") is not None
+        ]
+        if not records:
+            return
+
+        db = get_db()
+        db.executemany(
+            "INSERT INTO dcim_assets (asset_id, serial, name, type, data, fetched_at, expires_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(asset_id) DO UPDATE SET"
+            " serial = excluded.serial, name = excluded.name, type = excluded.type,"
+            " data = excluded.data, fetched_at = excluded.fetched_at, expires_at = excluded.expires_at",
+            records,
+        )
+        db.commit()
+
+    def invalidate(self, asset_id: str):
+        """Expire a stored asset, e.g. after it was changed in DCIM"""
+        db = get_db()
+        db.execute("UPDATE dcim_assets SET expires_at = 0 WHERE asset_id = ?", (str(asset_id),))
+        db.commit()
+
+    def stats(self) -> Dict:
+        """Hit rate counters of this process and the size of the store"""
+        row = get_db().execute(
+            "SELECT COUNT(*) AS size, COALESCE(SUM(expires_at > ?), 0) AS fresh FROM dcim_assets",
+            (time.time(),),
+        ).fetchone()
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "staleServed": self._stale_served,
+                "backgroundRefreshes": self._refreshes,
+                "hitRatio": round(self._hits / lookups, 4) if lookups else None,
+                "size": row["size"],
+                "fresh": row["fresh"],
+            }
+
+    def _fetch_one(self, asset_id: str, fetch: AssetFetcher):
+        asset = fetch(asset_id)
+        if asset:
+            self.put(asset)
+
+    def _should_refresh(self, row, now: float) -> bool:
+        ttl = row["expires_at"] - row["fetched_at"]
+        return now >= row["fetched_at"] + ttl * REFRESH_AHEAD_FRACTION
+
+    def _refresh_ahead(self, row, now: float, refresh: Callable[[], None]):
+        if self._should_refresh(row, now):
+            self._refresh_later([row["asset_id"]], refresh)
+
+    def _refresh_later(self, asset_ids: List[str], refresh: Callable[[], None]):
+        """Run refresh in the background, unless these assets are already being refreshed"""
+        if not has_app_context():
+            return
+        with self._lock:
+            if self._refreshing.intersection(asset_ids):
+                return
+            self._refreshing.update(asset_ids)
+            self._refreshes += 1
+
+        app = current_app._get_current_object()
+        self._executor.submit(self._run_refresh, app, asset_ids, refresh)
+
+    def _run_refresh(self, app, asset_ids: List[str], refresh: Callable[[], None]):
+        with app.app_context():
+            try:
+                refresh()
+            except Exception as e:
+                logger.warning(f"Background refresh of DCIM assets {asset_ids} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(asset_ids)
+
+    def _row(self, asset_id: str):
+        return get_db().execute(
+            "SELECT asset_id, data, fetched_at, expires_at FROM dcim_assets WHERE asset_id = ?",
+            (asset_id,),
+        ).fetchone()
+
+    def _rows(self, asset_ids: List[str]) -> Dict[str, object]:
+        rows = {}
+        db = get_db()
+        # Stay below the SQLite host parameter limit
+        for start in range(0, len(asset_ids), 500):
+            chunk = asset_ids[start:start + 500]
+            for row in db.execute(
+                "SELECT asset_id, data, fetched_at, expires_at FROM dcim_assets"
+                f" WHERE asset_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ):
+                rows[row["asset_id"]] = row
+        return rows
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+dcim_asset_store = DCIMAssetStore()
@@ -0,0 +1,382 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Coroutine, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+
+class DCIMError(ValueError):
+    """A DCIM request that failed after its retries"""
+    pass
+
+
+class DCIMAuthError(DCIMError):
+    """DCIM rejected the authentication headers"""
+    pass
+
+
+class DCIMUnavailable(DCIMError):
+    """The circuit breaker is open, DCIM isn't called until it cools down"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops calling DCIM after repeated failures.
+    After failure_threshold failed requests in a row the circuit opens and
+    requests fail fast for reset_timeout seconds. Then a single trial request
+    is let through (half open): success closes the circuit, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_running = False
+
+        if self.state == self.HALF_OPEN:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_running = False
+
+    def abandon(self):
+        """A request was cancelled before its outcome was known"""
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"DCIM circuit opened after {self.failures} failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class AsyncDCIMClient:
+    """
+    asyncio DCIM client.
+    Requests share one keep-alive connection pool of max_in_flight connections.
+    Failed GETs are retried with jittered exponential backoff, and a circuit
+    breaker stops calling DCIM while it keeps failing. Authentication is tracked
+    from the responses (a 401 marks it invalid) instead of probing before calls.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        verify_ssl: bool = True,
+        max_in_flight: int = 16,
+        timeout: Tuple[float, float] = (5, 30),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        :param base_url: Base URL of the DCIM API
+        :param headers: Authentication headers for DCIM API
+        :param verify_ssl: Whether to verify SSL certificates
+        :param max_in_flight: Maximum number of concurrent requests (pool size)
+        :param timeout: (connect, read) timeout in seconds for each request
+        :param retries: Number of retries for failed GET requests
+        :param backoff_factor: Backoff factor between retries (0.5 -> up to 0.5s, 1s, 2s...)
+        """
+        if not base_url:
+            raise ValueError("No DCIM base URL provided")
+
+        self.base_url = base_url.rstrip("/")
+        self.verify_ssl = verify_ssl
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.breaker = breaker or CircuitBreaker()
+        self._headers: Dict[str, str] = dict(headers) if headers else {}
+        self._auth_valid: Optional[bool] = None  # None until DCIM answered a request
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def set_auth(self, auth_headers: Dict[str, str]):
+        """Set authentication headers for DCIM API"""
+        self._headers = dict(auth_headers)
+        self._auth_valid = None
+
+    @property
+    def auth_valid(self) -> Optional[bool]:
+        """Whether DCIM accepted the headers on the last request, None if not known yet"""
+        return self._auth_valid
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily, a session is bound to the event loop it was created in
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.timeout
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_in_flight, ssl=None if self.verify_ssl else False
+                ),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+            )
+        return self._session
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter, so clients failing together don't retry together"""
+        return random.uniform(0, self.backoff_factor * (2 ** attempt))
+
+    async def request(
+        self, method: str, path: str, params: Optional[Dict] = None, json: Any = None
+    ) -> Any:
+        """
+        Send a request to a path relative to the base URL and return the JSON body.
+        Raises DCIMAuthError, DCIMUnavailable or DCIMError.
+        """
+        if not self._headers:
+            raise DCIMError("No authentication headers set. Call set_auth() first")
+        if self._auth_valid is False:
+            raise DCIMAuthError("Invalid or expired authentication")
+        if not self.breaker.allow():
+            raise DCIMUnavailable("DCIM is unavailable, requests are paused")
+
+        try:
+            return await self._send(method, path, params, json)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+
+    async def _send(self, method: str, path: str, params: Optional[Dict], json: Any) -> Any:
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        retries = self.retries if method == "GET" else 0
+        session = self._get_session()
+
+        for attempt in range(retries + 1):
+            try:
+                async with session.request(
+                    method, url, params=params, json=json, headers=self._headers
+                ) as response:
+                    if response.status == 401:
+                        self._auth_valid = False
+                        self.breaker.record_success()  # DCIM itself is up
+                        raise DCIMAuthError("Invalid or expired authentication")
+
+                    if response.status in self.RETRY_STATUSES and attempt < retries:
+                        error = DCIMError(f"DCIM returned {response.status} for {path}")
+                    elif response.status >= 400:
+                        if response.status >= 500 or response.status == 429:
+                            self.breaker.record_failure()
+                        else:
+                            self.breaker.record_success()
+                        raise DCIMError(f"DCIM returned {response.status} for {path}")
+                    else:
+                        data = await response.json(content_type=None)
+                        self._auth_valid = True
+                        self.breaker.record_success()
+                        return data
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = DCIMError(f"DCIM connection error: {str(e) or type(e).__name__}")
+                if attempt >= retries:
+                    self.breaker.record_failure()
+                    raise error
+
+            logger.info(f"Retrying DCIM {method} {path} ({attempt + 1}/{retries}): {error}")
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def search_assets(self, search_params: Dict, limit: int = 100) -> List[Dict]:
+        """Assets matching the search parameters, with their custom properties"""
+        params = {k: v for k, v in search_params.items() if v}
+        params["returnItemsLimit"] = params.pop("limit", limit)
+        params["include"] = "custom_properties"
+        return await self.request("GET", "assets/search", params=params) or []
+
+    async def search_asset(self, search_params: Dict, include_details: bool = True) -> Optional[Dict]:
+        """
+        Search for a asset in DCIM using various parameters
+        :param search_params: Dictionary of search parameters (e.g., {'serial': '123'})
+        :param include_details: Whether to fetch full details for found assets
+        :return: Asset data if found, None otherwise
+        """
+        try:
+            data = await self.search_assets(search_params)
+        except (DCIMAuthError, DCIMUnavailable):
+            raise
+        except DCIMError as e:
+            logger.error(f"Error searching DCIM: {str(e)}")
+            return None
+
+        if not data:
+            return None
+        if include_details:
+            return await self.get_asset_details(data[0]["id"])
+        return data[0]
+
+    async def get_all_assets(
+        self, limit: int = 1000, type: str = None, include_details: bool = False
+    ) -> Optional[list]:
+        """
+        Get all assets from DCIM with their custom properties
+        :param limit: Maximum number of assets to return
+        :param type: Optional type of assets to filter by (e.g., 'server', 'patch-panel')
+        :param include_details: Whether to fetch full details for each asset, concurrently
+        :return: List of asset data if found, None otherwise
+        """
+        params = {"limit": limit}
+        if type:
+            params["type"] = type
+
+        try:
+            data = await self.search_assets(params)
+        except (DCIMAuthError, DCIMUnavailable):
+            raise
+        except DCIMError as e:
+            logger.error(f"Error getting all assets from DCIM: {str(e)}")
+            return None
+
+        if not data:
+            return None
+        if include_details:
+            return await self.get_assets_details(asset["id"] for asset in data)
+        return data
+
+    async def timed_search_asset(
+        self, search_params: Dict, include_details: bool = True
+    ) -> Tuple[Optional[Dict], Optional[str], float]:
+        """
+        search_asset for bulk searches, reporting errors instead of logging them
+        :return: Tuple of (asset or None, error message or None, latency in ms)
+        """
+        started = time.perf_counter()
+        asset, error = None, None
+        try:
+            data = await self.search_assets(search_params)
+            if data:
+                asset = await self._asset_details(data[0]["id"]) if include_details else data[0]
+        except DCIMError as e:
+            error = str(e)
+        return asset, error, round((time.perf_counter() - started) * 1000, 1)
+
+    async def _asset_details(self, asset_id: str) -> Dict:
+        return await self.request(
+            "GET", f"assets/{asset_id}", params={"include": "custom_properties"}
+        )
+
+    async def get_asset_details(self, asset_id: str) -> Optional[Dict]:
+        """
+        Get detailed asset information from DCIM
+        :param asset_id: ID of the asset in DCIM
+        :return: Detailed asset data if found, None otherwise
+        """
+        try:
+            return await self._asset_details(asset_id)
+        except (DCIMAuthError, DCIMUnavailable):
+            raise
+        except DCIMError as e:
+            logger.error(f"Error getting DCIM asset details {asset_id}: {str(e)}")
+            return None
+
+    async def get_assets_details(self, asset_ids: Iterable[str]) -> List[Dict]:
+        """
+        Details of many assets, fetched concurrently (at most max_in_flight at once).
+        Assets that couldn't be fetched are left out, the order of asset_ids is kept.
+        """
+        results = await asyncio.gather(
+            *(self.get_asset_details(asset_id) for asset_id in asset_ids)
+        )
+        return [result for result in results if result]
+
+    async def update_asset(self, asset_id: str, update_data: Dict) -> Dict:
+        """
+        Update asset data in DCIM, not retried
+        :param asset_id: ID of the asset in DCIM
+        :param update_data: Dictionary of fields to update
+        :return: Updated asset data
+        """
+        try:
+            return await self.request(
+                "PATCH",
+                f"assets/{asset_id}",
+                params={"include": "custom_properties"},
+                json=update_data,
+            )
+        except DCIMError as e:
+            logger.error(f"Error updating DCIM asset {asset_id}: {str(e)}")
+            raise DCIMError(f"Failed to update DCIM: {str(e)}")
+
+
+class DCIMEventLoop:
+    """
+    Event loop thread shared by the synchronous DCIM clients.
+    Running every call on the same loop keeps their connection pools alive
+    between calls.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DCIMEventLoop, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._initialized = True
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the shared loop, cancelling the future cancels it"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="dcim-client-loop", daemon=True
+                ).start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the shared loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+
+dcim_event_loop = DCIMEventLoop()
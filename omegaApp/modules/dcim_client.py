@@ -1,42 +1,76 @@
-import requests
-from typing import Dict, Optional
+from concurrent.futures import as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+from flask import has_app_context
+from .dcim_async_client import AsyncDCIMClient, DCIMAuthError, dcim_event_loop
+from .dcim_asset_store import dcim_asset_store
 from ..logger_manager import LoggerManager
 
 logger = LoggerManager().get_logger()
 
 class DCIMClient:
-    def __init__(self, base_url: Optional[str] = None, verify_ssl: bool = True):
+    """
+    Synchronous DCIM client for Flask views.
+    Calls run on the shared DCIM event loop through an AsyncDCIMClient, so
+    they reuse its pooled connections, retries and circuit breaker, and
+    detail fetches fan out concurrently.
+    Asset details are read through the local asset store when an app context
+    is available.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        verify_ssl: bool = True,
+        max_in_flight: int = 16,
+        timeout: Tuple[float, float] = (5, 30),
+    ):
         """
         Initialize DCIM client
         :param base_url: Base URL of the DCIM API
         :param verify_ssl: Whether to verify SSL certificates
+        :param max_in_flight: Maximum number of concurrent requests to DCIM
+        :param timeout: (connect, read) timeout in seconds for each request
         """
         if base_url is None:
             logger.warning(f"No DCIM base URL provided")
             raise ValueError(f"No DCIM base URL provided")
-                        
+
         self.base_url = base_url.rstrip('/')
         self.verify_ssl = verify_ssl
-        self.session = requests.Session()
-        self.session.verify = verify_ssl
+        self.client = AsyncDCIMClient(
+            self.base_url,
+            verify_ssl=verify_ssl,
+            max_in_flight=max_in_flight,
+            timeout=timeout,
+        )
         self._auth_headers = None
-        
+
     def set_auth(self, auth_headers: Dict[str, str]):
         """Set authentication headers for DCIM API"""
         self._auth_headers = auth_headers
-        self.session.headers.update(auth_headers)
-        
+        self.client.set_auth(auth_headers)
+
+    @property
+    def auth_valid(self) -> Optional[bool]:
+        """Whether DCIM accepted the headers on the last request, None if not known yet"""
+        return self.client.auth_valid
+
     def _ensure_authenticated(self):
-        """Ensure we have valid authentication"""
+        """
+        Ensure we have valid authentication.
+        Validity is tracked from the DCIM responses, no request is made here.
+        """
         if not self._auth_headers:
             raise ValueError("No authentication headers set. Call set_auth() first")
-            
-        try:
-            response = self.session.get(f'{self.base_url}/assets/search', params={'returnItemsLimit': 1})
-            if response.status_code == 401:  # Unauthorized
-                raise ValueError("Invalid or expired authentication")
-        except requests.exceptions.RequestException as e:
-            raise ValueError(f"DCIM connection error: {str(e)}")
+        if self.client.auth_valid is False:
+            raise DCIMAuthError("Invalid or expired authentication")
+
+    def _run(self, coro):
+        return dcim_event_loop.run(coro)
+
+    def close(self):
+        """Close the pooled connections"""
+        self._run(self.client.close())
 
     def search_asset(self, search_params: Dict, include_details: bool = True) -> Optional[Dict]:
         """
@@ -46,30 +80,63 @@ class DCIMClient:
         :return: Asset data if found, None otherwise
         """
         self._ensure_authenticated()
-        try:
-            params = {k: v for k, v in search_params.items() if v}
-            params['returnItemsLimit'] = params.get('limit', 100)  # Add default limit
-            params['include'] = 'custom_properties'  # Always include custom properties
-            if 'limit' in params:
-                del params['limit']
-            
-            response = self.session.get(f'{self.base_url}/assets/search', params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            if not data or len(data) == 0:
-                return None
-
-            # If a server is found and full details were requested, fetch all information about it
-            if include_details and len(data) > 0:
-                asset_id = data[0]['id']
-                return self.get_asset_details(asset_id)
-            
-            return data[0]
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error searching DCIM: {str(e)}")
+        if not include_details or not has_app_context():
+            return self._run(self.client.search_asset(search_params, include_details))
+
+        # A search by exact serial or name is answered by the store when it knows the asset
+        if len(search_params) == 1:
+            (field, value), = search_params.items()
+            asset = dcim_asset_store.find(field, value)
+            if asset is not None:
+                return asset
+
+        asset = self._run(self.client.search_asset(search_params, include_details=False))
+        if asset is None:
             return None
+        return self.get_asset_details(asset["id"])
+
+    def bulk_search(
+        self, criteria_list: List[Dict], include_details: bool = False
+    ) -> Iterator[Tuple[int, Optional[Dict], Optional[str], float]]:
+        """
+        Run many searches concurrently, at most max_in_flight requests at once.
+        With details, searches the asset store can answer don't reach DCIM.
+        :param criteria_list: Search parameters of every search
+        :param include_details: Whether to fetch full details for found assets
+        :return: Iterator of (index in criteria_list, asset or None, error or None, latency in ms),
+                 in completion order
+        """
+        self._ensure_authenticated()
+        use_store = include_details and has_app_context()
+
+        # Searches by exact serial or name known to the store are answered first
+        remote = []
+        for index, criteria in enumerate(criteria_list):
+            asset = None
+            if use_store and len(criteria) == 1:
+                (field, value), = criteria.items()
+                asset = dcim_asset_store.find(field, value)
+            if asset is not None:
+                yield index, asset, None, 0.0
+            else:
+                remote.append(index)
+
+        futures = {
+            dcim_event_loop.submit(
+                self.client.timed_search_asset(criteria_list[index], include_details)
+            ): index
+            for index in remote
+        }
+        try:
+            for future in as_completed(futures):
+                asset, error, latency_ms = future.result()
+                if use_store and asset:
+                    dcim_asset_store.put(asset)
+                yield futures[future], asset, error, latency_ms
+        finally:
+            # The caller stopped early (e.g. the client went away)
+            for future in futures:
+                future.cancel()
 
     def get_all_assets(self, limit: int = 1000, type: str = None, include_details: bool = False) -> Optional[list]:
         """
@@ -80,36 +147,16 @@ class DCIMClient:
         :return: List of asset data if found, None otherwise
         """
         self._ensure_authenticated()
-        try:
-            params = {
-                'returnItemsLimit': limit,
-                'include': 'custom_properties'
-            }
-            
-            if type:
-                params['type'] = type
-                
-            response = self.session.get(f'{self.base_url}/assets/search', params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            if not data or len(data) == 0:
-                return None
-
-            # If full details were requested, fetch all information about each asset
-            if include_details:
-                detailed_assets = []
-                for asset in data:
-                    asset_details = self.get_asset_details(asset['id'])
-                    if asset_details:
-                        detailed_assets.append(asset_details)
-                return detailed_assets
-            
-            return data
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error getting all assets from DCIM: {str(e)}")
+        if not include_details or not has_app_context():
+            return self._run(self.client.get_all_assets(limit, type, include_details))
+
+        assets = self._run(self.client.get_all_assets(limit, type, include_details=False))
+        if assets is None:
             return None
+        return dcim_asset_store.get_many(
+            (asset["id"] for asset in assets),
+            lambda asset_ids: self._run(self.client.get_assets_details(asset_ids)),
+        )
 
     def update_asset(self, asset_id: str, update_data: Dict) -> Dict:
         """
@@ -119,17 +166,13 @@ class DCIMClient:
         :return: Updated asset data
         """
         self._ensure_authenticated()
-        try:
-            response = self.session.patch(
-                f'{self.base_url}/assets/{asset_id}?include=custom_properties',
-                json=update_data
-            )
-            response.raise_for_status()
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error updating DCIM asset {asset_id}: {str(e)}")
-            raise ValueError(f"Failed to update DCIM: {str(e)}")
+        asset = self._run(self.client.update_asset(asset_id, update_data))
+        if has_app_context():
+            if asset and asset.get("id") is not None:
+                dcim_asset_store.put(asset)
+            else:
+                dcim_asset_store.invalidate(asset_id)
+        return asset
 
     def get_asset_details(self, asset_id: str) -> Optional[Dict]:
         """
@@ -138,11 +181,8 @@ class DCIMClient:
         :return: Detailed asset data if found, None otherwise
         """
         self._ensure_authenticated()
-        try:
-            response = self.session.get(f'{self.base_url}/assets/{asset_id}?include=custom_properties')
-            response.raise_for_status()
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error getting DCIM asset details {asset_id}: {str(e)}")
-            return None 
\ No newline at end of file
+        if not has_app_context():
+            return self._run(self.client.get_asset_details(asset_id))
+        return dcim_asset_store.get(
+            asset_id, lambda asset_id: self._run(self.client.get_asset_details(asset_id))
+        )
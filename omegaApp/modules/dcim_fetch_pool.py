@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+
+class DCIMFetchPool:
+    """
+    Bounded-concurrency DCIM fetcher.
+    All requests share one keep-alive connection pool sized to the number of
+    requests in flight, and are retried with exponential backoff on
+    connection errors and transient HTTP statuses.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        max_in_flight: int = 16,
+        timeout: Tuple[float, float] = (5, 30),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        verify_ssl: bool = False,
+    ):
+        """
+        :param base_url: Base URL of the DCIM API (with trailing slash)
+        :param headers: Authentication headers for DCIM API
+        :param max_in_flight: Maximum number of concurrent requests
+        :param timeout: (connect, read) timeout in seconds for each request
+        :param retries: Number of retries for failed requests
+        :param backoff_factor: Backoff factor between retries (0.5 -> 0.5s, 1s, 2s...)
+        """
+        self.base_url = base_url
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_in_flight,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.verify = verify_ssl
+        self.session.headers.update(headers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, path: str, params: Optional[Dict] = None) -> requests.Response:
+        """GET a path relative to the DCIM base URL"""
+        return self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+
+    def get_json(self, path: str, params: Optional[Dict] = None) -> Any:
+        response = self.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def map(
+        self, fn: Callable[[Any], Any], items: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Run fn on every item with at most max_in_flight calls running at once.
+        Yields (item, result, error) tuples as calls complete.
+        """
+        items = list(items)
+        start_time = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            futures = {executor.submit(fn, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+
+        logger.info(
+            f"Fetched {len(items)} DCIM items in {time.monotonic() - start_time:.1f}s "
+            f"({self.max_in_flight} in flight)"
+        )
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -2,8 +2,8 @@ from typing import Dict, List, Optional
 from .dcim_client import DCIMClient
 from .dcim_analyzer import DCIMAnalyzer
 from ..logger_manager import LoggerManager
-from ..auth import authentication_ita
-from flask import session
+from ..auth import authentication_ita, dcim_token_cache
+from flask import current_app, session
 
 logger = LoggerManager().get_logger()
 
@@ -38,7 +38,14 @@ class DCIMManager:
                 return False
                 
             # Create and configure client
-            self.client = DCIMClient(base_url=base_url, verify_ssl=verify_ssl)
+            if self.client:
+                self.client.close()
+            self.client = DCIMClient(
+                base_url=base_url,
+                verify_ssl=verify_ssl,
+                max_in_flight=current_app.config.get("DCIM_MAX_IN_FLIGHT", 16),
+                timeout=current_app.config.get("DCIM_TIMEOUT", (5, 30)),
+            )
             self.client.set_auth(auth[1])
             
             # Create analyzer
@@ -63,6 +70,10 @@ class DCIMManager:
         Returns True if auth is valid, False otherwise
         """
         try:
+            # DCIM rejected the cached token, log in again
+            if self.client and self.client.auth_valid is False:
+                dcim_token_cache.invalidate()
+
             current_auth = session.get('authentication')
             new_auth = authentication_ita()
             
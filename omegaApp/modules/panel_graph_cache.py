@@ -0,0 +1,296 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .panel_networkX import (
+    DataCenterMap,
+    Panel,
+    Location,
+    InterfaceType,
+    ClassificationType,
+    RouteTrace,
+    trace_span,
+)
+from ..db import get_db, get_data_version
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+PartitionKey = Tuple[str, str]
+
+# Above this many changed rows a graph is rebuilt rather than patched
+MAX_PATCH_ROWS = 500
+
+
+def partition_key(interface_type: Optional[str], classification: Optional[str]) -> PartitionKey:
+    """Normalise the route search filters into a cache partition key"""
+    return (interface_type or "", (classification or "").lower())
+
+
+def partition_filter(key: PartitionKey) -> Tuple[str, List]:
+    """
+    Build the WHERE clause selecting the panels of a partition
+    :return: Tuple of (where clause, params)
+    """
+    interface_type, classification = key
+
+    where = """
+        WHERE deleted_at IS NULL
+        AND is_active = 1
+        AND interface LIKE ?
+    """
+    params = [f"{interface_type}%"]  # משתמשים ב-% כדי לתפוס גם MM-LC וכו'
+
+    # הוספת תנאי סיווג אם נבחר סיווג ספציפי
+    if classification and classification != "red+black":
+        where += " AND classification = ?"
+        params.append(classification)
+    elif classification == "red+black":
+        where += ' AND (classification = "red" OR classification = "black" OR classification = "red+black")'
+
+    return where, params
+
+
+def panels_from_row(row) -> List[Panel]:
+    """
+    Split a panels table row into one routing Panel per destination.
+    Raises ValueError, KeyError or AttributeError for rows that can't be routed.
+    """
+    interface_type = InterfaceType(row["interface"].split("-")[0])
+
+    # טיפול בסיווג
+    classification = None
+    if row["classification"]:
+        if "red+black" in row["classification"]:
+            classification = None
+        else:
+            try:
+                classification = ClassificationType(row["classification"].upper())
+            except ValueError:
+                classification = None
+
+    # פיצול היעדים והפורטים
+    destinations = (
+        [dest.strip() for dest in row["destination"].split(",") if dest.strip()]
+        if row["destination"]
+        else []
+    )
+    ports_remain_str = row["how_many_ports_remain"] if row["how_many_ports_remain"] else ""
+    ports_dict = {}
+
+    # פירוק מחרוזת הפורטים ליעדים
+    if ":" in ports_remain_str:
+        port_pairs = [pair.strip() for pair in ports_remain_str.split(",")]
+        for pair in port_pairs:
+            if ":" in pair:
+                dest, ports = pair.split(":")
+                dest = dest.strip()
+                try:
+                    ports_dict[dest] = int(ports.strip())
+                except ValueError:
+                    ports_dict[dest] = 0
+    else:
+        try:
+            default_ports = int(ports_remain_str) if ports_remain_str.isdigit() else 0
+        except ValueError:
+            default_ports = 0
+        for dest in destinations:
+            ports_dict[dest] = default_ports
+
+    # יצירת פאנל נפרד לכל יעד
+    return [
+        Panel(
+            id=f"{row['dcim_id']}_{dest}",
+            room=row["room"],
+            location=Location(row["rack"], row["U"]),
+            interface_type=interface_type,
+            status=True,
+            how_many_ports_remain=ports_dict.get(dest, 0),
+            classification=classification,
+            destination=dest,
+        )
+        for dest in destinations
+    ]
+
+
+class _GraphEntry:
+    """A routing graph of one partition together with its bookkeeping"""
+
+    def __init__(self, key: PartitionKey):
+        self.key = key
+        self.lock = threading.RLock()
+        self.dc_map: Optional[DataCenterMap] = None
+        self.panel_ids: Dict[str, Set[str]] = {}  # dcim_id -> routing panel ids
+        self.dirty: Set[str] = set()
+        self.version: Optional[int] = None  # panels data version the graph was read at
+        self.local_writes = 0  # version bumps of the writes behind the dirty panels
+
+    def expected_version(self) -> Optional[int]:
+        """Data version if the only writes since the graph was read are the local ones"""
+        return None if self.version is None else self.version + self.local_writes
+
+    def build(self, trace: Optional[RouteTrace] = None):
+        """Build the graph of the partition from scratch"""
+        self.version = get_data_version("panels")
+        where, params = partition_filter(self.key)
+        with trace_span(trace, "graph.load"):
+            rows = get_db().execute(f"SELECT * FROM panels {where} ORDER BY id", params).fetchall()
+
+        self.dc_map = DataCenterMap()
+        self.panel_ids = {}
+        self.dirty = set()
+        self.local_writes = 0
+        for row in rows:
+            self._add_row(row)
+
+        with trace_span(trace, "graph.connect"):
+            self.dc_map.connect_panels(trace)
+        if trace is not None:
+            trace.count("rowsLoaded", len(rows))
+            trace.count("panelsAdded", len(self.dc_map.panels))
+        logger.info(
+            f"Built routing graph {self.key}: {len(rows)} rows, "
+            f"{self.dc_map.graph.number_of_nodes()} panels, "
+            f"{self.dc_map.graph.number_of_edges()} connections"
+        )
+
+    def patch(self, version: int, trace: Optional[RouteTrace] = None):
+        """
+        Re-read the dirty rows and reconnect only their panels, on a copy of the
+        graph so maps already handed out never change
+        :param version: Data version read before the rows, accounted for by the local writes
+        """
+        self.version = version
+        self.local_writes = 0
+        dirty_ids = list(self.dirty)
+        self.dirty = set()
+
+        where, params = partition_filter(self.key)
+        placeholders = ",".join("?" for _ in dirty_ids)
+        rows = get_db().execute(
+            f"SELECT * FROM panels {where} AND dcim_id IN ({placeholders}) ORDER BY id",
+            params + dirty_ids,
+        ).fetchall()
+
+        self.dc_map = self.dc_map.copy()
+        self.panel_ids = {dcim_id: set(ids) for dcim_id, ids in self.panel_ids.items()}
+        for dcim_id in dirty_ids:
+            for panel_id in self.panel_ids.pop(dcim_id, set()):
+                self.dc_map.remove_panel(panel_id)
+
+        added = []
+        for row in rows:
+            added.extend(self._add_row(row))
+
+        with trace_span(trace, "graph.connect"):
+            for panel_id in added:
+                self.dc_map.connect_panel(panel_id, trace)
+        if trace is not None:
+            trace.count("rowsLoaded", len(rows))
+            trace.count("panelsAdded", len(added))
+
+        logger.info(f"Patched routing graph {self.key}: {len(dirty_ids)} rows changed")
+
+    def _add_row(self, row) -> List[str]:
+        try:
+            panels = panels_from_row(row)
+        except (ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"Skipping panel {row['dcim_id']}: {str(e)}")
+            return []
+
+        for index, p in enumerate(panels):
+            self.dc_map.add_panel(p, rank=(row["id"], index))
+
+        ids = {p.id for p in panels}
+        self.panel_ids.setdefault(row["dcim_id"], set()).update(ids)
+        return [p.id for p in panels]
+
+
+class PanelGraphCache:
+    """
+    Long-lived routing graphs, one per (interface type, classification) partition.
+    Graphs are built on first use, patched in place for panels marked dirty
+    and rebuilt when the panels data version changed without local changes.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PanelGraphCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._entries: Dict[PartitionKey, _GraphEntry] = {}
+        self._initialized = True
+
+    @contextmanager
+    def checkout(
+        self,
+        interface_type: Optional[str],
+        classification: Optional[str],
+        trace: Optional[RouteTrace] = None,
+    ):
+        """
+        Yield the up to date DataCenterMap of a partition.
+        The partition is locked only while the graph is brought up to date. A
+        map that was handed out is never changed (patches are applied to a
+        copy), so searches run unlocked. Callers must not change it either,
+        routing_copy() gives a map that can be changed.
+        """
+        key = partition_key(interface_type, classification)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _GraphEntry(key)
+
+        with entry.lock:
+            with trace_span(trace, "graph.checkout"):
+                # Read before the dirty rows, a write of another worker moves the
+                # version beyond what the local writes account for
+                version = get_data_version("panels")
+                changed_elsewhere = version != entry.expected_version()
+                if entry.dc_map is None or changed_elsewhere or len(entry.dirty) > MAX_PATCH_ROWS:
+                    with trace_span(trace, "graph.build"):
+                        entry.build(trace)
+                elif entry.dirty:
+                    with trace_span(trace, "graph.patch"):
+                        entry.patch(version, trace)
+            dc_map = entry.dc_map
+
+        yield dc_map
+
+    def mark_dirty(self, dcim_ids: Iterable[str], writes: Optional[int] = None):
+        """
+        Schedule the given panels to be patched into every cached graph
+        :param writes: Number of panels rows written, each bumps the data version.
+                       One per panel by default.
+        """
+        dcim_ids = {dcim_id for dcim_id in dcim_ids if dcim_id}
+        if not dcim_ids:
+            return
+        if writes is None:
+            writes = len(dcim_ids)
+
+        with self._lock:
+            entries = list(self._entries.values())
+
+        for entry in entries:
+            with entry.lock:
+                if entry.dc_map is not None:
+                    entry.dirty.update(dcim_ids)
+                    entry.local_writes += writes
+
+    def invalidate(self):
+        """Drop all cached graphs, they will be rebuilt on next use"""
+        with self._lock:
+            self._entries = {}
+        logger.info("Routing graph cache invalidated")
+
+
+panel_graph_cache = PanelGraphCache()
@@ -1,9 +1,61 @@
-from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional, Set
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, replace
+from typing import Any, Callable, List, Dict, Tuple, Optional, Set, Iterator
 from enum import Enum
+import copy
+import heapq
+import itertools
+import time
 import networkx as nx
 from collections import defaultdict
 
+# Panels are only connected within this many cabinets of the same spine
+CABINET_WINDOW = 4
+
+
+def parse_rack_name(rack: str) -> Tuple[str, int]:
+    """Extracts the spine (XX) and cabinet number (YY) from a rack name like "XX-CYY"."""
+    rack_parts = rack.split("-")
+    if len(rack_parts) == 2:
+        try:
+            return rack_parts[0], int(rack_parts[1][1:])
+        except ValueError:
+            pass
+    return "", 0
+
+
+class RouteTrace:
+    """
+    Timing spans and counters of one routing request.
+    Tracing is off unless a trace is passed in, the engine only records when
+    it got one.
+    """
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def span(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.spans.append(
+                {"name": name, "ms": round((time.perf_counter() - started) * 1000, 3)}
+            )
+
+    def count(self, name: str, amount: int = 1):
+        self.counts[name] += amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"spans": list(self.spans), "counts": dict(self.counts)}
+
+
+def trace_span(trace: Optional[RouteTrace], name: str):
+    """Span of the trace, or a no-op context when tracing is off"""
+    return trace.span(name) if trace is not None else nullcontext()
+
 
 class InterfaceType(Enum):
     RJ = "RJ"
@@ -30,13 +82,7 @@ class Location:
 
     def get_spine_and_cabinet(self) -> Tuple[str, int]:
         """Extracts the spine (XX) and cabinet number (YY) from the rack name."""
-        rack_parts = self.rack.split("-")
-        if len(rack_parts) == 2:
-            spine = rack_parts[0]
-            cabinet = int(rack_parts[1][1:])
-            return spine, cabinet
-        return "", 0
-    
+        return parse_rack_name(self.rack)
 
 
 @dataclass
@@ -69,6 +115,16 @@ class RouteConstraints:
         self.max_hops = max_hops
         self.preferred_rooms = set(preferred_rooms) if preferred_rooms else None
 
+    def cache_key(self) -> Tuple:
+        """Hashable normalised form of the constraints"""
+        return (
+            self.interface_type.value if self.interface_type else None,
+            self.min_free_ports,
+            self.classification.value if self.classification else None,
+            self.max_hops,
+            tuple(sorted(self.preferred_rooms)) if self.preferred_rooms else None,
+        )
+
 
 class DataCenterMap:
     def __init__(self):
@@ -79,10 +135,22 @@ class DataCenterMap:
             lambda: defaultdict(set)
         )
         self.spine_panels: Dict[str, Set[str]] = defaultdict(set)
-
-    def add_panel(self, panel: Panel):
+        # Ordering of panels, decides which panel acts as the source of a pair
+        # when edges are built (the lower rank is compared by its destination)
+        self.ranks: Dict[str, Tuple[int, int]] = {}
+        # Edge construction indexes: (interface, spine, cabinet) of the panel's
+        # location and of its destination, plus the exact rack names of both
+        self._location_index: Dict[Tuple, Set[str]] = defaultdict(set)
+        self._destination_index: Dict[Tuple, Set[str]] = defaultdict(set)
+        self._rack_index: Dict[Tuple, Set[str]] = defaultdict(set)
+        self._destination_rack_index: Dict[Tuple, Set[str]] = defaultdict(set)
+        self._table = None
+
+    def add_panel(self, panel: Panel, rank: Optional[Tuple[int, int]] = None):
         """Add a panel to the data center map."""
         self.panels[panel.id] = panel
+        self.ranks[panel.id] = rank if rank is not None else (len(self.ranks), 0)
+        self._table = None
         # Store panel by its physical location instead of destination
         self.location_panels[panel.location.get_rack_identifier()][
             panel.interface_type
@@ -91,6 +159,9 @@ class DataCenterMap:
         spine = panel.location.get_spine_and_cabinet()[0]
         self.spine_panels[spine].add(panel.id)
 
+        for index, key in self._index_keys(panel):
+            index[key].add(panel.id)
+
         self.graph.add_node(
             panel.id,
             location=str(panel.location),
@@ -100,74 +171,170 @@ class DataCenterMap:
             how_many_ports_remain=panel.how_many_ports_remain,
         )
 
-    def connect_panels(self):
-        """Create connections between panels based on physical location matching source locations."""
-        panel_list = list(self.panels.values())
+    def remove_panel(self, panel_id: str):
+        """Remove a panel and all of its connections from the map."""
+        panel = self.panels.pop(panel_id, None)
+        if panel is None:
+            return
 
-        for i in range(len(panel_list)):
-            for j in range(i + 1, len(panel_list)):
-                panel1 = panel_list[i]
-                panel2 = panel_list[j]
+        self.ranks.pop(panel_id, None)
+        self._table = None
+        rack_panels = self.location_panels.get(panel.location.get_rack_identifier())
+        if rack_panels is not None:
+            rack_panels[panel.interface_type].discard(panel_id)
 
-                # בדיקה שיש לפחות פורט אחד פנוי בכל פאנל
-                if not panel1.is_available() or not panel2.is_available() or \
-                   panel1.how_many_ports_remain < 1 or panel2.how_many_ports_remain < 1:
-                    continue
+        spine = panel.location.get_spine_and_cabinet()[0]
+        self.spine_panels[spine].discard(panel_id)
 
-                # Skip if interface types don't match
-                if panel1.interface_type != panel2.interface_type:
-                    continue
+        for index, key in self._index_keys(panel):
+            index[key].discard(panel_id)
+
+        if self.graph.has_node(panel_id):
+            self.graph.remove_node(panel_id)
+
+    @property
+    def table(self):
+        """Columnar PanelTable of the map's panels, rebuilt after panels change."""
+        if self._table is None:
+            from .panel_table import PanelTable
+
+            self._table = PanelTable(self.panels.values())
+        return self._table
+
+    def _index_keys(self, panel: Panel):
+        """The (index, key) pairs a panel is stored under."""
+        interface_type = panel.interface_type
+        return [
+            (self._location_index, (interface_type, *panel.location.get_spine_and_cabinet())),
+            (self._destination_index, (interface_type, *parse_rack_name(panel.destination))),
+            (self._rack_index, (interface_type, panel.location.get_rack_identifier())),
+            (self._destination_rack_index, (interface_type, panel.destination)),
+        ]
+
+    def _candidates_by_destination(self, panel: Panel) -> Set[str]:
+        """Panels whose location may be reached from this panel's destination."""
+        interface_type = panel.interface_type
+        spine, cabinet = parse_rack_name(panel.destination)
+
+        candidates = set(self._rack_index.get((interface_type, panel.destination), ()))
+        for other_cabinet in range(cabinet - CABINET_WINDOW, cabinet + CABINET_WINDOW + 1):
+            candidates.update(self._location_index.get((interface_type, spine, other_cabinet), ()))
+        return candidates
+
+    def _candidates_by_location(self, panel: Panel) -> Set[str]:
+        """Panels whose destination may reach this panel's location."""
+        interface_type = panel.interface_type
+        spine, cabinet = panel.location.get_spine_and_cabinet()
+
+        candidates = set(
+            self._destination_rack_index.get((interface_type, panel.location.get_rack_identifier()), ())
+        )
+        for other_cabinet in range(cabinet - CABINET_WINDOW, cabinet + CABINET_WINDOW + 1):
+            candidates.update(self._destination_index.get((interface_type, spine, other_cabinet), ()))
+        return candidates
+
+    def connect_panels(self, trace: Optional[RouteTrace] = None):
+        """Create connections between panels based on physical location matching source locations."""
+        examined = added = 0
+        for panel1 in self.panels.values():
+            rank = self.ranks[panel1.id]
 
-                # Skip if classifications are incompatible
-                if panel1.classification != panel2.classification and panel1.classification is not None and panel2.classification is not None:
+            # Each pair is examined once, from the panel with the lower rank
+            for panel2_id in self._candidates_by_destination(panel1):
+                if self.ranks[panel2_id] <= rank:
                     continue
 
-                """Extracts the spine (XX) and cabinet number (YY) from the destination."""
-                spine1, cabinet1 = "", 0
-                destination_parts = panel1.destination.split("-")
-                if len(destination_parts) == 2:
-                    spine1 = destination_parts[0]
-                    cabinet1 = int(destination_parts[1][1:])
-
-                spine2, cabinet2 = panel2.location.get_spine_and_cabinet()
-
-                connection_weight = float("inf")
-                print("Before")
-                print(panel1)
-                print(panel2)
-                print(spine1, cabinet1)
-                print(spine2, cabinet2)
-                # Case 1: Direct connection (one panel's destination matches the other's location)
-                if (
-                    panel1.destination
-                    == panel2.location.get_rack_identifier()
-                    # or panel2.destination == panel1.location.get_rack_identifier() \\ I didn't check because each panel is represented multiple times. Once in each direction of it.
-                ):
-                    connection_weight = 1
-
-                # Case 2: Same spine, adjacent cabinets
-                elif spine1 == spine2 and abs(cabinet1 - cabinet2) == 1:
-                    connection_weight = 2
-
-                # Case 3: Same spine, cabinets 2 steps apart
-                elif spine1 == spine2 and abs(cabinet1 - cabinet2) == 2:
-                    connection_weight = 3
-
-                # Case 4: Same spine, cabinets more than 2 steps apart but within limit
-                elif spine1 == spine2 and abs(cabinet1 - cabinet2) <= 4:
-                    connection_weight = 3 + abs(cabinet1 - cabinet2)
-                print("After")
-                print(connection_weight)
-                # Add edge if a valid connection weight was found
-                if connection_weight != float("inf"):
-                    self.graph.add_edge(
-                        panel1.id,
-                        panel2.id,
-                        weight=connection_weight,
-                        interface_type=panel1.interface_type,
-                        free_ports=min(panel1.how_many_ports_remain, panel2.how_many_ports_remain),
-                        classification=panel1.classification,
-                    )
+                examined += 1
+                panel2 = self.panels[panel2_id]
+                connection_weight = self._connection_weight(panel1, panel2)
+                if connection_weight is not None:
+                    self._add_connection(panel1, panel2, connection_weight)
+                    added += 1
+
+        if trace is not None:
+            trace.count("pairsExamined", examined)
+            trace.count("edgesAdded", added)
+
+    def connect_panel(self, panel_id: str, trace: Optional[RouteTrace] = None):
+        """Create the connections of a single panel against the rest of the map."""
+        panel = self.panels[panel_id]
+        rank = self.ranks[panel_id]
+
+        pairs = [
+            (panel, self.panels[other_id])
+            for other_id in self._candidates_by_destination(panel)
+            if self.ranks[other_id] > rank
+        ]
+        pairs += [
+            (self.panels[other_id], panel)
+            for other_id in self._candidates_by_location(panel)
+            if self.ranks[other_id] < rank
+        ]
+
+        added = 0
+        for panel1, panel2 in pairs:
+            connection_weight = self._connection_weight(panel1, panel2)
+            if connection_weight is not None:
+                self._add_connection(panel1, panel2, connection_weight)
+                added += 1
+
+        if trace is not None:
+            trace.count("pairsExamined", len(pairs))
+            trace.count("edgesAdded", added)
+
+    def _connection_weight(self, panel1: Panel, panel2: Panel) -> Optional[float]:
+        """
+        Weight of the connection from panel1 (by its destination) to panel2 (by its location).
+        Returns None when the panels can't be connected.
+        """
+        # בדיקה שיש לפחות פורט אחד פנוי בכל פאנל
+        if not panel1.is_available() or not panel2.is_available() or \
+           panel1.how_many_ports_remain < 1 or panel2.how_many_ports_remain < 1:
+            return None
+
+        # Skip if interface types don't match
+        if panel1.interface_type != panel2.interface_type:
+            return None
+
+        # Skip if classifications are incompatible
+        if panel1.classification != panel2.classification and panel1.classification is not None and panel2.classification is not None:
+            return None
+
+        spine1, cabinet1 = parse_rack_name(panel1.destination)
+        spine2, cabinet2 = panel2.location.get_spine_and_cabinet()
+
+        # Case 1: Direct connection (one panel's destination matches the other's location)
+        if (
+            panel1.destination
+            == panel2.location.get_rack_identifier()
+            # or panel2.destination == panel1.location.get_rack_identifier() \\ I didn't check because each panel is represented multiple times. Once in each direction of it.
+        ):
+            return 1
+
+        # Case 2: Same spine, adjacent cabinets
+        elif spine1 == spine2 and abs(cabinet1 - cabinet2) == 1:
+            return 2
+
+        # Case 3: Same spine, cabinets 2 steps apart
+        elif spine1 == spine2 and abs(cabinet1 - cabinet2) == 2:
+            return 3
+
+        # Case 4: Same spine, cabinets more than 2 steps apart but within limit
+        elif spine1 == spine2 and abs(cabinet1 - cabinet2) <= CABINET_WINDOW:
+            return 3 + abs(cabinet1 - cabinet2)
+
+        return None
+
+    def _add_connection(self, panel1: Panel, panel2: Panel, connection_weight: float):
+        """Add the graph edge between two panels."""
+        self.graph.add_edge(
+            panel1.id,
+            panel2.id,
+            weight=connection_weight,
+            interface_type=panel1.interface_type,
+            free_ports=min(panel1.how_many_ports_remain, panel2.how_many_ports_remain),
+            classification=panel1.classification,
+        )
 
     def find_panels_in_rack(self, room: str, rack: str) -> List[Panel]:
         """Find all panels in a specific rack."""
@@ -196,145 +363,322 @@ class DataCenterMap:
 
         return cost
 
+    def routing_copy(self) -> "DataCenterMap":
+        """
+        Copy of the map with its own panels and graph, for routing against
+        changed port counts. The edge construction indexes are shared, so
+        panels must not be added to or removed from the copy.
+        """
+        dc_map = copy.copy(self)
+        dc_map.panels = {panel_id: replace(panel) for panel_id, panel in self.panels.items()}
+        dc_map.graph = self.graph.copy()
+        dc_map._table = None
+        return dc_map
+
+    def copy(self) -> "DataCenterMap":
+        """Independent copy of the map, panels may be added to and removed from it"""
+        dc_map = self.routing_copy()
+        dc_map.ranks = dict(self.ranks)
+        dc_map.location_panels = defaultdict(lambda: defaultdict(set))
+        for rack, panels_by_type in self.location_panels.items():
+            for interface_type, panel_ids in panels_by_type.items():
+                dc_map.location_panels[rack][interface_type] = set(panel_ids)
+        dc_map.spine_panels = defaultdict(set, {spine: set(ids) for spine, ids in self.spine_panels.items()})
+        for name in ("_location_index", "_destination_index", "_rack_index", "_destination_rack_index"):
+            index = getattr(self, name)
+            setattr(dc_map, name, defaultdict(set, {key: set(ids) for key, ids in index.items()}))
+        return dc_map
+
+    def consume_ports(self, panel_ids, ports: int):
+        """Take ports of the given panels, updating the free ports of their connections."""
+        for panel_id in set(panel_ids):
+            panel = self.panels[panel_id]
+            panel.how_many_ports_remain = max(0, panel.how_many_ports_remain - ports)
+            self.graph.nodes[panel_id]["how_many_ports_remain"] = panel.how_many_ports_remain
+            for neighbor, edge_data in self.graph[panel_id].items():
+                edge_data["free_ports"] = min(
+                    panel.how_many_ports_remain, self.panels[neighbor].how_many_ports_remain
+                )
+        self._table = None
+
     def find_all_routes(
-        self, start_rack: str, end_rack: str, constraints: RouteConstraints
+        self,
+        start_rack: str,
+        end_rack: str,
+        constraints: RouteConstraints,
+        limit: Optional[int] = None,
+        search_cache: Optional[Dict] = None,
+        trace: Optional[RouteTrace] = None,
     ) -> List[List[Tuple[str, str]]]:
         """
-        Find all possible routes between two racks that meet the constraints.
-        Returns routes sorted by priority (weight) and number of hops.
+        Find the best routes between two racks that meet the constraints.
+        Returns up to `limit` routes (all routes if None) sorted by priority (weight)
+        and number of hops. Room preferences reorder the selected routes.
+        Queries sharing a search_cache reuse each other's candidate panels and
+        search bounds, it must be cleared when the map changes.
         """
-        # Get panels in the start rack that match the interface type
-        start_panels = set()
-        start_spine = start_rack.split("-")[0]
-        
-        for panel_id, panel in self.panels.items():
-            if panel.interface_type != constraints.interface_type:
-                continue
-            # בדיקה שיש מספיק פורטים לפי ה-constraints
-            if not panel.is_available() or panel.how_many_ports_remain < constraints.min_free_ports:
-                continue
-
-            panel_spine = panel.location.get_rack_identifier().split("-")[0]
-            panel_dest_spine = panel.destination.split("-")[0]
-
-            # פאנל מתאים לנקודת התחלה אם:
-            # 1. הוא נמצא במיקום המבוקש
-            # 2. או שהוא נמצא באותה שדרה של המיקום המבוקש
-            if (panel.location.get_rack_identifier() == start_rack or  # מיקום זהה
-                (panel_spine == start_spine)):    # אותה שדרה במיקום
-                start_panels.add(panel_id)
-
-        # Get panels in the end rack that match the interface type
-        end_panels = set()
-        end_spine = end_rack.split("-")[0]
-        
-        for panel_id, panel in self.panels.items():
-            if panel.interface_type != constraints.interface_type:
-                continue
-            # בדיקה שיש מספיק פורטים לפי ה-constraints
-            if not panel.is_available() or panel.how_many_ports_remain < constraints.min_free_ports:
-                continue
-
-            panel_dest_spine = panel.destination.split("-")[0]
-            
-            # פאנל מתאים לנקודת סיום אם:
-            # 1. היעד שלו הוא היעד המבוקש
-            # 2. או שהיעד שלו באותה שדרה של היעד המבוקש
-            if (panel.destination == end_rack or  # יעד זהה
-                panel_dest_spine == end_spine):  # אותה שדרה ביעד
-                end_panels.add(panel_id)
-
-        print(f"Start panels: {start_panels}")
-        print(f"End panels: {end_panels}")
-
-        all_routes = []
-
-        # Check for direct connections
+        routes_iter = self.iter_routes(start_rack, end_rack, constraints, search_cache, trace)
+        with trace_span(trace, "routes.search"):
+            routes = list(itertools.islice(routes_iter, limit))
+
+        # Apply room preferences if specified
+        if constraints.preferred_rooms:
+            with trace_span(trace, "routes.preferredRooms"):
+                routes = self._filter_preferred_rooms(routes, constraints.preferred_rooms)
+
+        if trace is not None:
+            trace.count("routesFound", len(routes))
+        return [route for route, _ in routes if route]  # Return only non-empty routes
+
+    def iter_routes(
+        self,
+        start_rack: str,
+        end_rack: str,
+        constraints: RouteConstraints,
+        search_cache: Optional[Dict] = None,
+        trace: Optional[RouteTrace] = None,
+    ) -> Iterator[Tuple[List[Tuple[str, str]], float]]:
+        """
+        Lazily yield (route, weight) pairs between two racks, ordered by weight and
+        then by number of hops. Direct panel connections are merged with the
+        multi-hop routes found by the best-first search.
+        """
+        with trace_span(trace, "routes.candidates"):
+            start_panels, end_panels, bounds = self._search_inputs(
+                start_rack, end_rack, constraints, search_cache
+            )
+            direct_routes = self._direct_routes(start_panels, end_rack)
+
+        if trace is not None:
+            trace.count("startPanels", len(start_panels))
+            trace.count("endPanels", len(end_panels))
+            trace.count("directRoutes", len(direct_routes))
+
+        return heapq.merge(
+            direct_routes,
+            self._search_routes(start_panels, end_panels, constraints, bounds, trace),
+            key=lambda item: (item[1], len(item[0])),
+        )
+
+    def multi_hop_weights(
+        self,
+        start_rack: str,
+        end_rack: str,
+        constraints: RouteConstraints,
+        search_cache: Optional[Dict] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Minimum weight of the multi-hop routes between two racks for every hop
+        limit up to constraints.max_hops, as (hops, weight) breakpoints sorted by hops.
+        Under a hop limit h the minimum weight is the one of the last breakpoint
+        with hops <= h, an empty list means the racks aren't connected.
+        """
+        start_panels, end_panels, bounds = self._search_inputs(
+            start_rack, end_rack, constraints, search_cache
+        )
+
+        breakpoints = []
+        limited = copy.copy(constraints)
+        while limited.max_hops is None or limited.max_hops > 0:
+            best = next(self._search_routes(start_panels, end_panels, limited, bounds), None)
+            if best is None:
+                break
+            route, weight = best
+            breakpoints.append((len(route), weight))
+            # Only a route with fewer hops can still be of interest
+            limited.max_hops = len(route) - 1
+
+        return breakpoints[::-1]
+
+    def _search_inputs(
+        self,
+        start_rack: str,
+        end_rack: str,
+        constraints: RouteConstraints,
+        search_cache: Optional[Dict] = None,
+    ) -> Tuple[Set[str], Set[str], Tuple[Dict[str, float], Dict[str, int]]]:
+        """Start panels, end panels and search bounds of a query, memoized in search_cache"""
+        if search_cache is None:
+            search_cache = {}
+        # Room preferences only reorder results, they don't change the search
+        search_key = constraints.cache_key()[:-1]
+
+        def cached(key: Tuple, compute: Callable[[], Any]) -> Any:
+            if key not in search_cache:
+                search_cache[key] = compute()
+            return search_cache[key]
+
+        start_panels = cached(
+            ("start", start_rack, search_key),
+            lambda: self._find_start_panels(start_rack, constraints),
+        )
+        end_panels = cached(
+            ("end", end_rack, search_key),
+            lambda: self._find_end_panels(end_rack, constraints),
+        )
+        bounds = cached(
+            ("bounds", end_rack, search_key),
+            lambda: self._remaining_bounds(end_panels, constraints),
+        )
+        return start_panels, end_panels, bounds
+
+    def _find_start_panels(self, start_rack: str, constraints: RouteConstraints) -> Set[str]:
+        """
+        Get panels matching the interface type with enough free ports that are
+        located in the start rack or in the same spine of it
+        """
+        table = self.table
+        return table.select(
+            table.available_mask(constraints.interface_type, constraints.min_free_ports)
+            & table.located_in(start_rack)
+        )
+
+    def _find_end_panels(self, end_rack: str, constraints: RouteConstraints) -> Set[str]:
+        """
+        Get panels matching the interface type with enough free ports that lead
+        to the end rack or to the same spine of it
+        """
+        table = self.table
+        return table.select(
+            table.available_mask(constraints.interface_type, constraints.min_free_ports)
+            & table.leading_to(end_rack)
+        )
+
+    def _direct_routes(
+        self, start_panels: Set[str], end_rack: str
+    ) -> List[Tuple[List[Tuple[str, str]], float]]:
+        """Single panel routes, sorted by weight"""
+        routes = []
+        end_rack_spine = end_rack.split("-")[0]
+
         for start_panel_id in start_panels:
             start_panel = self.panels[start_panel_id]
-            
+
             # בדיקה האם היעד של הפאנל הוא באותה שדרה של היעד המבוקש
             start_panel_dest_spine = start_panel.destination.split("-")[0]
-            end_rack_spine = end_rack.split("-")[0]
-            
+
             # מקרה 1: חיבור ישיר ליעד המבוקש
             if start_panel.destination == end_rack:
-                direct_route = [(start_panel_id, start_panel_id)]
-                all_routes.append((direct_route, 1))  # Weight of 1 for direct connections
-                continue
-            
+                routes.append(([(start_panel_id, start_panel_id)], 1))  # Weight of 1 for direct connections
+
             # מקרה 2: חיבור לאותה שדרה של היעד
             elif start_panel_dest_spine == end_rack_spine:
                 # בדיקה האם המרחק בין הארונות סביר
-                dest_cabinet = int(start_panel.destination.split("-")[1][1:])
-                end_cabinet = int(end_rack.split("-")[1][1:])
-                
-                if abs(dest_cabinet - end_cabinet) <= 4:  # מרחק סביר בין ארונות
-                    direct_spine_route = [(start_panel_id, start_panel_id)]
+                try:
+                    dest_cabinet = int(start_panel.destination.split("-")[1][1:])
+                    end_cabinet = int(end_rack.split("-")[1][1:])
+                except (IndexError, ValueError):
+                    continue
+
+                if abs(dest_cabinet - end_cabinet) <= CABINET_WINDOW:  # מרחק סביר בין ארונות
                     weight = 1 + abs(dest_cabinet - end_cabinet)  # משקל לפי המרחק
-                    all_routes.append((direct_spine_route, weight))
+                    routes.append(([(start_panel_id, start_panel_id)], weight))
 
-        # Find indirect routes
-        for start_panel in start_panels:
-            for end_panel in end_panels:
-                try:
-                    # Use all_simple_paths to find all possible routes
-                    cutoff = constraints.max_hops if constraints.max_hops else None
-                    paths = list(
-                        nx.all_simple_paths(
-                            self.graph, start_panel, end_panel, cutoff=cutoff
-                        )
-                    )
-
-                    for path in paths:
-                        route = []
-                        valid_route = True
-                        total_weight = 0
-
-                        # Validate each connection in the path
-                        for i in range(len(path) - 1):
-                            panel1_id, panel2_id = path[i], path[i + 1]
-
-                            # Get edge data and validate connection
-                            if not self.graph.has_edge(panel1_id, panel2_id):
-                                valid_route = False
-                                break
-
-                            edge_data = self.graph.edges[panel1_id, panel2_id]
-                            if not self._validate_connection(edge_data, constraints):
-                                valid_route = False
-                                break
-
-                            total_weight += edge_data.get("weight", 1)
-                            route.append((panel1_id, panel2_id))
-
-                        if valid_route and route:  # Only append non-empty valid routes
-                            all_routes.append((route, total_weight))
-
-                except nx.NetworkXNoPath:
+        routes.sort(key=lambda item: item[1])
+        return routes
+
+    def _edge_weight(self, constraints: RouteConstraints) -> Callable:
+        def edge_weight(u, v, edge_data):
+            if not self._validate_connection(edge_data, constraints):
+                return None  # Hide the connection from the search
+            return edge_data.get("weight", 1)
+
+        return edge_weight
+
+    def _remaining_bounds(
+        self, end_panels: Set[str], constraints: RouteConstraints
+    ) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """Remaining weight and hops from every panel to the closest end panel (admissible bounds)"""
+        if not end_panels:
+            return {}, {}
+
+        def edge_hop(u, v, edge_data):
+            return 1 if self._validate_connection(edge_data, constraints) else None
+
+        remaining_weight = nx.multi_source_dijkstra_path_length(
+            self.graph, end_panels, weight=self._edge_weight(constraints)
+        )
+        remaining_hops = nx.multi_source_dijkstra_path_length(
+            self.graph, end_panels, cutoff=constraints.max_hops, weight=edge_hop
+        )
+        return remaining_weight, remaining_hops
+
+    def _search_routes(
+        self,
+        start_panels: Set[str],
+        end_panels: Set[str],
+        constraints: RouteConstraints,
+        bounds: Optional[Tuple[Dict[str, float], Dict[str, int]]] = None,
+        trace: Optional[RouteTrace] = None,
+    ) -> Iterator[Tuple[List[Tuple[str, str]], float]]:
+        """
+        Best-first (A*) enumeration of simple paths from any start panel to any end panel.
+        Partial paths are expanded in order of weight so far plus the exact remaining
+        weight to the closest end panel, so complete routes come out in weight order
+        and the search stops as soon as the caller has enough routes.
+        Connections are validated against the constraints while expanding.
+        """
+        if not start_panels or not end_panels:
+            return
+
+        edge_weight = self._edge_weight(constraints)
+        max_hops = constraints.max_hops
+        remaining_weight, remaining_hops = bounds or self._remaining_bounds(end_panels, constraints)
+
+        counter = itertools.count()
+        queue = []
+        for start_panel_id in start_panels:
+            if start_panel_id in remaining_hops:
+                heapq.heappush(
+                    queue,
+                    (remaining_weight[start_panel_id], 0, 0, next(counter), (start_panel_id,)),
+                )
+
+        # Routes of equal weight are held back until no cheaper path remains,
+        # so they can be released ordered by number of hops
+        pending = []
+        pending_weight = None
+
+        while queue:
+            estimate, weight, hops, _, path = heapq.heappop(queue)
+            if trace is not None:
+                trace.count("pathsExpanded")
+
+            if pending and estimate > pending_weight:
+                yield from self._release_routes(pending)
+                pending = []
+
+            if hops > 0 and path[-1] in end_panels:
+                pending.append((path, weight))
+                pending_weight = weight
+
+            for neighbor, edge_data in self.graph[path[-1]].items():
+                if neighbor in path or neighbor not in remaining_hops:
+                    continue
+                if max_hops is not None and hops + 1 + remaining_hops[neighbor] > max_hops:
                     continue
 
-        # Remove duplicates while preserving order
-        seen_routes = set()
-        unique_routes = []
-        for route, weight in all_routes:
-            route_key = tuple(tuple(conn) for conn in route)
-            if route_key not in seen_routes:
-                seen_routes.add(route_key)
-                unique_routes.append((route, weight))
+                step = edge_weight(path[-1], neighbor, edge_data)
+                if step is None:
+                    continue
 
-        # Sort routes by total weight (priority) and length
-        unique_routes.sort(key=lambda x: (x[1], len(x[0])))
+                heapq.heappush(
+                    queue,
+                    (
+                        weight + step + remaining_weight[neighbor],
+                        weight + step,
+                        hops + 1,
+                        next(counter),
+                        path + (neighbor,),
+                    ),
+                )
 
-        # Apply room preferences if specified
-        if constraints.preferred_rooms:
-            unique_routes = self._filter_preferred_rooms(
-                unique_routes, constraints.preferred_rooms
-            )
+        yield from self._release_routes(pending)
 
-        return [
-            route for route, _ in unique_routes if route
-        ]  # Return only non-empty routes
+    @staticmethod
+    def _release_routes(paths) -> Iterator[Tuple[List[Tuple[str, str]], float]]:
+        for path, weight in sorted(paths, key=lambda item: len(item[0])):
+            yield [(path[i], path[i + 1]) for i in range(len(path) - 1)], weight
 
     def _validate_connection(
         self, edge_data: Dict, constraints: RouteConstraints
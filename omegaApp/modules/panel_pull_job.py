@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..db import get_db
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+# A job that hasn't reported progress for this long is considered dead
+# (e.g. its worker process was restarted) and no longer blocks new pulls
+STALE_AFTER_SECONDS = 300
+
+# Minimum interval between two progress writes of a running job
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+# Number of finished jobs kept in the pull_jobs table
+KEEP_JOBS = 20
+
+ACTIVE_STATUSES = ("pending", "running")
+
+SELECT_JOB = f"""
+    SELECT *, updated_at <= datetime('now', '-{STALE_AFTER_SECONDS} seconds') AS is_stale
+    FROM pull_jobs
+"""
+
+
+class PullJobProgress:
+    """Progress reporter handed to the job function, persists the job state"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.phase = "queued"
+        self.total = 0
+        self.fetched = 0
+        self.failed = 0
+        self._phase_started = time.monotonic()
+        self._last_write = 0.0
+
+    def set_phase(self, phase: str, total: Optional[int] = None):
+        """
+        Move the job to a new phase.
+        Counters restart only for phases that process a known number of items.
+        """
+        self.phase = phase
+        if total is not None:
+            self.fetched = 0
+            self.failed = 0
+            self.total = total
+            self._phase_started = time.monotonic()
+        self._write("running", force=True)
+
+    def advance(self, failed: bool = False):
+        """Report one more item processed in the current phase"""
+        self.fetched += 1
+        if failed:
+            self.failed += 1
+        self._write("running", force=self.fetched == self.total)
+
+    def eta_seconds(self) -> Optional[float]:
+        if not self.total or not self.fetched:
+            return None
+        elapsed = time.monotonic() - self._phase_started
+        return round(elapsed / self.fetched * (self.total - self.fetched), 1)
+
+    def finish(self, status: str, message: str, summary: Optional[Dict] = None, error: str = None):
+        get_db().execute(
+            """
+            UPDATE pull_jobs
+            SET status = ?, phase = ?, message = ?, summary = ?, error = ?, eta_seconds = NULL,
+                updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+            """,
+            (
+                status,
+                "done" if status == "completed" else self.phase,
+                message,
+                json.dumps(summary) if summary is not None else None,
+                error,
+                self.job_id,
+            ),
+        )
+        get_db().commit()
+
+    def _write(self, status: str, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_write = now
+
+        db = get_db()
+        db.execute(
+            """
+            UPDATE pull_jobs
+            SET status = ?, phase = ?, fetched = ?, total = ?, failed = ?, eta_seconds = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+            """,
+            (
+                status,
+                self.phase,
+                self.fetched,
+                self.total,
+                self.failed,
+                self.eta_seconds(),
+                self.job_id,
+            ),
+        )
+        db.commit()
+
+
+class PanelPullJobs:
+    """
+    Runs the DCIM panel pull in a background thread.
+    The job state is kept in the pull_jobs table so every worker sees the same
+    progress, and a pull requested while another one runs joins the running job.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PanelPullJobs, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._initialized = True
+
+    def start(self, app, work: Callable[[PullJobProgress], Dict[str, Any]]) -> Tuple[Dict, bool]:
+        """
+        Start a pull job unless one is already running.
+        :param app: Flask app, the job runs inside its app context
+        :param work: Function doing the pull, returns a dict with message and summary
+        :return: Tuple of (job state, whether a new job was started)
+        """
+        with self._lock:
+            job_id = str(uuid.uuid4())
+            db = get_db()
+
+            # Single statement, so two workers can't both start a job
+            cursor = db.execute(
+                """
+                INSERT INTO pull_jobs (job_id, status, phase)
+                SELECT ?, 'pending', 'queued'
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM pull_jobs
+                    WHERE status IN ('pending', 'running')
+                      AND updated_at > datetime('now', ?)
+                )
+                """,
+                (job_id, f"-{STALE_AFTER_SECONDS} seconds"),
+            )
+            if cursor.rowcount == 0:
+                db.commit()
+                return self.current(), False
+
+            db.execute(
+                """
+                UPDATE pull_jobs
+                SET status = 'failed', error = 'interrupted', finished_at = CURRENT_TIMESTAMP
+                WHERE status IN ('pending', 'running') AND job_id != ?
+                """,
+                (job_id,),
+            )
+            db.execute(
+                """
+                DELETE FROM pull_jobs
+                WHERE job_id NOT IN (
+                    SELECT job_id FROM pull_jobs ORDER BY started_at DESC, rowid DESC LIMIT ?
+                )
+                """,
+                (KEEP_JOBS,),
+            )
+            db.commit()
+
+        threading.Thread(target=self._run, args=(app, job_id, work), daemon=True).start()
+        logger.info(f"Started panel pull job {job_id}")
+        return self.get(job_id), True
+
+    def _run(self, app, job_id: str, work: Callable[[PullJobProgress], Dict[str, Any]]):
+        with app.app_context():
+            progress = PullJobProgress(job_id)
+            try:
+                progress.set_phase("starting")
+                result = work(progress)
+                progress.finish("completed", result.get("message", ""), result.get("summary"))
+                logger.info(f"Panel pull job {job_id} completed")
+            except Exception as e:
+                logger.error(f"Panel pull job {job_id} failed: {str(e)}", exc_info=True)
+                try:
+                    progress.finish("failed", f"שגיאה במשיכת המידע! {str(e)}", error=str(e))
+                except Exception as db_error:
+                    logger.error(f"Failed to update pull job {job_id} state: {db_error}")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = get_db().execute(f"{SELECT_JOB} WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def current(self) -> Optional[Dict]:
+        """State of the latest pull job, None if there never was one"""
+        row = get_db().execute(
+            f"{SELECT_JOB} ORDER BY started_at DESC, rowid DESC LIMIT 1"
+        ).fetchone()
+        return self._to_dict(row)
+
+    def is_running(self, job: Optional[Dict]) -> bool:
+        return bool(job) and job["status"] in ACTIVE_STATUSES and not job["stale"]
+
+    @staticmethod
+    def _to_dict(row) -> Optional[Dict]:
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["summary"] = json.loads(job["summary"]) if job["summary"] else None
+        job["stale"] = bool(job.pop("is_stale", 0))
+        return job
+
+
+panel_pull_jobs = PanelPullJobs()
@@ -0,0 +1,143 @@
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+
+PANEL_COLUMNS = """
+    panels.id, panels.dcim_id, panels.name, panels.room, panels.rack, panels.U,
+    panels.interface, panels.size, panels.status, panels.how_many_ports_remain,
+    panels.classification, panels.destination, panels.date_created, panels.date_updated
+"""
+
+# Page order, NULLs sort as empty strings so rows can be compared with a cursor.
+# Matches the idx_panels_order expression index.
+ORDER_KEY = "(COALESCE(room, ''), COALESCE(rack, ''), COALESCE(u, ''), id)"
+
+# bm25 weights of the panels_fts columns: name, destination, room, rack, interface
+SEARCH_RANK = "bm25(panels_fts, 10.0, 5.0, 2.0, 3.0, 1.0)"
+
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that weren't produced by encode_cursor"""
+    pass
+
+
+def encode_cursor(key: List) -> str:
+    """Opaque cursor holding the sort key of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, types: Tuple) -> List:
+    """Decode a cursor and check its key has the given types"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+    if (
+        not isinstance(key, list)
+        or len(key) != len(types)
+        or not all(isinstance(value, value_type) for value, value_type in zip(key, types))
+    ):
+        raise InvalidCursor("Invalid cursor")
+    return key
+
+
+def search_match(text: Optional[str]) -> Optional[str]:
+    """
+    FTS5 query for free text: every word must match, as a prefix.
+    Words are quoted so FTS5 operators typed by the user are matched literally.
+    """
+    words = (text or "").split()
+    if not words:
+        return None
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def panel_filter(body: Dict) -> Tuple[str, List, Optional[str]]:
+    """
+    WHERE clause of the get_panels filters (room, rack or free text)
+    :return: Tuple of (where clause, params, full-text match or None)
+    """
+    where = "WHERE deleted_at IS NULL"
+    params = []
+    match = None
+
+    filter_room = body.get("filterRoom")
+    filter_rack = body.get("filterRack")
+    filter_text = body.get("filterTextInput")
+
+    if filter_room and filter_rack:
+        where += " AND room = ? AND rack = ?"
+        params += [filter_room, filter_rack]
+    elif filter_room:
+        where += " AND room = ?"
+        params.append(filter_room)
+    elif filter_rack:
+        where += " AND rack = ?"
+        params.append(filter_rack)
+    else:
+        match = search_match(filter_text)
+        if match:
+            where += " AND id IN (SELECT rowid FROM panels_fts WHERE panels_fts MATCH ?)"
+            params.append(match)
+
+    return where, params, match
+
+
+def page_query(
+    where: str, params: List, page_size: int, cursor: Optional[str] = None
+) -> Tuple[str, List]:
+    """
+    Keyset-paginated SELECT of panels in (room, rack, U) order.
+    Fetches one extra row to tell whether there is a next page.
+    """
+    params = list(params)
+    if cursor:
+        key = decode_cursor(cursor, (str, str, str, int))
+        # The explicit bound on the first column lets SQLite seek the index
+        # instead of scanning it up to the cursor
+        where += f" AND COALESCE(room, '') >= ? AND {ORDER_KEY} > (?, ?, ?, ?)"
+        params += [key[0]] + key
+
+    query = f"""
+        SELECT {PANEL_COLUMNS}
+        FROM panels
+        {where}
+        ORDER BY {ORDER_KEY[1:-1]}
+        LIMIT ?
+    """
+    return query, params + [page_size + 1]
+
+
+def search_page_query(
+    match: str, page_size: int, cursor: Optional[str] = None
+) -> Tuple[str, List]:
+    """
+    Keyset-paginated full-text search, best matches first.
+    Fetches one extra row to tell whether there is a next page.
+    """
+    params = [match]
+    after = ""
+    if cursor:
+        after = "WHERE (search_rank, id) > (?, ?)"
+        params += decode_cursor(cursor, ((int, float), int))
+
+    query = f"""
+        SELECT * FROM (
+            SELECT {PANEL_COLUMNS}, {SEARCH_RANK} AS search_rank
+            FROM panels_fts
+            JOIN panels ON panels.id = panels_fts.rowid
+            WHERE panels_fts MATCH ? AND panels.deleted_at IS NULL
+        )
+        {after}
+        ORDER BY search_rank, id
+        LIMIT ?
+    """
+    return query, params + [page_size + 1]
+
+
+def cursor_after(row, match: Optional[str] = None) -> str:
+    """Cursor of the page following the given row"""
+    if match:
+        return encode_cursor([row["search_rank"], row["id"]])
+    return encode_cursor([row["room"] or "", row["rack"] or "", str(row["U"] or ""), row["id"]])
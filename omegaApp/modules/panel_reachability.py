@@ -0,0 +1,335 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app
+
+from .panel_graph_cache import PartitionKey, panel_graph_cache, partition_key
+from .panel_networkX import (
+    CABINET_WINDOW,
+    ClassificationType,
+    DataCenterMap,
+    InterfaceType,
+    RouteConstraints,
+)
+from ..db import get_data_version
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+# Highest hop limit answered by the index, same as the find_routes maxHops limit
+MAX_INDEX_HOPS = 10
+
+# The index answers "is there any route" questions, a single free port is enough
+INDEX_MIN_PORTS = 1
+
+INDEX_FORMAT = 1
+
+
+def rack_spine(rack: str) -> str:
+    """First part of a rack name, "A01" of "A01-C02". Routes are searched between spines."""
+    return rack.split("-")[0]
+
+
+def rack_cabinet(rack: str) -> Optional[int]:
+    """Cabinet number of a rack name, parsed the same way as for direct routes"""
+    try:
+        return int(rack.split("-")[1][1:])
+    except (IndexError, ValueError):
+        return None
+
+
+def partition_constraints(key: PartitionKey) -> RouteConstraints:
+    """Route constraints of the index of a partition"""
+    interface_type, classification = key
+    return RouteConstraints(
+        interface_type=InterfaceType(interface_type),
+        min_free_ports=INDEX_MIN_PORTS,
+        classification=(
+            ClassificationType(classification.upper())
+            if classification and classification != "red+black"
+            else None
+        ),
+        max_hops=MAX_INDEX_HOPS,
+    )
+
+
+def map_fingerprint(dc_map: DataCenterMap) -> str:
+    """Hash of everything in a map that routes depend on"""
+    digest = hashlib.sha1()
+    for panel_id in sorted(dc_map.panels):
+        panel = dc_map.panels[panel_id]
+        digest.update(
+            repr((
+                panel_id,
+                dc_map.ranks[panel_id],
+                panel.location.get_rack_identifier(),
+                panel.destination,
+                panel.interface_type.value,
+                panel.classification.value if panel.classification else None,
+                panel.status,
+                panel.how_many_ports_remain,
+            )).encode("utf-8")
+        )
+    return digest.hexdigest()
+
+
+class ReachabilityIndex:
+    """
+    Minimum route weight between every pair of spines of one partition.
+
+    The routing engine picks its start and end panels by spine, so racks are
+    contracted to their spine without losing anything. Only direct routes depend
+    on the exact end rack, they are kept per destination rack and per cabinet.
+    """
+
+    def __init__(self, key: PartitionKey, version: int, fingerprint: str):
+        self.key = key
+        self.version = version
+        self.fingerprint = fingerprint
+        # (start spine, end spine) -> [(hops, weight)] breakpoints of multi_hop_weights
+        self.routes: Dict[Tuple[str, str], List[Tuple[int, float]]] = {}
+        # start spine -> destination racks of its panels (direct routes of weight 1)
+        self.direct_racks: Dict[str, Set[str]] = defaultdict(set)
+        # (start spine, end spine) -> cabinet -> weight of the best direct route
+        self.direct_cabinets: Dict[Tuple[str, str], Dict[int, int]] = defaultdict(dict)
+
+    @classmethod
+    def build(cls, key: PartitionKey, dc_map: DataCenterMap, version: int, fingerprint: str):
+        index = cls(key, version, fingerprint)
+        constraints = partition_constraints(key)
+
+        table = dc_map.table
+        available = table.select(
+            table.available_mask(constraints.interface_type, constraints.min_free_ports)
+        )
+        start_spines, end_spines = set(), set()
+
+        for panel_id in available:
+            panel = dc_map.panels[panel_id]
+            start_spine = rack_spine(panel.location.get_rack_identifier())
+            end_spine = rack_spine(panel.destination)
+            start_spines.add(start_spine)
+            end_spines.add(end_spine)
+
+            index.direct_racks[start_spine].add(panel.destination)
+            destination_cabinet = rack_cabinet(panel.destination)
+            if destination_cabinet is None:
+                continue
+            cabinets = index.direct_cabinets[(start_spine, end_spine)]
+            for cabinet in range(
+                destination_cabinet - CABINET_WINDOW, destination_cabinet + CABINET_WINDOW + 1
+            ):
+                weight = 1 + abs(destination_cabinet - cabinet)
+                if weight < cabinets.get(cabinet, weight + 1):
+                    cabinets[cabinet] = weight
+
+        # One multi-source Dijkstra per end spine, shared by all of its start spines
+        search_cache = {}
+        for end_spine in end_spines:
+            for start_spine in start_spines:
+                breakpoints = dc_map.multi_hop_weights(
+                    start_spine, end_spine, constraints, search_cache
+                )
+                if breakpoints:
+                    index.routes[(start_spine, end_spine)] = breakpoints
+
+        return index
+
+    def lookup(self, start_rack: str, end_rack: str, max_hops: int) -> Dict:
+        """Best route weight between two racks, same as the first route of find_routes"""
+        start_spine, end_spine = rack_spine(start_rack), rack_spine(end_rack)
+        best = None  # (weight, hops)
+
+        if end_rack in self.direct_racks.get(start_spine, ()):
+            best = (1, 1)
+        else:
+            end_cabinet = rack_cabinet(end_rack)
+            cabinets = self.direct_cabinets.get((start_spine, end_spine))
+            if end_cabinet is not None and cabinets and end_cabinet in cabinets:
+                best = (cabinets[end_cabinet], 1)
+
+        for hops, weight in reversed(self.routes.get((start_spine, end_spine), ())):
+            if hops <= max_hops:
+                if best is None or (weight, hops) < best:
+                    best = (weight, hops)
+                break
+
+        return {
+            "reachable": best is not None,
+            "minWeight": best[0] if best else None,
+            "hops": best[1] if best else None,
+        }
+
+    def to_json(self) -> Dict:
+        return {
+            "format": INDEX_FORMAT,
+            "partition": list(self.key),
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "routes": [
+                [start_spine, end_spine, breakpoints]
+                for (start_spine, end_spine), breakpoints in self.routes.items()
+            ],
+            "directRacks": {spine: sorted(racks) for spine, racks in self.direct_racks.items()},
+            "directCabinets": [
+                [start_spine, end_spine, sorted(cabinets.items())]
+                for (start_spine, end_spine), cabinets in self.direct_cabinets.items()
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "ReachabilityIndex":
+        if data.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported reachability index format {data.get('format')}")
+
+        index = cls(tuple(data["partition"]), data["version"], data["fingerprint"])
+        for start_spine, end_spine, breakpoints in data["routes"]:
+            index.routes[(start_spine, end_spine)] = [tuple(point) for point in breakpoints]
+        for spine, racks in data["directRacks"].items():
+            index.direct_racks[spine] = set(racks)
+        for start_spine, end_spine, cabinets in data["directCabinets"]:
+            index.direct_cabinets[(start_spine, end_spine)] = dict(cabinets)
+        return index
+
+
+class RackReachability:
+    """
+    Reachability indexes of the partitions, kept in memory and persisted as
+    JSON files so they survive restarts.
+    An index only answers for the panels data version it was built at. Newer
+    versions are handled by a background rebuild, which skips the route
+    searches when the partition's panels didn't change.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RackReachability, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._indexes: Dict[PartitionKey, ReachabilityIndex] = {}
+        self._building: Set[PartitionKey] = set()
+        self._initialized = True
+
+    def lookup(
+        self,
+        interface_type: str,
+        classification: Optional[str],
+        start_rack: str,
+        end_rack: str,
+        max_hops: int,
+    ) -> Optional[Dict]:
+        """
+        Indexed answer for a rack pair, None when the index of the partition is
+        missing or out of date (a rebuild is then started in the background)
+        """
+        key = partition_key(interface_type, classification)
+        version = get_data_version("panels")
+
+        index = self._get(key)
+        if index is None or index.version != version:
+            self.refresh(current_app._get_current_object(), [key])
+            return None
+
+        result = index.lookup(start_rack, end_rack, max_hops)
+        result["dataVersion"] = version
+        return result
+
+    def refresh(self, app, keys: Optional[Iterable[PartitionKey]] = None):
+        """Rebuild the given partitions (all loaded ones by default) in background threads"""
+        with self._lock:
+            keys = [
+                key for key in (keys if keys is not None else list(self._indexes))
+                if key not in self._building
+            ]
+            self._building.update(keys)
+
+        for key in keys:
+            threading.Thread(target=self._run, args=(app, key), daemon=True).start()
+
+    def build(self, key: PartitionKey) -> ReachabilityIndex:
+        """Bring the index of a partition up to date, inside the app context"""
+        version = get_data_version("panels")
+        current = self._get(key)
+
+        interface_type, classification = key
+        with panel_graph_cache.checkout(interface_type, classification) as cached_map:
+            fingerprint = map_fingerprint(cached_map)
+            # Checked out maps never change, the search runs unlocked on this one
+            dc_map = None if current and current.fingerprint == fingerprint else cached_map
+
+        if dc_map is None:
+            index = ReachabilityIndex(key, version, fingerprint)
+            index.routes = current.routes
+            index.direct_racks = current.direct_racks
+            index.direct_cabinets = current.direct_cabinets
+            logger.info(f"Reachability index {key} unchanged at data version {version}")
+        else:
+            index = ReachabilityIndex.build(key, dc_map, version, fingerprint)
+            logger.info(
+                f"Built reachability index {key} at data version {version}: "
+                f"{len(index.routes)} connected spine pairs"
+            )
+
+        self._save(index)
+        with self._lock:
+            self._indexes[key] = index
+        return index
+
+    def _run(self, app, key: PartitionKey):
+        with app.app_context():
+            try:
+                self.build(key)
+            except Exception as e:
+                logger.error(f"Failed to build reachability index {key}: {str(e)}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._building.discard(key)
+
+    def _get(self, key: PartitionKey) -> Optional[ReachabilityIndex]:
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is not None:
+            return index
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = ReachabilityIndex.from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring reachability index file {path}: {str(e)}")
+            return None
+
+        with self._lock:
+            return self._indexes.setdefault(key, index)
+
+    def _save(self, index: ReachabilityIndex):
+        path = self._path(index.key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so readers never see a partial file
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index.to_json(), f)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _path(key: PartitionKey) -> str:
+        name = "_".join(re.sub(r"[^\w+-]", "", part) or "any" for part in key)
+        return os.path.join(current_app.config["REACHABILITY_DIR"], f"{name}.json")
+
+
+rack_reachability = RackReachability()
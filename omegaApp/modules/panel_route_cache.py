@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from flask import current_app
+
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+DEFAULT_ROUTE_CACHE_SIZE = 256
+DEFAULT_ROUTE_CACHE_TTL = 300
+
+
+class RouteResultCache:
+    """
+    LRU cache of formatted find_routes results with a time to live.
+    Entries belong to one panels data version, all of them are dropped as soon
+    as a lookup is made with a newer version.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(RouteResultCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._initialized = True
+
+    def _check_version(self, version: int) -> bool:
+        """Drop the entries of an older version, False if the given version is the older one"""
+        if self._version is not None and version < self._version:
+            return False
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+        return True
+
+    def get(self, version: int, key: Hashable) -> Optional[Any]:
+        ttl = current_app.config.get("ROUTE_CACHE_TTL", DEFAULT_ROUTE_CACHE_TTL)
+        with self._lock:
+            entry = self._entries.get(key) if self._check_version(version) else None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at > ttl:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version: int, key: Hashable, value: Any):
+        max_size = current_app.config.get("ROUTE_CACHE_SIZE", DEFAULT_ROUTE_CACHE_SIZE)
+        with self._lock:
+            if not self._check_version(version):
+                return
+
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": round(self.hits / lookups, 3) if lookups else 0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxSize": current_app.config.get("ROUTE_CACHE_SIZE", DEFAULT_ROUTE_CACHE_SIZE),
+                "ttl": current_app.config.get("ROUTE_CACHE_TTL", DEFAULT_ROUTE_CACHE_TTL),
+                "dataVersion": self._version,
+            }
+
+
+route_result_cache = RouteResultCache()
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from typing import Optional, Tuple
+
+from flask import current_app
+
+from .panel_table import PanelRowTable
+from ..db import get_db, get_data_version
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+STATS_QUERY = """
+    SELECT
+        room, rack, interface, classification, destination,
+        is_active, size_units, ports_free,
+        strftime('%Y-%m', date_created) as month
+    FROM panels
+    WHERE deleted_at IS NULL
+"""
+
+
+class PanelStatsCache:
+    """
+    Panel statistics computed in one scan of the panels table and kept in memory
+    until the panels data version changes.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PanelStatsCache, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._payload: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self._initialized = True
+
+    def get(self) -> Tuple[bytes, str]:
+        """
+        Statistics of the current panels
+        :return: Tuple of (JSON payload, ETag of the payload)
+        """
+        version = get_data_version("panels")
+        with self._lock:
+            if self._version == version:
+                return self._payload, self._etag
+
+            rows = get_db().execute(STATS_QUERY).fetchall()
+            table = PanelRowTable(rows)
+
+            # Serialised with the app JSON provider, same as jsonify
+            payload = current_app.json.dumps({
+                'roomStats': table.room_stats(),
+                'typeStats': table.type_stats(),
+                'classificationStats': table.classification_stats(),
+                'timeStats': table.time_stats(),
+                'summaryStats': table.summary_stats()
+            }).encode("utf-8")
+
+            self._version = version
+            self._payload = payload
+            self._etag = hashlib.sha1(payload).hexdigest()
+            logger.info(f"Panel statistics recomputed for data version {version}")
+            return self._payload, self._etag
+
+
+panel_stats_cache = PanelStatsCache()
@@ -0,0 +1,118 @@
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional
+
+from .panel_table import parse_ports_remain, parse_size
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+# Panel fields imported from DCIM, in the order of the UPSERT columns
+SYNC_FIELDS = (
+    "name",
+    "room",
+    "rack",
+    "U",
+    "interface",
+    "size",
+    "status",
+    "how_many_ports_remain",
+    "classification",
+    "destination",
+)
+
+# Typed copies of status, size and how_many_ports_remain, kept for indexing and aggregation
+TYPED_FIELDS = ("is_active", "size_units", "ports_free")
+
+UPSERT_PANEL = f"""
+    INSERT INTO panels (dcim_id, {", ".join(SYNC_FIELDS + TYPED_FIELDS)}, content_hash, deleted_at)
+    VALUES (?, {", ".join("?" for _ in SYNC_FIELDS + TYPED_FIELDS)}, ?, NULL)
+    ON CONFLICT(dcim_id) DO UPDATE SET
+        {", ".join(f"{field} = excluded.{field}" for field in SYNC_FIELDS + TYPED_FIELDS)},
+        content_hash = excluded.content_hash,
+        deleted_at = NULL,
+        date_updated = CURRENT_TIMESTAMP
+"""
+
+TOMBSTONE_PANEL = """
+    UPDATE panels
+    SET deleted_at = CURRENT_TIMESTAMP, date_updated = CURRENT_TIMESTAMP
+    WHERE dcim_id = ?
+"""
+
+
+def typed_columns(panel: Dict) -> tuple:
+    """Values of TYPED_FIELDS for a panel with text status, size and how_many_ports_remain"""
+    return (
+        1 if str(panel.get("status")) in ("True", "1") else 0,
+        parse_size(panel.get("size")),
+        parse_ports_remain(panel.get("how_many_ports_remain")),
+    )
+
+
+def content_hash(panel: Dict) -> str:
+    """Stable hash of the imported fields of a panel"""
+    values = [panel.get(field) for field in SYNC_FIELDS]
+    return hashlib.sha1(json.dumps(values, default=str).encode("utf-8")).hexdigest()
+
+
+def sync_panels(db, panels: List[Dict], present_ids: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Write the panels imported from DCIM, touching only rows that really changed.
+
+    :param db: Database connection
+    :param panels: Panel items as built by create_patch_panel_item
+    :param present_ids: All dcim_ids currently in DCIM. Existing panels missing
+        from it are tombstoned. Nothing is tombstoned when it is None or empty.
+    :return: Diff summary with added, changed, removed and unchanged dcim_ids counts
+    """
+    existing = {
+        row["dcim_id"]: (row["content_hash"], row["deleted_at"])
+        for row in db.execute(
+            "SELECT dcim_id, content_hash, deleted_at FROM panels WHERE dcim_id IS NOT NULL"
+        ).fetchall()
+    }
+
+    added, changed, unchanged = [], [], []
+    upserts = []
+    for panel in panels:
+        dcim_id = panel.get("dcim_id")
+        if not dcim_id:
+            continue
+
+        panel_hash = content_hash(panel)
+        current = existing.get(dcim_id)
+        if current is None:
+            added.append(dcim_id)
+        elif current[0] == panel_hash and current[1] is None:
+            unchanged.append(dcim_id)
+            continue
+        else:
+            changed.append(dcim_id)
+
+        upserts.append(
+            (dcim_id, *(panel.get(field) for field in SYNC_FIELDS), *typed_columns(panel), panel_hash)
+        )
+
+    removed = []
+    present_ids = set(present_ids or ())
+    if present_ids:
+        removed = [
+            dcim_id
+            for dcim_id, (_, deleted_at) in existing.items()
+            if deleted_at is None and dcim_id not in present_ids
+        ]
+
+    with db:
+        db.executemany(UPSERT_PANEL, upserts)
+        db.executemany(TOMBSTONE_PANEL, [(dcim_id,) for dcim_id in removed])
+
+    summary = {
+        "added": len(added),
+        "changed": len(changed),
+        "removed": len(removed),
+        "unchanged": len(unchanged),
+    }
+    logger.info(f"Panels sync: {summary}")
+
+    return {**summary, "changed_ids": added + changed + removed}
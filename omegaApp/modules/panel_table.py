@@ -0,0 +1,355 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .panel_networkX import Panel, InterfaceType, ClassificationType, parse_rack_name
+
+PORTS_PER_PANEL = 24
+
+
+class Categories:
+    """Maps strings to dense integer codes, None is encoded as -1"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value: Optional[str]) -> int:
+        """Code of an existing value, -2 (matches nothing) for unknown values"""
+        if value is None:
+            return -1
+        return self._codes.get(value, -2)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _enum_code(value, enum_type) -> int:
+    return list(enum_type).index(value) if value is not None else -1
+
+
+def _lookup(flags: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Index a per-category array with codes, -1 (None) maps to False/0"""
+    return np.append(flags, flags.dtype.type(0))[codes]
+
+
+def _distinct_per_group(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Number of distinct non-null values in each group"""
+    valid = (groups >= 0) & (values >= 0)
+    pairs = np.unique(np.stack([groups[valid], values[valid]], axis=1), axis=0)
+    return np.bincount(pairs[:, 0], minlength=n_groups) if len(pairs) else np.zeros(n_groups, dtype=np.int64)
+
+
+class PanelTable:
+    """
+    Columnar view of the routing panels of a DataCenterMap.
+    Rack names are parsed once when the table is built, candidate panels are
+    then selected with vectorised masks.
+    """
+
+    def __init__(self, panels: Iterable[Panel]):
+        panels = list(panels)
+        self.ids = np.array([p.id for p in panels], dtype=object)
+
+        self.racks = Categories()
+        self.prefixes = Categories()  # First part of a rack name, "A01" of "A01-C02"
+        self.spines = Categories()
+
+        rack, rack_prefix, destination, destination_prefix = [], [], [], []
+        spine, cabinet, destination_spine, destination_cabinet = [], [], [], []
+        for p in panels:
+            rack_name = p.location.get_rack_identifier()
+            rack.append(self.racks.encode(rack_name))
+            rack_prefix.append(self.prefixes.encode(rack_name.split("-")[0]))
+            destination.append(self.racks.encode(p.destination))
+            destination_prefix.append(self.prefixes.encode(p.destination.split("-")[0]))
+
+            location_spine, location_cabinet = parse_rack_name(rack_name)
+            spine.append(self.spines.encode(location_spine))
+            cabinet.append(location_cabinet)
+            dest_spine, dest_cabinet = parse_rack_name(p.destination)
+            destination_spine.append(self.spines.encode(dest_spine))
+            destination_cabinet.append(dest_cabinet)
+
+        self.rack = np.array(rack, dtype=np.int32)
+        self.rack_prefix = np.array(rack_prefix, dtype=np.int32)
+        self.destination = np.array(destination, dtype=np.int32)
+        self.destination_prefix = np.array(destination_prefix, dtype=np.int32)
+        self.spine = np.array(spine, dtype=np.int32)
+        self.cabinet = np.array(cabinet, dtype=np.int32)
+        self.destination_spine = np.array(destination_spine, dtype=np.int32)
+        self.destination_cabinet = np.array(destination_cabinet, dtype=np.int32)
+        self.interface = np.array(
+            [_enum_code(p.interface_type, InterfaceType) for p in panels], dtype=np.int8
+        )
+        self.classification = np.array(
+            [_enum_code(p.classification, ClassificationType) for p in panels], dtype=np.int8
+        )
+        self.free_ports = np.array([p.how_many_ports_remain for p in panels], dtype=np.int64)
+        self.status = np.array([bool(p.status) for p in panels], dtype=bool)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def available_mask(self, interface_type: Optional[InterfaceType], min_free_ports: int) -> np.ndarray:
+        """Panels of the interface type that are available with enough free ports"""
+        return (
+            (self.interface == _enum_code(interface_type, InterfaceType))
+            & self.status
+            & (self.free_ports > 0)
+            & (self.free_ports >= min_free_ports)
+        )
+
+    def located_in(self, rack: str) -> np.ndarray:
+        """Panels located in the rack or in the same spine"""
+        return (self.rack == self.racks.code(rack)) | (
+            self.rack_prefix == self.prefixes.code(rack.split("-")[0])
+        )
+
+    def leading_to(self, rack: str) -> np.ndarray:
+        """Panels whose destination is the rack or in the same spine"""
+        return (self.destination == self.racks.code(rack)) | (
+            self.destination_prefix == self.prefixes.code(rack.split("-")[0])
+        )
+
+    def select(self, mask: np.ndarray) -> set:
+        return set(self.ids[mask])
+
+
+def parse_ports_remain(value: Optional[str]) -> int:
+    """Total free ports of a how_many_ports_remain value like "A01-C03: 12, A02-C01: 4" or "12" """
+    available_ports = 0
+    if value:
+        for entry in value.split(','):
+            entry = entry.strip()
+            if ':' in entry:  # Format: "ROOM:24"
+                port_num = entry.split(':')[1].strip()
+                if port_num.isdigit():
+                    available_ports += int(port_num)
+            elif entry.isdigit():  # Simple number
+                available_ports += int(entry)
+    return available_ports
+
+
+def parse_size(value) -> int:
+    """Same as CAST(COALESCE(NULLIF(size, ''), '0') AS INTEGER)"""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = ""
+    for i, char in enumerate(str(value).strip()):
+        if char.isdigit() or (i == 0 and char in "+-"):
+            digits += char
+        else:
+            break
+    try:
+        return int(digits)
+    except ValueError:
+        return 0
+
+
+class PanelRowTable:
+    """
+    Columnar copy of panels table rows used for statistics.
+    Expects rows with room, rack, interface, classification, destination,
+    month and the typed is_active, size_units and ports_free columns.
+    """
+
+    def __init__(self, rows: Iterable):
+        self.rooms = Categories()
+        self.racks = Categories()
+        self.interfaces = Categories()
+        self.classifications = Categories()
+        self.destinations = Categories()
+        self.months = Categories()
+
+        room, rack, interface, classification, destination, month = [], [], [], [], [], []
+        status, size, ports_remain = [], [], []
+        for row in rows:
+            room.append(self.rooms.encode(row["room"]))
+            rack.append(self.racks.encode(row["rack"]))
+            interface.append(self.interfaces.encode(row["interface"]))
+            classification.append(self.classifications.encode(row["classification"]))
+            # Empty destinations are not counted as destinations
+            destination.append(self.destinations.encode(row["destination"] or None))
+            month.append(self.months.encode(row["month"]))
+            status.append(row["is_active"])
+            size.append(row["size_units"])
+            ports_remain.append(row["ports_free"])
+
+        self.room = np.array(room, dtype=np.int32)
+        self.rack = np.array(rack, dtype=np.int32)
+        self.interface = np.array(interface, dtype=np.int32)
+        self.classification = np.array(classification, dtype=np.int32)
+        self.destination = np.array(destination, dtype=np.int32)
+        self.month = np.array(month, dtype=np.int32)
+        self.active = np.array(status, dtype=bool)
+        self.size = np.array(size, dtype=np.int64)
+        self.ports_remain = np.array(ports_remain, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.room)
+
+    def interface_mask(self, prefix: str) -> np.ndarray:
+        """Same as interface LIKE 'prefix%' (case insensitive)"""
+        flags = np.array([value.upper().startswith(prefix) for value in self.interfaces.values], dtype=bool)
+        return _lookup(flags, self.interface)
+
+    def room_stats(self) -> Dict[str, Dict]:
+        n_rooms = len(self.rooms)
+        room = self.room
+        has_room = room >= 0
+        grouped = room[has_room]
+
+        def per_room(weights=None):
+            return np.bincount(grouped, weights=None if weights is None else weights[has_room], minlength=n_rooms)
+
+        panel_count = per_room()
+        active = per_room(self.active)
+        available = per_room(self.ports_remain)
+        size_sum = per_room(self.size)
+        min_size = np.full(n_rooms, np.iinfo(np.int64).max)
+        max_size = np.full(n_rooms, np.iinfo(np.int64).min)
+        np.minimum.at(min_size, grouped, self.size[has_room])
+        np.maximum.at(max_size, grouped, self.size[has_room])
+        mm_count = per_room(self.interface_mask("MM"))
+        sm_count = per_room(self.interface_mask("SM"))
+        rj_count = per_room(self.interface_mask("RJ"))
+        rack_count = _distinct_per_group(room, self.rack, n_rooms)
+        classification_count = _distinct_per_group(room, self.classification, n_rooms)
+        destinations_count = _distinct_per_group(room, self.destination, n_rooms)
+
+        room_stats = {}
+        # Sorted by panel count, like ORDER BY panel_count DESC
+        for code in np.argsort(-panel_count, kind="stable"):
+            count = int(panel_count[code])
+            if count == 0:
+                continue
+            total_ports = count * PORTS_PER_PANEL
+            available_ports = int(available[code])
+            used_ports = total_ports - available_ports
+            port_utilization = (used_ports / total_ports * 100) if total_ports > 0 else 0
+            in_room = room == code
+            avg_size = size_sum[code] / count
+
+            room_stats[self.rooms.values[code]] = {
+                'panelCount': count,
+                'activePanels': int(active[code]),
+                'totalPorts': total_ports,
+                'usedPorts': used_ports,
+                'availablePorts': available_ports,
+                'rackCount': int(rack_count[code]),
+                'classificationCount': int(classification_count[code]),
+                'avgSize': round(float(avg_size), 1) if avg_size else 0,
+                'minSize': int(min_size[code]) or 0,
+                'maxSize': int(max_size[code]) or 0,
+                'interfaces': self._distinct_values(self.interfaces, self.interface[in_room]),
+                'classifications': self._distinct_values(self.classifications, self.classification[in_room]),
+                'mmCount': int(mm_count[code]),
+                'smCount': int(sm_count[code]),
+                'rjCount': int(rj_count[code]),
+                'destinationsCount': int(destinations_count[code]),
+                'portUtilization': round(port_utilization, 1)
+            }
+
+        return room_stats
+
+    def type_stats(self) -> Dict[str, Dict]:
+        """Interface type statistics with classification breakdown"""
+        has_interface = self.interface >= 0
+        pairs, inverse = np.unique(
+            np.stack([self.interface[has_interface], self.classification[has_interface]], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        inverse = inverse.reshape(-1)
+        type_count = np.bincount(inverse, minlength=len(pairs))
+        active_count = np.bincount(inverse, weights=self.active[has_interface], minlength=len(pairs))
+
+        type_stats = {}
+        for (interface_code, classification_code), count, active in zip(pairs, type_count, active_count):
+            interface = self.interfaces.values[interface_code] or 'לא מוגדר'
+            if interface not in type_stats:
+                type_stats[interface] = {
+                    'total': 0,
+                    'active': 0,
+                    'classifications': {}
+                }
+            type_stats[interface]['total'] += int(count)
+            type_stats[interface]['active'] += int(active)
+            classification = self.classifications.values[classification_code] if classification_code >= 0 else None
+            if classification:
+                type_stats[interface]['classifications'][classification] = int(count)
+
+        return type_stats
+
+    def classification_stats(self) -> Dict[str, Dict]:
+        n_classifications = len(self.classifications)
+        classification = self.classification
+        has_classification = classification >= 0
+        grouped = classification[has_classification]
+
+        count = np.bincount(grouped, minlength=n_classifications)
+        active = np.bincount(grouped, weights=self.active[has_classification], minlength=n_classifications)
+        room_count = _distinct_per_group(classification, self.room, n_classifications)
+        rack_count = _distinct_per_group(classification, self.rack, n_classifications)
+
+        return {
+            value: {
+                'count': int(count[code]),
+                'roomCount': int(room_count[code]),
+                'rackCount': int(rack_count[code]),
+                'activeCount': int(active[code])
+            }
+            for code, value in enumerate(self.classifications.values)
+            if count[code]
+        }
+
+    def time_stats(self, months: int = 12) -> Dict[Optional[str], int]:
+        """Panels added per month, latest months first"""
+        counts = np.bincount(self.month + 1, minlength=len(self.months) + 1)
+        entries = [(None, int(counts[0]))] if counts[0] else []
+        entries += [(value, int(counts[code + 1])) for code, value in enumerate(self.months.values)]
+        entries.sort(key=lambda entry: (entry[0] is not None, entry[0] or ""), reverse=True)
+        return dict(entries[:months])
+
+    def summary_stats(self) -> Dict:
+        total_panels = len(self)
+        total_ports = total_panels * PORTS_PER_PANEL
+        available_ports = int(self.ports_remain.sum())
+        used_ports = total_ports - available_ports
+        avg_panel_size = float(self.size.mean()) if total_panels else None
+
+        return {
+            'totalPanels': total_panels,
+            'activePanels': int(self.active.sum()),
+            'totalRooms': self._distinct_count(self.room),
+            'totalRacks': self._distinct_count(self.rack),
+            'totalClassifications': self._distinct_count(self.classification),
+            'totalInterfaces': self._distinct_count(self.interface),
+            'avgPanelSize': round(avg_panel_size, 1) if avg_panel_size else 0,
+            'ports': {
+                'total': total_ports,
+                'used': used_ports,
+                'available': available_ports,
+                'utilization': round(((used_ports) / total_ports * 100), 1) if total_ports > 0 else 0
+            }
+        }
+
+    @staticmethod
+    def _distinct_count(codes: np.ndarray) -> int:
+        return int(len(np.unique(codes[codes >= 0])))
+
+    @staticmethod
+    def _distinct_values(categories: Categories, codes: np.ndarray) -> List[str]:
+        return [categories.values[code] for code in np.unique(codes[codes >= 0]) if categories.values[code]]
@@ -1,26 +1,97 @@
+import gc
+import hashlib
 import json
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from flask import current_app
 from ..logger_manager import LoggerManager
 from .dcim_analyzer import DCIMAnalyzer
 from .dcim_client import DCIMClient
+from .server_dcim_cache import DEFAULT_MATCH_TTL, PENDING_STATUS, DCIMMatchCache
+from .server_index import RANGE_FIELDS, SORT_FIELDS, VALUE_FIELDS, ServerIndex
+from .server_inventory import READ_CHUNK_SIZE, ServerRecord, iter_json_object
 
 # Get logger from LoggerManager
 logger = LoggerManager().get_logger()
 
+# A changed file is reloaded once it had no events for this long
+RELOAD_DEBOUNCE_SECONDS = 0.5
+
+# Times a file that fails to parse (e.g. still being written) is retried
+RELOAD_RETRIES = 3
+
+# Allocations between collections of the youngest generation during the initial load
+INITIAL_LOAD_GC_THRESHOLD = 100000
+
+# Fields filled from the DCIM match cache
+DCIM_FIELDS = ("dcim_status", "dcim_differences", "dcim_data")
+
 class ServerDataManager:
-    def __init__(self, data_directory: str, dcim_client=None):
+    def __init__(
+        self,
+        data_directory: str,
+        dcim_client=None,
+        dcim_match_ttl: float = DEFAULT_MATCH_TTL,
+        load_workers: int = 1,
+        load_in_background: bool = False,
+    ):
+        """
+        :param load_workers: Number of processes parsing the data files at the initial load
+        :param load_in_background: Whether the initial load runs in a background thread,
+                                   see load_status() for its progress
+        """
         self.data_directory = Path(data_directory)
-        self.servers_data: Dict[str, Dict] = {}
+        self.servers_data: Dict[str, ServerRecord] = {}
         self.dcim_client = dcim_client
         self.dcim_analyzer = DCIMAnalyzer(self.dcim_client) if self.dcim_client else None
+        self.dcim_matches = DCIMMatchCache(ttl=dcim_match_ttl)
+        self.index = ServerIndex()
+
+        # servers_data is replaced, never changed in place, so readers can iterate it freely
+        self._data_lock = threading.Lock()
+        self._file_servers: Dict[str, Dict[str, ServerRecord]] = {}  # file -> servers loaded from it
+        self._file_hashes: Dict[str, str] = {}
+
+        self._reload_cond = threading.Condition()
+        self._pending_reloads: Dict[str, Tuple[float, float]] = {}  # file -> (first event, last event)
+        self._reload_attempts: Dict[str, int] = {}
+        self._reload_stats = {
+            "events": 0,
+            "reloads": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "files_removed": 0,
+            "servers_added": 0,
+            "servers_updated": 0,
+            "servers_removed": 0,
+            "last_reload_ms": None,
+            "max_reload_ms": None,
+        }
+
+        self.load_workers = load_workers
+        self._status_lock = threading.Lock()
+        self._load_status = {
+            "state": "loading",
+            "files_total": None,
+            "files_loaded": 0,
+            "files_failed": 0,
+            "elapsed_ms": None,
+        }
+        self._load_started = time.monotonic()
         
         try:
             self._setup_file_watcher()
-            self.load_all_data()
+            if load_in_background:
+                threading.Thread(target=self._initial_load, daemon=True).start()
+            else:
+                self._initial_load()
         except Exception as e:
             logger.error(f"Error initializing ServerDataManager: {str(e)}")
 
@@ -31,6 +102,8 @@ class ServerDataManager:
                 self.data_directory.mkdir(parents=True, exist_ok=True)
                 logger.info(f"Created data directory at {self.data_directory}")
 
+            threading.Thread(target=self._reload_loop, daemon=True).start()
+
             event_handler = ServerDataFileHandler(self)
             self.observer = Observer()
             self.observer.schedule(event_handler, str(self.data_directory), recursive=False)
@@ -40,25 +113,75 @@ class ServerDataManager:
             logger.error(f"Error setting up file watcher: {str(e)}")
             # Don't re-raise the exception, just log it
 
-    def load_all_data(self):
-        """Load all JSON files from the data directory"""
+    def _initial_load(self):
+        # Loading allocates millions of long-lived objects, collecting the youngest
+        # generation less often during the load saves a large share of its time
+        thresholds = gc.get_threshold()
+        gc.set_threshold(max(thresholds[0], INITIAL_LOAD_GC_THRESHOLD), *thresholds[1:])
+        state = "ready"
+        try:
+            self.load_all_data(workers=self.load_workers)
+        except Exception as e:
+            logger.error(f"Initial load of server data failed: {str(e)}")
+            state = "failed"
+        finally:
+            gc.set_threshold(*thresholds)
+            self._update_load_status(
+                state=state, elapsed_ms=round((time.monotonic() - self._load_started) * 1000, 1)
+            )
+            logger.info(f"Server data loaded: {self.load_status()}")
+
+    def _update_load_status(self, **fields):
+        with self._status_lock:
+            self._load_status.update(fields)
+
+    def _count_loaded_file(self, failed: bool = False):
+        with self._status_lock:
+            self._load_status["files_failed" if failed else "files_loaded"] += 1
+
+    def load_status(self) -> Dict:
+        """Progress of the initial load, state is loading, ready or failed"""
+        with self._status_lock:
+            status = dict(self._load_status)
+        status["servers"] = len(self.servers_data)
+        if status["state"] == "loading":
+            status["elapsed_ms"] = round((time.monotonic() - self._load_started) * 1000, 1)
+        return status
+
+    @property
+    def is_ready(self) -> bool:
+        return self._load_status["state"] != "loading"
+
+    def load_all_data(self, workers: int = 1):
+        """
+        Load all JSON files from the data directory
+        :param workers: Number of processes parsing the files, files are loaded in this process when 1
+        """
         try:
             if not self.data_directory.exists():
                 logger.warning(f"Data directory {self.data_directory} does not exist")
                 self.data_directory.mkdir(parents=True, exist_ok=True)
                 logger.info(f"Created data directory at {self.data_directory}")
+                self._update_load_status(files_total=0)
                 return
 
             json_files = list(self.data_directory.glob("*.json"))
+            self._update_load_status(files_total=len(json_files))
             if not json_files:
                 logger.warning(f"No JSON files found in {self.data_directory}")
                 return
 
+            if workers > 1 and len(json_files) > 1:
+                self._load_files_in_processes(json_files, workers)
+                return
+
             for file_path in json_files:
                 try:
                     self.load_server_data(file_path)
+                    self._count_loaded_file()
                     logger.debug(f"Successfully loaded data from {file_path}")
                 except Exception as e:
+                    self._count_loaded_file(failed=True)
                     logger.error(f"Error loading server data from {file_path}: {str(e)}")
                     # Continue loading other files even if one fails
 
@@ -66,38 +189,42 @@ class ServerDataManager:
             logger.error(f"Error in load_all_data: {str(e)}")
             raise
 
-    def load_server_data(self, file_path: Path):
-        """Load server data from a single JSON file"""
+    def _load_files_in_processes(self, json_files: List[Path], workers: int):
+        """Parse and normalize the files in a process pool, servers are applied as each file finishes"""
+        # Spawned, not forked: this process already runs threads (file watcher, DCIM loop)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(json_files)), mp_context=context) as pool:
+            futures = {pool.submit(read_server_file, str(file_path)): file_path for file_path in json_files}
+            for future in as_completed(futures):
+                file_path = futures[future]
+                key = str(file_path.absolute())
+                try:
+                    content_hash, servers = future.result()
+                except Exception as e:
+                    self._count_loaded_file(failed=True)
+                    logger.error(f"Error loading server data from {file_path}: {str(e)}")
+                    continue
+
+                # Skipped when the file watcher already loaded a newer version
+                self._apply_file_servers(key, servers, content_hash, initial=True)
+                self._count_loaded_file()
+                logger.debug(f"Successfully loaded data from {file_path}")
+
+    def load_server_data(self, file_path: Path) -> bool:
+        """
+        Load server data from a single JSON file, replacing the servers it had before
+        :return: False if the file content didn't change since it was last loaded
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                file_data = json.load(f)
-                
-                # Handle both single server and multiple server formats
-                if not isinstance(file_data, dict):
-                    raise ValueError(f"Invalid data format in {file_path}")
-                
-                # If the top level keys are IPs, process each server
-                for ip, server_data in file_data.items():
-                    if isinstance(server_data, dict):
-                        # Add the IP to the server data if not present
-                        if 'mgmt_ip' not in server_data and 'Network' not in server_data:
-                            server_data['mgmt_ip'] = ip
-                        
-                        # Normalize the data
-                        normalized_data = self._normalize_server_data(server_data)
-                        
-                        # Get the final mgmt_ip (prefer normalized, fallback to original)
-                        server_ip = normalized_data.get('mgmt_ip', ip)
-                        
-                        # Store both original and normalized data
-                        self.servers_data[server_ip] = {
-                            **server_data,  # Original data
-                            **normalized_data  # Normalized fields
-                        }
-                        logger.debug(f"Loaded and normalized data for server {server_ip}")
-                    else:
-                        logger.warning(f"Skipping invalid server data for IP {ip} in {file_path}")
-                
+            key = str(Path(file_path).absolute())
+            content_hash = file_content_hash(file_path)
+            with self._data_lock:
+                if self._file_hashes.get(key) == content_hash:
+                    return False
+
+            servers = parse_server_file(file_path)
+            return self._apply_file_servers(key, servers, content_hash)
+
         except json.JSONDecodeError as e:
             logger.error(f"JSON parsing error in {file_path}: {str(e)}")
             raise
@@ -105,7 +232,144 @@ class ServerDataManager:
             logger.error(f"Error loading {file_path}: {str(e)}")
             raise
 
-    def _normalize_server_data(self, data: Dict) -> Dict:
+    def remove_server_file(self, file_path: Path):
+        """Drop the servers of a deleted file"""
+        self._apply_file_servers(str(Path(file_path).absolute()), {}, None)
+
+    def _apply_file_servers(
+        self, key: str, servers: Dict[str, ServerRecord], content_hash: Optional[str], initial: bool = False
+    ) -> bool:
+        """
+        Swap in a copy of servers_data with the servers of one file replaced.
+        The file hash is checked and recorded under the same lock, so the initial
+        load and the file watcher never apply an older version over a newer one.
+        :param content_hash: Hash of the file content, None when the file was deleted
+        :param initial: Whether the servers come from the initial load, which
+                        doesn't replace a file the watcher already loaded
+        :return: False if nothing was applied
+        """
+        with self._data_lock:
+            if (initial and key in self._file_hashes) or (
+                content_hash is not None and self._file_hashes.get(key) == content_hash
+            ):
+                return False
+
+            previous = self._file_servers.get(key, {})
+            data = dict(self.servers_data)
+            added = updated = removed = 0
+            removed_ips, changed = [], {}
+
+            for ip, server in previous.items():
+                # Another file may have loaded the same server since
+                if ip not in servers and data.get(ip) is server:
+                    del data[ip]
+                    removed += 1
+                    removed_ips.append(ip)
+
+            for ip, server in servers.items():
+                old = previous.get(ip)
+                if old is not None and data.get(ip) is old and old.source_hash == server.source_hash:
+                    servers[ip] = old  # Unchanged, keep the loaded server
+                    continue
+                if ip in data:
+                    updated += 1
+                else:
+                    added += 1
+                data[ip] = server
+                changed[ip] = server
+
+            if content_hash is None:
+                self._file_servers.pop(key, None)
+                self._file_hashes.pop(key, None)
+            else:
+                self._file_servers[key] = servers
+                self._file_hashes[key] = content_hash
+            self.index.update(removed_ips, changed)
+            self.dcim_matches.servers_changed(removed_ips, changed)
+            self.servers_data = data
+
+        with self._reload_cond:
+            self._reload_stats["servers_added"] += added
+            self._reload_stats["servers_updated"] += updated
+            self._reload_stats["servers_removed"] += removed
+        if added or updated or removed:
+            logger.info(f"Server data of {key}: {added} added, {updated} updated, {removed} removed")
+        return True
+
+    def schedule_reload(self, file_path: str):
+        """Reload a changed, created or deleted file once its events settle"""
+        file_path = str(Path(file_path).absolute())
+        with self._reload_cond:
+            now = time.monotonic()
+            first_event = self._pending_reloads.get(file_path, (now, now))[0]
+            self._pending_reloads[file_path] = (first_event, now)
+            self._reload_stats["events"] += 1
+            self._reload_cond.notify()
+
+    def reload_stats(self) -> Dict:
+        """Event and reload counters of the file watcher"""
+        with self._reload_cond:
+            return {
+                **self._reload_stats,
+                "pending": len(self._pending_reloads),
+                "files": len(self._file_servers),
+                "servers": len(self.servers_data),
+            }
+
+    def _reload_loop(self):
+        while True:
+            with self._reload_cond:
+                while True:
+                    now = time.monotonic()
+                    ready = {
+                        path: first_event
+                        for path, (first_event, last_event) in self._pending_reloads.items()
+                        if now - last_event >= RELOAD_DEBOUNCE_SECONDS
+                    }
+                    if ready:
+                        for path in ready:
+                            del self._pending_reloads[path]
+                        break
+                    timeout = None
+                    if self._pending_reloads:
+                        last_events = (last_event for _, last_event in self._pending_reloads.values())
+                        timeout = min(last_events) + RELOAD_DEBOUNCE_SECONDS - now
+                    self._reload_cond.wait(timeout)
+
+            for path, first_event in ready.items():
+                self._reload_file(path, first_event)
+
+    def _reload_file(self, path: str, first_event: float):
+        file_path = Path(path)
+        try:
+            if file_path.exists():
+                changed = self.load_server_data(file_path)
+                stat = "reloads" if changed else "unchanged"
+            else:
+                self.remove_server_file(file_path)
+                stat = "files_removed"
+        except Exception as e:
+            attempts = self._reload_attempts.get(path, 0) + 1
+            with self._reload_cond:
+                self._reload_stats["failed"] += 1
+            if attempts <= RELOAD_RETRIES:
+                # Most likely the file is still being written
+                self._reload_attempts[path] = attempts
+                self.schedule_reload(path)
+            else:
+                self._reload_attempts.pop(path, None)
+                logger.error(f"Giving up reloading {path}: {str(e)}")
+            return
+
+        self._reload_attempts.pop(path, None)
+        latency_ms = round((time.monotonic() - first_event) * 1000, 1)
+        with self._reload_cond:
+            self._reload_stats[stat] += 1
+            self._reload_stats["last_reload_ms"] = latency_ms
+            self._reload_stats["max_reload_ms"] = max(self._reload_stats["max_reload_ms"] or 0, latency_ms)
+
+    @staticmethod
+    def _normalize_server_data(data: Dict) -> Dict:
         """Normalize server data to handle flexible field names"""
         try:
             normalized = {}
@@ -238,8 +502,6 @@ class ServerDataManager:
                     for device in devices_data
                 ]
 
-            # Add original data for fields we didn't normalize
-            normalized['raw_data'] = data
             normalized['last_updated'] = datetime.now().isoformat()
 
             return normalized
@@ -251,6 +513,7 @@ class ServerDataManager:
         """Set or update DCIM client"""
         self.dcim_client = dcim_client
         self.dcim_analyzer = DCIMAnalyzer(self.dcim_client)
+        self.dcim_matches.invalidate()
         
     def analyze_server_dcim(self, mgmt_ip: str) -> Dict:
         """Analyze a single server against DCIM"""
@@ -302,61 +565,224 @@ class ServerDataManager:
         return {"status": "success", "results": results}
 
     def get_all_assets(self) -> List[Dict[str, Any]]:
-        """Get all servers with DCIM analysis if available"""
+        """
+        Get all servers with their DCIM analysis if available.
+        Analysis results come from the match cache and are computed in the
+        background, so servers not analyzed yet have dcim_status "pending".
+        """
         try:
-            if not self.servers_data:
+            if not self.servers_data and self.is_ready:
                 self.load_all_data()  # Reload data if empty
                 
-            servers = list(self.servers_data.values())
-            
             # If DCIM analyzer is available, enrich data with DCIM information
             if self.dcim_analyzer:
-                for server in servers:
-                    try:
-                        dcim_info = self.dcim_analyzer.analyze_server(server)
-                        server.update(dcim_info)
-                    except Exception as e:
-                        logger.error(f"Error analyzing DCIM for server {server.get('mgmt_ip')}: {str(e)}")
-                        server['dcim_status'] = 'error'
-                        server['dcim_error'] = str(e)
-            else:
-                # If no DCIM analyzer, mark servers as DCIM not available
-                for server in servers:
-                    server['dcim_status'] = 'not_available'
-                    server['dcim_message'] = 'DCIM integration not configured'
-            
-            return servers
+                app = current_app._get_current_object()
+                return [
+                    {**server.to_dict(), **self.dcim_matches.get(mgmt_ip, server, self.dcim_analyzer, app)}
+                    for mgmt_ip, server in list(self.servers_data.items())
+                ]
+
+            # If no DCIM analyzer, mark servers as DCIM not available
+            return [
+                {
+                    **server.to_dict(),
+                    'dcim_status': 'not_available',
+                    'dcim_message': 'DCIM integration not configured',
+                }
+                for server in list(self.servers_data.values())
+            ]
             
         except Exception as e:
             logger.error(f"Error getting all servers: {str(e)}")
             raise
 
+    def query(
+        self,
+        values: Optional[Dict[str, List[str]]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        dcim_status: Optional[List[str]] = None,
+        text: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        sort: str = "mgmt_ip",
+        page: int = 1,
+        page_size: int = 50,
+        facets: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Filtered page of the servers, answered from the indexes so only the
+        matching servers are read, and only the page is serialized
+        :param values: VALUE_FIELDS filters, a server matches any of the values of a field
+        :param ranges: RANGE_FIELDS filters, (min, max) with None for an open end
+        :param dcim_status: DCIM match statuses, "pending" for servers not analyzed yet
+        :param text: Searched (case insensitive) in the TEXT_FIELDS, from the index
+        :param fields: Fields of every returned server, all fields without raw_data by default
+        :param sort: Field to sort by (SORT_FIELDS), "-field" for descending order
+        :param facets: Fields (VALUE_FIELDS or dcim_status) to count the matching servers by value
+        :return: Page of servers, total number of matches and the facet counts
+        :raises ValueError: On an unknown filter, sort or facet field
+        """
+        values = {field: wanted for field, wanted in (values or {}).items() if wanted}
+        ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+        facets = facets or []
+        unknown = (
+            [field for field in values if field not in VALUE_FIELDS]
+            + [field for field in ranges if field not in RANGE_FIELDS]
+            + [field for field in facets if field not in VALUE_FIELDS and field != "dcim_status"]
+        )
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+        descending = sort.startswith("-")
+        sort_field = sort.lstrip("-")
+        if sort_field not in SORT_FIELDS:
+            raise ValueError(f"Can't sort by {sort_field}, sortable fields: {', '.join(SORT_FIELDS)}")
+
+        # The index and the data are swapped together under the lock, the matches,
+        # the page and the total are all taken from the same snapshot
+        with self._data_lock:
+            data = self.servers_data
+            matches = self.index.match(values, ranges)
+
+            if dcim_status:
+                wanted = set(dcim_status)
+                if matches is None and self.dcim_analyzer and PENDING_STATUS not in wanted:
+                    # Only analyzed servers can match, start from those
+                    matches = set().union(*(self.dcim_matches.servers_with_status(status) for status in wanted))
+                    matches.intersection_update(data)
+                else:
+                    matches = {
+                        ip for ip in (data if matches is None else matches)
+                        if self._dcim_status(ip) in wanted
+                    }
+
+            if text:
+                matches = self.index.search(text, matches)
+
+            # The page is read from the presorted orders of the index, stopping once it is full
+            ips = self.index.page(sort_field, matches, (page - 1) * page_size, page_size, descending)
+            facet_counts = self.index.facets([field for field in facets if field in VALUE_FIELDS], matches)
+
+        result = {
+            "data": [self._project(ip, data[ip], fields) for ip in ips],
+            "total": len(data if matches is None else matches),
+            "page": page,
+            "page_size": page_size,
+        }
+        if facets:
+            result["facets"] = facet_counts
+            if "dcim_status" in facets:
+                result["facets"]["dcim_status"] = self._dcim_status_counts(data.keys() if matches is None else matches)
+        return result
+
+    def _dcim_status_counts(self, mgmt_ips) -> Dict[str, int]:
+        """Number of servers among mgmt_ips of every dcim_status"""
+        if not self.dcim_analyzer:
+            counts = {"not_available": len(mgmt_ips)}
+        else:
+            counts = self.dcim_matches.status_counts(mgmt_ips)
+        counts = [(status, count) for status, count in counts.items() if count]
+        return dict(sorted(counts, key=lambda item: (-item[1], item[0])))
+
+    def _dcim_status(self, mgmt_ip: str) -> str:
+        return self.dcim_matches.status(mgmt_ip) if self.dcim_analyzer else "not_available"
+
+    def _project(self, mgmt_ip: str, server: ServerRecord, fields: Optional[List[str]]) -> Dict[str, Any]:
+        """A server as returned by query(), with the requested fields only"""
+        if fields is None:
+            data = server.to_dict()
+        else:
+            data = {field: server.get(field) for field in fields if field not in DCIM_FIELDS}
+
+        if fields is None or any(field in DCIM_FIELDS for field in fields):
+            if self.dcim_analyzer:
+                app = current_app._get_current_object()
+                dcim = self.dcim_matches.get(mgmt_ip, server, self.dcim_analyzer, app)
+            else:
+                dcim = {"dcim_status": "not_available", "dcim_differences": [], "dcim_data": None}
+            for field in DCIM_FIELDS if fields is None else fields:
+                if field in DCIM_FIELDS:
+                    data[field] = dcim.get(field)
+        return data
+
     def get_server(self, mgmt_ip: str) -> Dict:
-        """Get data for a specific server"""
+        """Get data for a specific server, with its original data in raw_data"""
         try:
-            return self.servers_data.get(mgmt_ip, {})
+            server = self.servers_data.get(mgmt_ip)
+            return server.to_dict(include_raw=True) if server is not None else {}
         except Exception as e:
             logger.error(f"Error getting server {mgmt_ip}: {str(e)}")
             return {}
 
+def file_content_hash(file_path: Path) -> str:
+    """SHA-1 of a file, read in chunks"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_server_file(file_path: Path) -> Dict[str, ServerRecord]:
+    """Servers of an inventory file by mgmt_ip"""
+    servers = {}
+    source_path = str(Path(file_path).absolute())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        # Servers are decoded and normalized one at a time, the file is never held whole.
+        # If the top level keys are IPs, process each server
+        for offset, ip, server_data in iter_json_object(f):
+            if isinstance(server_data, dict):
+                # Add the IP to the server data if not present, on a copy so the
+                # original data stays as in the file for the fingerprint
+                if 'mgmt_ip' not in server_data and 'Network' not in server_data:
+                    normalized_data = ServerDataManager._normalize_server_data({**server_data, 'mgmt_ip': ip})
+                else:
+                    normalized_data = ServerDataManager._normalize_server_data(server_data)
+
+                # Get the final mgmt_ip (prefer normalized, fallback to original)
+                server_ip = normalized_data.get('mgmt_ip', ip)
+
+                # Only the normalized fields are kept, the original data is read back from the file
+                servers[server_ip] = ServerRecord(server_data, normalized_data, source_path, offset)
+                logger.debug(f"Loaded and normalized data for server {server_ip}")
+            else:
+                logger.warning(f"Skipping invalid server data for IP {ip} in {file_path}")
+
+    return servers
+
+def read_server_file(file_path: str) -> Tuple[str, Dict[str, ServerRecord]]:
+    """Content hash and servers of an inventory file, run by the initial load processes"""
+    # Parsing allocates millions of objects without reference cycles, collecting only slows it down
+    gc.disable()
+    try:
+        return file_content_hash(Path(file_path)), parse_server_file(Path(file_path))
+    finally:
+        gc.enable()
+
 class ServerDataFileHandler(FileSystemEventHandler):
+    """Hands JSON file events to the manager, which reloads the files in the background"""
+
     def __init__(self, manager: ServerDataManager):
         self.manager = manager
 
-    def on_modified(self, event):
-        if event.is_directory:
-            return
-        if event.src_path.endswith('.json'):
+    def _schedule(self, path: str):
+        if path.endswith('.json'):
             try:
-                self.manager.load_server_data(Path(event.src_path))
+                self.manager.schedule_reload(path)
             except Exception as e:
-                logger.error(f"Error handling file modification {event.src_path}: {str(e)}")
+                logger.error(f"Error handling file event {path}: {str(e)}")
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
 
     def on_created(self, event):
-        if event.is_directory:
-            return
-        if event.src_path.endswith('.json'):
-            try:
-                self.manager.load_server_data(Path(event.src_path))
-            except Exception as e:
-                logger.error(f"Error handling new file {event.src_path}: {str(e)}") 
\ No newline at end of file
+        if not event.is_directory:
+            self._schedule(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+            self._schedule(event.dest_path)
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set
+
+from .dcim_analyzer import DCIMMatchStatus
+from .server_inventory import ServerRecord, fingerprint
+from ..logger_manager import LoggerManager
+
+logger = LoggerManager().get_logger()
+
+# Seconds a match result is trusted before the DCIM record is checked again
+DEFAULT_MATCH_TTL = 900
+
+# Failed analyses are retried sooner
+ERROR_MATCH_TTL = 60
+
+# Status of servers whose first analysis hasn't finished yet
+PENDING_STATUS = "pending"
+
+
+class _MatchEntry:
+    def __init__(self, source_hash: str, result: Dict, ttl: float):
+        self.source_hash = source_hash
+        self.result = result
+        self.expires_at = time.monotonic() + ttl
+        dcim_data = result.get("dcim_data")
+        self.asset_id = dcim_data.get("id") if dcim_data else None
+        self.dcim_hash = fingerprint(dcim_data) if dcim_data else None
+
+
+class DCIMMatchCache:
+    """
+    DCIM match results of the dashboard servers, kept apart from the server
+    data and computed in background threads.
+    A result is recomputed when the server's source data changes, or when it
+    expired and the matched DCIM record changed since. Until the first result
+    of a server is ready its status is "pending".
+    """
+
+    def __init__(self, ttl: float = DEFAULT_MATCH_TTL, max_workers: int = 4):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _MatchEntry] = {}
+        self._by_status: Dict[str, Set[str]] = defaultdict(set)
+        # mgmt_ip -> source hash of the loaded server, results of other versions are dropped
+        self._source_hashes: Dict[str, str] = {}
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dcim-match")
+        self._analyzed = 0
+        self._revalidated = 0
+
+    def get(self, mgmt_ip: str, server: ServerRecord, analyzer, app) -> Dict:
+        """
+        DCIM fields of a server (dcim_status, dcim_differences, dcim_data), without
+        waiting: a missing or outdated result is computed in the background
+        """
+        source_hash = server.source_hash
+        with self._lock:
+            entry = self._entries.get(mgmt_ip)
+            outdated = (
+                entry is None
+                or entry.source_hash != source_hash
+                or time.monotonic() >= entry.expires_at
+            )
+            if outdated and mgmt_ip not in self._pending:
+                self._pending.add(mgmt_ip)
+                self._executor.submit(
+                    self._update, app, analyzer, mgmt_ip, server, source_hash, entry
+                )
+
+        if entry is None:
+            return {"dcim_status": PENDING_STATUS, "dcim_differences": [], "dcim_data": None}
+        return entry.result
+
+    def invalidate(self, mgmt_ip: Optional[str] = None):
+        """Drop the result of a server (all servers by default)"""
+        with self._lock:
+            if mgmt_ip is None:
+                self._entries.clear()
+                self._by_status.clear()
+            else:
+                self._set_entry(mgmt_ip, None)
+
+    def servers_changed(self, removed: Iterable[str], changed: Dict[str, ServerRecord]):
+        """
+        Record the loaded version of every changed server. Results of removed
+        servers are dropped and results of changed servers whose source data
+        differs expire, they are recomputed on their next get(). Analyses
+        still running for an older version are dropped when they finish.
+        """
+        with self._lock:
+            for mgmt_ip in removed:
+                self._set_entry(mgmt_ip, None)
+                self._source_hashes.pop(mgmt_ip, None)
+            for mgmt_ip, server in changed.items():
+                self._source_hashes[mgmt_ip] = server.source_hash
+                entry = self._entries.get(mgmt_ip)
+                if entry is not None and entry.source_hash != server.source_hash:
+                    entry.expires_at = 0.0
+
+    def status(self, mgmt_ip: str) -> str:
+        """dcim_status of a server, "pending" until it was analyzed"""
+        with self._lock:
+            entry = self._entries.get(mgmt_ip)
+        return entry.result["dcim_status"] if entry is not None else PENDING_STATUS
+
+    def status_counts(self, mgmt_ips) -> Dict[str, int]:
+        """Number of servers among mgmt_ips (a set or dict keys) of every dcim_status"""
+        with self._lock:
+            counts = {status: len(mgmt_ips & servers) for status, servers in self._by_status.items()}
+        counts[PENDING_STATUS] = len(mgmt_ips) - sum(counts.values())
+        return counts
+
+    def servers_with_status(self, status: str) -> Set[str]:
+        """mgmt_ips of the analyzed servers with this dcim_status"""
+        with self._lock:
+            return set(self._by_status.get(status, ()))
+
+    def _set_entry(self, mgmt_ip: str, entry: Optional[_MatchEntry]):
+        """Replace the entry of a server (drop it when None), with the lock held"""
+        previous = self._entries.pop(mgmt_ip, None)
+        if previous is not None:
+            self._by_status[previous.result["dcim_status"]].discard(mgmt_ip)
+        if entry is not None:
+            self._entries[mgmt_ip] = entry
+            self._by_status[entry.result["dcim_status"]].add(mgmt_ip)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "servers": len(self._entries),
+                "pending": len(self._pending),
+                "analyzed": self._analyzed,
+                "revalidated": self._revalidated,
+            }
+
+    def _update(self, app, analyzer, mgmt_ip: str, server: ServerRecord, source_hash: str, entry: Optional[_MatchEntry]):
+        with app.app_context():
+            try:
+                if entry is not None and entry.source_hash == source_hash and self._unchanged(analyzer, entry):
+                    entry.expires_at = time.monotonic() + self.ttl
+                    with self._lock:
+                        self._revalidated += 1
+                    return
+
+                result = self._analyze(analyzer, server)
+                ttl = ERROR_MATCH_TTL if result["dcim_status"] == DCIMMatchStatus.ERROR.value else self.ttl
+                with self._lock:
+                    # The server was removed or changed while it was analyzed
+                    if self._source_hashes.get(mgmt_ip) == source_hash:
+                        self._set_entry(mgmt_ip, _MatchEntry(source_hash, result, ttl))
+                    self._analyzed += 1
+            except Exception as e:
+                logger.error(f"Error analyzing DCIM for server {mgmt_ip}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._pending.discard(mgmt_ip)
+
+    @staticmethod
+    def _unchanged(analyzer, entry: _MatchEntry) -> bool:
+        """Whether the DCIM record the server matched is still the same"""
+        if entry.asset_id is None:
+            return False
+        dcim_data = analyzer.dcim_client.get_asset_details(entry.asset_id)
+        return dcim_data is not None and fingerprint(dcim_data) == entry.dcim_hash
+
+    @staticmethod
+    def _analyze(analyzer, server: ServerRecord) -> Dict:
+        analysis = analyzer.analyze_server(server)
+        result = {
+            "dcim_status": analysis["status"],
+            "dcim_differences": analysis.get("differences", []),
+            "dcim_data": analysis.get("dcim_data"),
+        }
+        if "error" in analysis:
+            result["dcim_error"] = analysis["error"]
+        return result
@@ -0,0 +1,302 @@
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from itertools import accumulate, groupby
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .server_inventory import ServerRecord
+
+
+def _location(field: str) -> Callable[[ServerRecord], Optional[str]]:
+    return lambda server: (server.location or {}).get(field)
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Fields filtered by exact value, and how to read them from a server
+VALUE_FIELDS: Dict[str, Callable[[ServerRecord], Optional[str]]] = {
+    "vendor": lambda server: server.vendor,
+    "model": lambda server: server.model,
+    "data_center": _location("data_center"),
+    "room": _location("room"),
+    "rack": _location("rack"),
+    "firmware": lambda server: server.BiosFirmware,
+    "ilo_firmware": lambda server: server.ILOFIRMWARE,
+}
+
+# Fields filtered by a [min, max] range
+RANGE_FIELDS: Dict[str, Callable[[ServerRecord], Optional[float]]] = {
+    "memory": lambda server: _number((server.memory or {}).get("total")),
+    "cores": lambda server: _number((server.processors or {}).get("total_cores")),
+}
+
+
+# Text fields the servers can be sorted by, besides the VALUE_FIELDS and RANGE_FIELDS
+SORTED_FIELDS: Dict[str, Callable[[ServerRecord], Optional[str]]] = {
+    "hostname": lambda server: server.hostname,
+    "serial": lambda server: server.serial,
+}
+
+# Fields searched by text, case insensitive
+TEXT_FIELDS: Dict[str, Callable[[ServerRecord], Optional[str]]] = {
+    "hostname": lambda server: server.hostname,
+    "serial": lambda server: server.serial,
+    "mgmt_ip": lambda server: server.mgmt_ip,
+}
+
+# Separates the fields and the servers in the searched text, never typed in a search
+_TEXT_SEPARATOR = "\x00"
+
+# Fields query pages can be sorted by
+SORT_FIELDS = ("mgmt_ip", *VALUE_FIELDS, *RANGE_FIELDS, *SORTED_FIELDS)
+
+# Updates of more servers than this rebuild the sorted lists
+BULK_UPDATE_SIZE = 1000
+
+# Matches fewer than this share of the servers are sorted on their own instead
+# of walking the presorted order
+SUBSET_SORT_SHARE = 16
+
+
+class ServerIndex:
+    """
+    Inverted indexes of the dashboard servers: the servers of every value of
+    the VALUE_FIELDS with the values in sorted order, and the servers sorted
+    by mgmt_ip and by each of the RANGE_FIELDS and SORTED_FIELDS, and the
+    lowercased TEXT_FIELDS of every server for the text search.
+    Kept up to date with the per-server changes of the data files.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[str, Set[str]]] = {field: defaultdict(set) for field in VALUE_FIELDS}
+        self._value_order: Dict[str, List[str]] = {field: [] for field in VALUE_FIELDS}
+        # (value, mgmt_ip) lists in sorted order
+        self._sorted: Dict[str, List[Tuple[object, str]]] = {
+            field: [] for field in ("mgmt_ip", *RANGE_FIELDS, *SORTED_FIELDS)
+        }
+        # mgmt_ip -> indexed values of the server, for removing it
+        self._keys: Dict[str, Dict[str, object]] = {}
+        # mgmt_ip -> lowercased TEXT_FIELDS of the server, joined
+        self._text: Dict[str, str] = {}
+        # The texts of all servers joined, with the start of every server and its mgmt_ip,
+        # built by the first search after an update
+        self._text_blob: Optional[Tuple[str, List[int], List[str]]] = None
+
+    def update(self, removed: Iterable[str], changed: Dict[str, ServerRecord]):
+        """Remove servers and (re)index changed ones"""
+        stale = set(removed) | set(changed)
+        # Large updates (e.g. a whole file) rebuild the sorted lists instead of editing them one by one
+        bulk = len(stale) > BULK_UPDATE_SIZE
+        with self._lock:
+            self._text_blob = None
+            for mgmt_ip in stale:
+                self._remove(mgmt_ip, sorted_lists=not bulk)
+            if bulk:
+                for entries in self._sorted.values():
+                    entries[:] = [entry for entry in entries if entry[1] not in stale]
+            for mgmt_ip, server in changed.items():
+                self._add(mgmt_ip, server, sorted_lists=not bulk)
+            if bulk:
+                for field, entries in self._sorted.items():
+                    entries.extend(
+                        (self._keys[mgmt_ip][field], mgmt_ip)
+                        for mgmt_ip in changed if field in self._keys[mgmt_ip]
+                    )
+                    entries.sort()
+
+    def match(self, values: Dict[str, List[str]], ranges: Dict[str, Tuple[Optional[float], Optional[float]]]) -> Optional[Set[str]]:
+        """
+        Servers matching every filter, a value filter matches any of its values
+        :return: Matching mgmt_ips, None when there are no filters (all servers)
+        """
+        with self._lock:
+            candidates = []
+            for field, wanted in values.items():
+                index = self._values[field]
+                candidates.append(set().union(*(index.get(value, ()) for value in wanted)))
+            for field, (low, high) in ranges.items():
+                entries = self._sorted[field]
+                start = 0 if low is None else bisect_left(entries, (low, ""))
+                end = len(entries) if high is None else bisect_right(entries, (high, "\uffff"))
+                candidates.append({mgmt_ip for _, mgmt_ip in entries[start:end]})
+
+        if not candidates:
+            return None
+        # Intersect from the smallest set, so only the matching subset is touched
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            result = result & other
+        return result
+
+    def search(self, text: str, mgmt_ips: Optional[Set[str]]) -> Set[str]:
+        """
+        Servers among mgmt_ips (all servers when None) with text in one of
+        their TEXT_FIELDS, case insensitive. Large sets are searched with one
+        scan of the joined texts of all servers instead of server by server.
+        """
+        text = text.lower()
+        with self._lock:
+            if mgmt_ips is not None and len(mgmt_ips) * SUBSET_SORT_SHARE < len(self._keys):
+                return {mgmt_ip for mgmt_ip in mgmt_ips if text in self._text.get(mgmt_ip, "")}
+
+            if self._text_blob is None:
+                ips = list(self._text)
+                starts = list(accumulate((len(self._text[ip]) + 1 for ip in ips), initial=0))
+                self._text_blob = (_TEXT_SEPARATOR.join(self._text[ip] for ip in ips), starts, ips)
+            blob, starts, ips = self._text_blob
+
+        found = set()
+        position = blob.find(text)
+        while position != -1:
+            server = bisect_right(starts, position) - 1
+            found.add(ips[server])
+            # Every server is counted once, go on from the next one
+            position = blob.find(text, starts[server + 1])
+        return found if mgmt_ips is None else found & mgmt_ips
+
+    def facets(self, fields: Iterable[str], mgmt_ips: Optional[Set[str]]) -> Dict[str, Dict[str, int]]:
+        """
+        Number of servers of every value of the fields (VALUE_FIELDS), among mgmt_ips
+        (all servers when None)
+        """
+        facets = {}
+        with self._lock:
+            for field in fields:
+                if mgmt_ips is None:
+                    counts = {value: len(servers) for value, servers in self._values[field].items()}
+                else:
+                    # Set intersections run in C, cheaper than reading the value of every server
+                    counts = {}
+                    for value, servers in self._values[field].items():
+                        count = len(mgmt_ips.intersection(servers))
+                        if count:
+                            counts[value] = count
+                facets[field] = dict(sorted(counts.items(), key=lambda item: (-item[1], str(item[0]))))
+        return facets
+
+    def page(
+        self, field: str, mgmt_ips: Optional[Set[str]], start: int, count: int, descending: bool = False
+    ) -> List[str]:
+        """
+        Page of servers sorted by a SORT_FIELDS field, ties in mgmt_ip order and
+        servers without the field last. The presorted order is walked until the
+        page is full, only small sets of mgmt_ips are sorted on their own.
+        :param mgmt_ips: Servers to sort, all servers when None
+        :param start: Position of the first server of the page
+        :param count: Page size
+        """
+        with self._lock:
+            if mgmt_ips is not None and len(mgmt_ips) * SUBSET_SORT_SHARE < len(self._keys):
+                return self._sort_subset(field, mgmt_ips, start, count, descending)
+
+            page, skip = [], start
+            for group in self._groups(field, mgmt_ips, descending):
+                if len(group) <= skip:
+                    skip -= len(group)
+                    continue
+                page.extend(sorted(group)[skip:skip + count - len(page)])
+                skip = 0
+                if len(page) == count:
+                    break
+            return page
+
+    def _groups(self, field: str, mgmt_ips: Optional[Set[str]], descending: bool) -> Iterator[Set[str]]:
+        """Servers among mgmt_ips with equal values of the field, in sort order, then those without it"""
+        if field in VALUE_FIELDS:
+            index = self._values[field]
+            values = self._value_order[field]
+            for value in reversed(values) if descending else values:
+                yield index[value] if mgmt_ips is None else index[value] & mgmt_ips
+        else:
+            entries = self._sorted[field]
+            for _, group in groupby(reversed(entries) if descending else entries, key=itemgetter(0)):
+                yield {mgmt_ip for _, mgmt_ip in group if mgmt_ips is None or mgmt_ip in mgmt_ips}
+
+        # Only reached when the page goes past the servers with the field
+        yield {
+            mgmt_ip for mgmt_ip, keys in self._keys.items()
+            if field not in keys and (mgmt_ips is None or mgmt_ip in mgmt_ips)
+        }
+
+    def _sort_subset(self, field: str, mgmt_ips: Set[str], start: int, count: int, descending: bool) -> List[str]:
+        keyed, missing = [], []
+        for mgmt_ip in mgmt_ips:
+            keys = self._keys.get(mgmt_ip)
+            if keys is None:
+                continue  # Removed since the servers were matched
+            value = keys.get(field)
+            if value is None:
+                missing.append(mgmt_ip)
+            else:
+                keyed.append((value, mgmt_ip))
+
+        end = start + count
+        if not descending and end < len(keyed):
+            ordered = heapq.nsmallest(end, keyed)
+        else:
+            # Sorted by mgmt_ip first, so ties keep the mgmt_ip order when descending
+            keyed.sort(key=itemgetter(1))
+            keyed.sort(key=itemgetter(0), reverse=descending)
+            ordered = keyed
+        page = [mgmt_ip for _, mgmt_ip in ordered[start:end]]
+        if len(page) < count:
+            missing.sort()
+            page.extend(missing[max(0, start - len(keyed)):][:count - len(page)])
+        return page
+
+    def _add(self, mgmt_ip: str, server: ServerRecord, sorted_lists: bool = True):
+        keys = {"mgmt_ip": mgmt_ip}
+        for field, read in VALUE_FIELDS.items():
+            value = read(server)
+            if value is not None and value != "":
+                value = str(value)
+                if value not in self._values[field]:
+                    insort(self._value_order[field], value)
+                self._values[field][value].add(mgmt_ip)
+                keys[field] = value
+        for fields, convert in ((RANGE_FIELDS, None), (SORTED_FIELDS, str)):
+            for field, read in fields.items():
+                value = read(server)
+                if value is None or value == "":
+                    continue
+                if convert is not None:
+                    value = convert(value)
+                keys[field] = value
+        self._text[mgmt_ip] = _TEXT_SEPARATOR.join(
+            str(value).lower() for value in (read(server) for read in TEXT_FIELDS.values()) if value
+        )
+        if sorted_lists:
+            for field, entries in self._sorted.items():
+                if field in keys:
+                    insort(entries, (keys[field], mgmt_ip))
+        self._keys[mgmt_ip] = keys
+
+    def _remove(self, mgmt_ip: str, sorted_lists: bool = True):
+        self._text.pop(mgmt_ip, None)
+        keys = self._keys.pop(mgmt_ip, None)
+        if not keys:
+            return
+        for field in VALUE_FIELDS:
+            value = keys.get(field)
+            if value is not None:
+                servers = self._values[field][value]
+                servers.discard(mgmt_ip)
+                if not servers:
+                    del self._values[field][value]
+                    order = self._value_order[field]
+                    del order[bisect_left(order, value)]
+        for field, entries in self._sorted.items() if sorted_lists else ():
+            value = keys.get(field)
+            if value is not None:
+                position = bisect_left(entries, (value, mgmt_ip))
+                if position < len(entries) and entries[position] == (value, mgmt_ip):
+                    del entries[position]
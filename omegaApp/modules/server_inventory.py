@@ -0,0 +1,227 @@
+import hashlib
+import json
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
+
+# Characters read from an inventory file at a time
+READ_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",:}]"
+
+
+class _JSONReader:
+    """Decodes JSON values from a text file one at a time, keeping only a chunk of it in memory"""
+
+    def __init__(self, f: IO[str], chunk_size: int):
+        # Every item is decoded separately, keys are shared across items like json.load does
+        keys = {}
+        self.decoder = json.JSONDecoder(
+            object_pairs_hook=lambda pairs: {keys.setdefault(key, key): value for key, value in pairs}
+        )
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer, self.pos, self.eof = "", 0, False
+        # Characters of the file before the buffer
+        self.consumed = 0
+
+    def tell(self) -> int:
+        """Character offset of the reader in the file"""
+        return self.consumed + self.pos
+
+    def read_more(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.consumed += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def skip(self, count: int):
+        """Skip count characters without decoding them"""
+        while self.pos + count > len(self.buffer):
+            if self.eof:
+                raise json.JSONDecodeError("Offset past the end of file", self.buffer, self.pos)
+            count -= len(self.buffer) - self.pos
+            self.pos = len(self.buffer)
+            self.read_more()
+        self.pos += count
+
+    def skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return
+            self.read_more()
+
+    def expect(self, chars: str) -> str:
+        self.skip_whitespace()
+        if self.pos >= len(self.buffer) or self.buffer[self.pos] not in chars:
+            found = self.buffer[self.pos] if self.pos < len(self.buffer) else "end of file"
+            raise json.JSONDecodeError(f"Expected one of {chars!r}, found {found!r}", self.buffer, self.pos)
+        return self.buffer[self.pos]
+
+    def decode(self) -> Any:
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number may be cut short by the end of the buffer ("1.5" read as "1.")
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in _DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.read_more()
+
+    def item(self) -> Tuple[str, Any]:
+        """The "key": value item at the reader"""
+        key = self.decode()
+        self.expect(":")
+        self.pos += 1
+        return key, self.decode()
+
+
+def iter_json_object(f: IO[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[int, str, Any]]:
+    """
+    Items of the top level JSON object of a file with their character offsets,
+    decoded one at a time so only the current item is held in memory, never
+    the whole document. read_json_item reads an item back from its offset.
+    :raises json.JSONDecodeError: If the file isn't a valid JSON object
+    """
+    reader = _JSONReader(f, chunk_size)
+    reader.expect("{")
+    reader.pos += 1
+    if reader.expect('"}') == "}":
+        return
+
+    while True:
+        offset = reader.tell()
+        key, value = reader.item()
+        yield offset, key, value
+        if reader.expect(",}") == "}":
+            return
+        reader.pos += 1
+        reader.expect('"')
+
+
+def read_json_item(f: IO[str], offset: int, chunk_size: int = READ_CHUNK_SIZE) -> Tuple[str, Any]:
+    """
+    The item of a JSON object at a character offset given by iter_json_object,
+    the characters before it are skipped without being decoded
+    :raises json.JSONDecodeError: If there is no item at the offset
+    """
+    reader = _JSONReader(f, chunk_size)
+    reader.skip(offset)
+    reader.expect('"')
+    return reader.item()
+
+
+def fingerprint(data) -> str:
+    """SHA-1 of JSON data, the same for equal data whatever the key order"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# Normalized fields of a server, see ServerDataManager._normalize_server_data
+NORMALIZED_FIELDS = (
+    "serial",
+    "vendor",
+    "model",
+    "hostname",
+    "mgmt_ip",
+    "network",
+    "memory",
+    "processors",
+    "storage",
+    "location",
+    "power",
+    "temperature",
+    "internal_devices",
+    "last_updated",
+)
+
+# Original fields the dashboard reads besides the normalized ones (the firmware filters)
+RAW_FIELDS = (
+    "BiosFirmware",
+    "ILOFIRMWARE",
+)
+
+
+class ServerRecord:
+    """
+    A loaded server: its normalized fields and the few RAW_FIELDS of the
+    original data, the rest of it stays in the inventory file and is read
+    back from source_path only for raw_data. source_hash fingerprints the
+    original data, raw_data is checked against it.
+    get() reads like the dict the dashboard used to keep.
+    """
+
+    __slots__ = NORMALIZED_FIELDS + RAW_FIELDS + ("source_path", "source_offset", "source_hash")
+
+    def __init__(
+        self, raw: Dict, normalized: Dict, source_path: Optional[str] = None, source_offset: Optional[int] = None
+    ):
+        """
+        :param raw: Original data of the server, only RAW_FIELDS and its fingerprint are kept
+        :param source_path: Inventory file of the server
+        :param source_offset: Character offset of the server in the file, from iter_json_object
+        """
+        self.source_path = source_path
+        self.source_offset = source_offset
+        self.source_hash = fingerprint(raw)
+        for field in NORMALIZED_FIELDS:
+            setattr(self, field, normalized.get(field))
+        for field in RAW_FIELDS:
+            setattr(self, field, raw.get(field))
+
+    def raw_data(self) -> Optional[Dict]:
+        """
+        Original data of the server, read back from its inventory file.
+        None if the server changed in the file since it was loaded, the reload will replace it.
+        """
+        if self.source_path is None:
+            return None
+        try:
+            with open(self.source_path, 'r', encoding='utf-8') as f:
+                _, raw = read_json_item(f, self.source_offset)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return raw if isinstance(raw, dict) and fingerprint(raw) == self.source_hash else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "raw_data":
+            return self.raw_data()
+        if key in NORMALIZED_FIELDS or key in RAW_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, KeyError)
+        if value is KeyError:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, KeyError) is not KeyError
+
+    def to_dict(self, include_raw: bool = False) -> Dict:
+        """The server as sent to the dashboard, with raw_data read from the file only when asked for"""
+        data = {}
+        for field in NORMALIZED_FIELDS + RAW_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        if include_raw:
+            data["raw_data"] = self.raw_data()
+        return data
+
+    # Records are pickled as plain tuples, they are sent back by the load processes
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __setstate__(self, state: Tuple):
+        for field, value in zip(self.__slots__, state):
+            setattr(self, field, value)
@@ -92,7 +92,9 @@ class ServerManager:
         if self._dcim_client is None and not self.is_dev_mode:
             self._dcim_client = DCIMClient(
                 base_url=current_app.config.get("DCIM_BASE_URL"),
-                verify_ssl=current_app.config.get("VERIFY_SSL", True)
+                verify_ssl=current_app.config.get("VERIFY_SSL", True),
+                max_in_flight=current_app.config.get("DCIM_MAX_IN_FLIGHT", 16),
+                timeout=current_app.config.get("DCIM_TIMEOUT", (5, 30)),
             )
         return self._dcim_client
         
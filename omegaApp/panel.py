@@ -2,16 +2,32 @@ from omegaApp.auth import authentication_ita
 from omegaApp.automations import translation_manager
 from omegaApp.logger_manager import LoggerManager
 from omegaApp.modules.panel_networkX import (
-    DataCenterMap,
-    Panel,
-    Location,
     InterfaceType,
     ClassificationType,
     RouteConstraints,
+    RouteTrace,
+    trace_span,
+)
+from omegaApp.modules.panel_graph_cache import panel_graph_cache, partition_key
+from omegaApp.modules.panel_route_cache import route_result_cache
+from omegaApp.modules.panel_reachability import INDEX_MIN_PORTS, rack_reachability
+from omegaApp.modules.panel_stats import panel_stats_cache
+from omegaApp.modules.dcim_fetch_pool import DCIMFetchPool
+from omegaApp.modules.dcim_asset_store import dcim_asset_store
+from omegaApp.modules.panel_sync import sync_panels, typed_columns
+from omegaApp.modules.panel_pull_job import panel_pull_jobs, PullJobProgress
+from omegaApp.modules.panel_query import (
+    InvalidCursor,
+    panel_filter,
+    page_query,
+    search_page_query,
+    cursor_after,
 )
 
 from typing import List
+import click
 import json
+import time
 import requests
 
 from flask import (
@@ -22,17 +38,35 @@ from flask import (
     session,
     jsonify,
     current_app,
+    Response,
+    stream_with_context,
 )
 from werkzeug.exceptions import abort
 
-from omegaApp.db import get_db, execute_query, execute_write_query, DatabaseError
+from omegaApp.db import (
+    get_db,
+    get_data_version,
+    execute_query,
+    execute_write_query,
+    DatabaseError,
+)
 
 
 bp = Blueprint("panels", __name__, url_prefix="/panels")
 
 logger = LoggerManager().get_logger()
 
-isUpdating = False
+DEFAULT_ROUTES_LIMIT = 50
+MAX_ROUTES_LIMIT = 500
+MAX_BATCH_ROUTES = 200
+
+MAX_PANELS_PAGE_SIZE = 5000
+
+# Assets read per request when paging through a DCIM search
+PANEL_SEARCH_PAGE_SIZE = 10000
+
+PULL_STREAM_INTERVAL_SECONDS = 1
+PULL_STREAM_KEEPALIVE_SECONDS = 15
 
 
 @bp.route("/")
@@ -66,51 +100,62 @@ def get_panels():
             body = request.get_json()
         else:
             body = request.form.to_dict()
-        # Base query
-        base_query = """
-            SELECT dcim_id, "name", room, rack, U, interface, size, 
-                   status, how_many_ports_remain, classification, 
-                   destination, date_created, date_updated 
-            FROM panels
-        """
 
-        # Build query based on filters
-        if body["filterRoom"] and len(body["filterRack"]) > 0:
-            query = f"{base_query} WHERE room = ? AND rack = ?"
-            params = (body["filterRoom"], body["filterRack"])
-        elif body["filterRoom"]:
-            query = f"{base_query} WHERE room = ?"
-            params = (body["filterRoom"],)
-        elif body["filterRack"]:
-            query = f"{base_query} WHERE rack = ?"
-            params = (body["filterRack"],)
-        elif body["filterTextInput"]:
-            query = f"{base_query} WHERE room = ? OR rack = ? OR (name LIKE ?)"
-            params = (
-                body["filterTextInput"],
-                body["filterTextInput"],
-                f"%{body['filterTextInput']}%",
-            )
-        else:
-            query = base_query
-            params = ()
+        try:
+            page_size = int(body.get("pageSize") or current_app.config["PANELS_PAGE_SIZE"])
+        except (TypeError, ValueError):
+            return jsonify({"error": "pageSize must be a number"}), 400
+        page_size = max(1, min(page_size, MAX_PANELS_PAGE_SIZE))
+        cursor = body.get("cursor")
 
-        # Execute query
-        filtered_panels = execute_query(query, params)
+        where, params, match = panel_filter(body)
 
-        # Process results
-        filtered_panels = sorted(filtered_panels, key=lambda x: x["rack"])
-        filtered_panels_dict = [dict(row) for row in filtered_panels]
+        # Execute query, free text searches are ranked by relevance
+        try:
+            if match:
+                query, query_params = search_page_query(match, page_size, cursor)
+            else:
+                query, query_params = page_query(where, params, page_size, cursor)
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        rows = execute_query(query, tuple(query_params))
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = cursor_after(rows[-1], match)
+
+        panels_data = []
+        for row in rows:
+            panel = dict(row)
+            del panel["id"]
+            panel.pop("search_rank", None)
+            panels_data.append(panel)
+
+        response = {
+            "panelsData": panels_data,
+            "nextCursor": next_cursor,
+            "pageSize": page_size,
+        }
 
-        # Get unique racks if needed
-        unique_racks_in_room = set()
-        if len(body["filterRack"]) == 0:
-            unique_racks_in_room = sorted({row["rack"] for row in filtered_panels})
+        # The total and the racks list only change with the filters, not between pages
+        if not cursor:
+            response["total"] = execute_query(
+                f"SELECT COUNT(*) AS total FROM panels {where}", tuple(params)
+            )[0]["total"]
+
+            unique_racks_in_room = []
+            if not body.get("filterRack"):
+                unique_racks_in_room = [
+                    row["rack"]
+                    for row in execute_query(
+                        f"SELECT DISTINCT rack FROM panels {where} AND rack IS NOT NULL ORDER BY rack",
+                        tuple(params),
+                    )
+                ]
+            response["filterData"] = unique_racks_in_room if unique_racks_in_room else ""
 
-        return {
-            "filterData": unique_racks_in_room if unique_racks_in_room else "",
-            "panelsData": filtered_panels_dict,
-        }
+        return response
 
     except DatabaseError as e:
         logger.error(f"Database error in get_panels: {str(e)}")
@@ -136,10 +181,14 @@ def edit(id):
                     how_many_ports_remain = ?, 
                     classification = ?, 
                     destination = ?,
+                    is_active = ?,
+                    ports_free = ?,
+                    content_hash = NULL,
                     date_updated = CURRENT_TIMESTAMP
                 WHERE dcim_id = ?
             """
 
+            is_active, _, ports_free = typed_columns(body)
             params = (
                 body.get("name"),
                 body.get("interface"),
@@ -147,10 +196,14 @@ def edit(id):
                 body.get("how_many_ports_remain"),
                 body.get("classification"),
                 body.get("destination"),
+                is_active,
+                ports_free,
                 body.get("dcim_id"),
             )
 
             execute_write_query(update_query, params)
+            panel_graph_cache.mark_dirty([body.get("dcim_id")])
+            rack_reachability.refresh(current_app._get_current_object())
 
             logger.info(
                 f"Edit panel - dcim_id: {body.get('dcimId')}, name: {body.get('name')}"
@@ -288,101 +341,101 @@ def update_dcim(id):
 @bp.route("/admin/pullallpanels", methods=("GET",))
 def get_all_panel_from_dcim():
     logger.info("Get all panels from DCIM")
-    global isUpdating
-    isUpdating = True
 
     try:
-        # קבלת כל הפאנלים מה-DCIM
-        allPatchPanel = search_assets("*", "patch-panel", 10000)
-        
-        # עדכון הנתונים במסד הנתונים
-        panels_to_update = []
-        for panels in allPatchPanel.values():
-            for panel in panels:
-                if not any(tap in panel["name"].lower() for tap in ["tap", "חד סיב"]):
-                    patchPanel = create_patch_panel_item(panel)
-                    panels_to_update.append(patchPanel)
-
-        update_data_panels_to_db(panels_to_update)
-
-        isUpdating = False
-        return {"status": "success", "message": "כל המידע עודכן!"}
+        headers = session.get("authentication")[1]
+        job, started = panel_pull_jobs.start(
+            current_app._get_current_object(),
+            lambda progress: pull_panels_from_dcim(progress, headers),
+        )
+        if started:
+            return {"status": "started", "message": "משיכת המידע התחילה", "job": job}
+        return {"status": "running", "message": "משיכת מידע כבר מתבצעת", "job": job}
     except Exception as e:
-        isUpdating = False
         logger.error(f"Error in get_all_panel_from_dcim: {str(e)}")
         return {"status": "error", "message": f"שגיאה במשיכת המידע! {str(e)}"}
 
 
-def update_data_panels_to_db(panels):
-    db = get_db()
-
-    existing_ids = fetch_existing_data()
-
-    for row in panels:
-        # Extract relevant data elements from the DCIM response (adjust based on your API structure)
-        dcim_id = row.get("dcim_id")
-        name = row.get("name")
-        room = row.get("room")
-        rack = row.get("rack")
-        U = row.get("U")
-        interface = row.get("interface")
-        size = row.get("size")
-        status = row.get("status")
-        how_many_ports_remain = row.get("how_many_ports_remain")
-        classification = row.get("classification")
-        destination = row.get("destination")
-
-        if dcim_id in existing_ids:
-            sql = """UPDATE panels SET name = ?, room = ?, rack = ?, U = ?, interface = ?, size = ?, status = ?, how_many_ports_remain = ?, classification = ?, destination = ? WHERE dcim_id = ?"""
-            db.execute(
-                sql,
-                (
-                    name,
-                    room,
-                    rack,
-                    U,
-                    interface,
-                    size,
-                    status,
-                    how_many_ports_remain,
-                    classification,
-                    destination,
-                    dcim_id,
-                ),
-            )
-        else:
-            sql = """INSERT INTO panels (dcim_id, name, room, rack, U, interface, size, status, how_many_ports_remain, classification, destination) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
-            db.execute(
-                sql,
-                (
-                    dcim_id,
-                    name,
-                    room,
-                    rack,
-                    U,
-                    interface,
-                    size,
-                    status,
-                    how_many_ports_remain,
-                    classification,
-                    destination,
-                ),
-            )
-
-    db.commit()
-
-
-def fetch_existing_data():
-    db = get_db()
-
-    data = db.execute("SELECT dcim_id FROM panels")
-    existing_ids = {row[0] for row in data.fetchall()}
-    db.commit()
-
-    return existing_ids
-
+def pull_panels_from_dcim(progress: PullJobProgress, headers):
+    """Pull all patch panels from DCIM into the database, runs as a background job"""
+    with DCIMFetchPool(
+        current_app.config["DCIM_BASE_URL"],
+        headers,
+        max_in_flight=current_app.config["DCIM_MAX_IN_FLIGHT"],
+        timeout=current_app.config["DCIM_TIMEOUT"],
+    ) as fetch_pool:
+        # קבלת כל הפאנלים מה-DCIM, בדפים עד סוף התוצאות
+        progress.set_phase("search")
+        allPatchPanel, complete = search_all_assets("*", "patch-panel", fetch_pool)
+
+        items = [
+            panel
+            for panel in allPatchPanel
+            if panel["roomName"]
+            and not any(tap in panel["name"].lower() for tap in ["tap", "חד סיב"])
+        ]
+
+        # משיכת פרטי הפאנלים במקביל
+        progress.set_phase("fetch", total=len(items))
+        panels_to_update = []
+        fetched_assets = []
+        failed = 0
+        for item, fetched, error in fetch_pool.map(
+            lambda item: fetch_patch_panel_item(item, fetch_pool), items
+        ):
+            progress.advance(failed=error is not None)
+            if error is not None:
+                failed += 1
+                logger.error(f"Failed to fetch panel {item.get('id')} from DCIM: {str(error)}")
+                continue
+            asset, patchPanel = fetched
+            fetched_assets.append(asset)
+            panels_to_update.append(patchPanel)
+
+    # הפרטים שנמשכו נשמרים גם במאגר המקומי של ה-DCIM
+    dcim_asset_store.put_many(fetched_assets)
+
+    # עדכון הנתונים במסד הנתונים, פאנלים שלא נמשכו בהצלחה לא נמחקים.
+    # פאנלים נמחקים רק כשרשימת הפאנלים מה-DCIM מלאה, כולל פאנלים ללא חדר
+    if not complete:
+        logger.warning("The DCIM panel search wasn't read to the end, no panels are tombstoned")
+    progress.set_phase("save")
+    summary = update_data_panels_to_db(
+        panels_to_update,
+        present_ids={panel["id"] for panel in allPatchPanel} if complete else None,
+    )
+    summary["failed"] = failed
 
-def search_assets(query: str, assets_type: str = None, returnItemsLimit: int = 100):
+    message = (
+        f"נוספו {summary['added']}, עודכנו {summary['changed']}, "
+        f"נמחקו {summary['removed']}, ללא שינוי {summary['unchanged']}"
+    )
+    if failed:
+        message = f"המידע עודכן ({message}), {failed} פאנלים לא נמשכו מה-DCIM"
+    else:
+        message = f"כל המידע עודכן! ({message})"
+    return {"message": message, "summary": summary}
+
+
+def update_data_panels_to_db(panels, present_ids=None):
+    """
+    Delta-sync the panels pulled from DCIM into the database.
+    Only new and changed panels are written, panels missing from present_ids are tombstoned.
+    """
+    summary = sync_panels(get_db(), panels, present_ids)
+    changed_ids = summary.pop("changed_ids")
+    panel_graph_cache.mark_dirty(changed_ids)
+    if changed_ids:
+        rack_reachability.refresh(current_app._get_current_object())
+    return summary
+
+
+def search_assets(
+    query: str,
+    assets_type: str = None,
+    returnItemsLimit: int = 100,
+    fetch_pool: DCIMFetchPool = None,
+):
     logger.info(f"Beginning a search for - {query}")
     dcim_base_url = current_app.config["DCIM_BASE_URL"]
 
@@ -391,9 +444,12 @@ def search_assets(query: str, assets_type: str = None, returnItemsLimit: int = 1
     else:
         search_url = f"{dcim_base_url}assets/search?q={query}s&returnItemsLimit={returnItemsLimit}"
 
-    response = requests.get(
-        search_url, headers=session.get("authentication")[1], verify=False
-    )
+    if fetch_pool is not None:
+        response = fetch_pool.session.get(search_url, timeout=fetch_pool.timeout)
+    else:
+        response = requests.get(
+            search_url, headers=session.get("authentication")[1], verify=False
+        )
 
     if response.status_code == 200:
         response = response.json()
@@ -418,7 +474,54 @@ def search_assets(query: str, assets_type: str = None, returnItemsLimit: int = 1
         return {}
 
 
-def create_patch_panel_item(item):
+def search_all_assets(
+    query: str,
+    assets_type: str,
+    fetch_pool: DCIMFetchPool,
+    page_size: int = PANEL_SEARCH_PAGE_SIZE,
+):
+    """
+    Every asset matching a search, read page by page (returnItemsOffset) until a
+    page comes back short
+    :return: Tuple of (assets as DCIM returned them, whether all of them were read).
+             Not complete when a request failed or DCIM ignored the offset, the
+             assets are then only part of the matching assets
+    """
+    assets, seen = [], set()
+    while True:
+        response = fetch_pool.session.get(
+            f"{fetch_pool.base_url}assets/search",
+            params={
+                "q": query,
+                "type": assets_type,
+                "returnItemsLimit": page_size,
+                "returnItemsOffset": len(assets),
+            },
+            timeout=fetch_pool.timeout,
+        )
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch assets: {response.status_code}")
+            return assets, False
+
+        page = response.json()
+        new_assets = [asset for asset in page if asset["id"] not in seen]
+        seen.update(asset["id"] for asset in new_assets)
+        assets.extend(new_assets)
+        if len(page) < page_size:
+            logger.info(f"Found {len(assets)} total items for query: {query}")
+            return assets, True
+        if not new_assets:
+            logger.warning(f"DCIM returned the same {len(page)} assets again, the search can't be paged")
+            return assets, False
+
+
+def fetch_patch_panel_item(item, fetch_pool: DCIMFetchPool):
+    """Fresh details of a panel from DCIM, and the panel item built from them"""
+    asset = fetch_pool.get_json(f"assets/{item['id']}?include=custom_properties")
+    return asset, create_patch_panel_item(item, asset=asset)
+
+
+def create_patch_panel_item(item, fetch_pool: DCIMFetchPool = None, asset=None):
     location = item["location"].split("/")
     if len(location) > 6:
         location.pop(1)
@@ -429,7 +532,14 @@ def create_patch_panel_item(item):
     classification = ""
     destination = ""
 
-    more_data = get_all_info_by_ids([item])
+    if asset is not None:
+        more_data = {item["id"]: asset}
+    elif fetch_pool is not None:
+        more_data = {
+            item["id"]: fetch_pool.get_json(f"assets/{item['id']}?include=custom_properties")
+        }
+    else:
+        more_data = get_all_info_by_ids([item])
     size = more_data[item["id"]]["rackMounted"]["unitHeight"]
     custom_propertie = more_data[item["id"]].get("customProperties")
     if (
@@ -506,14 +616,15 @@ def get_all_info_by_ids(ids: List[str]):
 
 def get_assete_by_id(id: str):
     dcim_base_url = current_app.config["DCIM_BASE_URL"]
+    headers = session.get("authentication")[1]
 
-    url_id = f"{dcim_base_url}assets/{id}?include=custom_properties"
+    def fetch(asset_id):
+        url_id = f"{dcim_base_url}assets/{asset_id}?include=custom_properties"
+        response = requests.get(url_id, headers=headers, verify=False)
+        # תשובת שגיאה לא נשמרת במאגר המקומי
+        return response.json() if response.status_code == 200 else None
 
-    response = requests.get(
-        url_id, headers=session.get("authentication")[1], verify=False
-    )
-    response = response.json()
-    return response
+    return dcim_asset_store.get(id, fetch)
 
 
 def get_panel(id):
@@ -536,199 +647,391 @@ def get_panel(id):
 
 @bp.route("/pull-status", methods=("GET",))
 def pull_status():
-    global isUpdating
-    return jsonify({"isUpdating": isUpdating})
+    job = panel_pull_jobs.current()
+    return jsonify({"isUpdating": panel_pull_jobs.is_running(job), "job": job})
+
+
+@bp.route("/pull-status/stream", methods=("GET",))
+def pull_status_stream():
+    """Server-Sent Events stream of the pull job state, ends when no job is running"""
+
+    def events():
+        last_state = None
+        last_sent = time.monotonic()
+        while True:
+            job = panel_pull_jobs.current()
+            is_updating = panel_pull_jobs.is_running(job)
+            state = json.dumps({"isUpdating": is_updating, "job": job}, default=str)
+
+            if state != last_state:
+                yield f"data: {state}\n\n"
+                last_state = state
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent > PULL_STREAM_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+            if not is_updating:
+                break
+            time.sleep(PULL_STREAM_INTERVAL_SECONDS)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @bp.route("/find_routes", methods=["POST"])
 def find_routes():
+    """
+    Routes between two racks.
+    With debug=true (in the body or the query string) the routes are returned as
+    {"routes": [...], "debug": {"spans": [...], "counts": {...}}} and the result
+    cache is skipped, so the trace covers the whole search.
+    """
     try:
         data = request.get_json()
-        logger.warning(f"Received route search request: {data}")
+        trace = RouteTrace() if route_debug_requested(data) else None
+        logger.debug(f"Received route search request: {data}")
 
-        dc_map = DataCenterMap()
-        db = get_db()
+        # Create constraints from request
+        try:
+            with trace_span(trace, "request"):
+                constraints, limit = parse_route_request(data)
+
+                # תוצאות קודמות תקפות כל עוד נתוני הפאנלים לא השתנו
+                version = get_data_version("panels")
+                cache_key = route_cache_key(data, constraints, limit)
+                formatted_routes = None
+                if trace is None:
+                    formatted_routes = route_result_cache.get(version, cache_key)
+                    if formatted_routes is not None:
+                        return jsonify(formatted_routes)
+
+                with panel_graph_cache.checkout(
+                    data["interfaceType"], data["classification"], trace
+                ) as dc_map:
+                    # Find routes
+                    routes = dc_map.find_all_routes(
+                        data["startRack"], data["endRack"], constraints, limit=limit, trace=trace
+                    )
 
-        # בניית שאילתה דינמית לפי הפרמטרים
-        query = """
-            SELECT * FROM panels 
-            WHERE (status = "True" OR status = "1" OR status = 1)
-            AND interface LIKE ?
-        """
-        params = [f"{data['interfaceType']}%"]  # משתמשים ב-% כדי לתפוס גם MM-LC וכו'
+                    logger.debug(f"Found {len(routes)} possible routes")
+
+                    with trace_span(trace, "routes.format"):
+                        formatted_routes = format_routes(dc_map, routes)
+
+                route_result_cache.put(version, cache_key, formatted_routes)
+
+            if trace is not None:
+                return jsonify({"routes": formatted_routes, "debug": trace.to_dict()})
+            return jsonify(formatted_routes)
+
+        except Exception as e:
+            logger.error(f"Error in route finding process: {str(e)}", exc_info=True)
+            return jsonify({"error": f"Error finding routes: {str(e)}"}), 500
+
+    except Exception as e:
+        logger.error(f"Error in find_routes: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+def route_debug_requested(data) -> bool:
+    """Whether a route request asked for a trace, with debug=true in the body or query string"""
+    flag = request.args.get("debug")
+    if flag is None and isinstance(data, dict):
+        flag = data.get("debug")
+    return str(flag).lower() == "true"
+
+
+def parse_route_request(data):
+    """
+    Route constraints and result limit of a find_routes request
+    :return: Tuple of (RouteConstraints, limit)
+    """
+    interface_type = InterfaceType(data["interfaceType"])
+    min_ports = int(data["minPorts"])
+    classification = None  # ברירת מחדל - מתאים לכל סיווג
 
-        # הוספת תנאי סיווג אם נבחר סיווג ספציפי
-        if data["classification"] and data["classification"].lower() != "red+black":
-            query += " AND classification = ?"
-            params.append(data["classification"].lower())
-        elif data["classification"] and data["classification"].lower() == "red+black":
-            query += ' AND (classification = "red" OR classification = "black" OR classification = "red+black")'
+    # טיפול בערך ברירת המחדל של max_hops
+    max_hops = 3  # ערך ברירת מחדל
+    if "maxHops" in data:
+        try:
+            max_hops = int(data["maxHops"])
+            max_hops = min(max(1, max_hops), 10)  # הגבלה בין 1 ל-10
+        except (ValueError, TypeError):
+            pass
+
+    # מספר המסלולים המקסימלי להחזרה
+    limit = DEFAULT_ROUTES_LIMIT
+    if "limit" in data:
+        try:
+            limit = int(data["limit"])
+            limit = min(max(1, limit), MAX_ROUTES_LIMIT)
+        except (ValueError, TypeError):
+            pass
+
+    # טיפול באולמות מועדפים
+    preferred_rooms = None
+    if "preferredRooms" in data and data["preferredRooms"]:
+        preferred_rooms = data["preferredRooms"]
+
+    if data["classification"]:
+        if data["classification"].lower() != "red+black":
+            classification = ClassificationType(data["classification"])
+
+    constraints = RouteConstraints(
+        interface_type=interface_type,
+        min_free_ports=min_ports,
+        classification=classification,
+        max_hops=max_hops,
+        preferred_rooms=preferred_rooms,
+    )
+    return constraints, limit
 
-        panels = db.execute(query, params).fetchall()
 
-        logger.warning(f"Found {len(panels)} matching panels")
+def route_cache_key(data, constraints, limit):
+    return (
+        partition_key(data["interfaceType"], data["classification"]),
+        data["startRack"],
+        data["endRack"],
+        constraints.cache_key(),
+        limit,
+    )
+
 
-        # Add panels to map
-        for panel in panels:
+@bp.route("/find_routes/batch", methods=["POST"])
+def find_routes_batch():
+    """
+    Routes for many rack pairs at once.
+    Body: {"routes": [find_routes requests...], "capacityAware": bool}
+    With capacityAware the pairs are planned in order and the best route of every
+    pair takes minPorts ports of its panels, so later pairs are planned against
+    the remaining capacity, across partitions as well.
+    """
+    try:
+        body = request.get_json()
+        route_requests = body.get("routes") if isinstance(body, dict) else None
+        if not isinstance(route_requests, list) or not route_requests:
+            return jsonify({"error": "routes must be a non-empty list"}), 400
+        if len(route_requests) > MAX_BATCH_ROUTES:
+            return jsonify({"error": f"At most {MAX_BATCH_ROUTES} routes per batch"}), 400
+        capacity_aware = bool(body.get("capacityAware"))
+
+        version = get_data_version("panels")
+        results = [None] * len(route_requests)
+        partitions = {}
+
+        for index, data in enumerate(route_requests):
             try:
-                interface_type = InterfaceType(panel["interface"].split("-")[0])
-
-                # טיפול בסיווג
-                classification = None
-                if panel["classification"]:
-                    if "red+black" in panel["classification"]:
-                        classification = None
-                    else:
+                constraints, limit = parse_route_request(data)
+                key = partition_key(data["interfaceType"], data["classification"])
+            except Exception as e:
+                results[index] = {"error": f"Invalid route request: {str(e)}"}
+                continue
+
+            if not capacity_aware:
+                formatted_routes = route_result_cache.get(
+                    version, route_cache_key(data, constraints, limit)
+                )
+                if formatted_routes is not None:
+                    results[index] = {"routes": formatted_routes}
+                    continue
+
+            partitions.setdefault(key, []).append((index, data, constraints, limit))
+
+        if capacity_aware:
+            plan_batch_with_capacity(partitions, results)
+        else:
+            # כל גרף נבנה פעם אחת לכל הזוגות שלו, לפי סדר הבקשות
+            for (interface_type, classification), items in partitions.items():
+                with panel_graph_cache.checkout(interface_type, classification) as dc_map:
+                    search_cache = {}
+
+                    for index, data, constraints, limit in items:
                         try:
-                            classification = ClassificationType(
-                                panel["classification"].upper()
+                            routes = dc_map.find_all_routes(
+                                data["startRack"],
+                                data["endRack"],
+                                constraints,
+                                limit=limit,
+                                search_cache=search_cache,
                             )
-                        except ValueError:
-                            classification = None
-
-                # פיצול היעדים והפורטים
-                destinations = (
-                    [
-                        dest.strip()
-                        for dest in panel["destination"].split(",")
-                        if dest.strip()
-                    ]
-                    if panel["destination"]
-                    else []
-                )
-                ports_remain_str = (
-                    panel["how_many_ports_remain"]
-                    if panel["how_many_ports_remain"]
-                    else ""
-                )
-                ports_dict = {}
-
-                # פירוק מחרוזת הפורטים ליעדים
-                if ":" in ports_remain_str:
-                    port_pairs = [pair.strip() for pair in ports_remain_str.split(",")]
-                    for pair in port_pairs:
-                        if ":" in pair:
-                            dest, ports = pair.split(":")
-                            dest = dest.strip()
-                            try:
-                                ports_dict[dest] = int(ports.strip())
-                            except ValueError:
-                                ports_dict[dest] = 0
-                else:
-                    try:
-                        default_ports = (
-                            int(ports_remain_str) if ports_remain_str.isdigit() else 0
+                            formatted_routes = format_routes(dc_map, routes)
+                        except Exception as e:
+                            logger.error(f"Error finding batch route {index}: {str(e)}", exc_info=True)
+                            results[index] = {"error": f"Error finding routes: {str(e)}"}
+                            continue
+
+                        route_result_cache.put(
+                            version, route_cache_key(data, constraints, limit), formatted_routes
                         )
-                        for dest in destinations:
-                            ports_dict[dest] = default_ports
-                    except ValueError:
-                        default_ports = 0
-                        for dest in destinations:
-                            ports_dict[dest] = default_ports
-
-                # יצירת פאנל נפרד לכל יעד
-                for dest in destinations:
-                    panel_id = f"{panel['dcim_id']}_{dest}"
-                    ports = ports_dict.get(dest, 0)
-
-                    p = Panel(
-                        id=panel_id,
-                        room=panel["room"],
-                        location=Location(panel["rack"], panel["U"]),
-                        interface_type=interface_type,
-                        status=True,
-                        how_many_ports_remain=ports,
-                        classification=classification,
-                        destination=dest,
-                    )
-                    dc_map.add_panel(p)
-                    logger.warning(f"Added panel {panel_id} to map: {p}")
+                        results[index] = {"routes": formatted_routes}
 
-            except (ValueError, KeyError, AttributeError) as e:
-                logger.warning(f"Skipping panel {panel['dcim_id']}: {str(e)}")
-                continue
+        for data, result in zip(route_requests, results):
+            if isinstance(data, dict):
+                result["startRack"] = data.get("startRack")
+                result["endRack"] = data.get("endRack")
 
-        # Connect panels
-        dc_map.connect_panels()
-        logger.warning("Panels connected")
+        return jsonify(results)
 
-        # Create constraints from request
+    except Exception as e:
+        logger.error(f"Error in find_routes_batch: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+def plan_batch_with_capacity(partitions, results):
+    """
+    Plan the batch pairs in request order, the best route of every pair takes
+    minPorts ports of its panels.
+    The same physical panel belongs to the graphs of several partitions (e.g.
+    RJ with and without a classification), so the ports taken are tracked per
+    panel for the whole batch and applied to each partition's copy before it
+    is searched.
+    """
+    consumed = {}  # panel id -> ports taken by the routes planned so far
+    plans = {}  # partition -> (map copy, ports applied to it per panel, search cache)
+
+    items = sorted(
+        (item + (key,) for key, key_items in partitions.items() for item in key_items),
+        key=lambda item: item[0],
+    )
+    for index, data, constraints, limit, key in items:
         try:
-            interface_type = InterfaceType(data["interfaceType"])
-            min_ports = int(data["minPorts"])
-            classification = None  # ברירת מחדל - מתאים לכל סיווג
-
-            # טיפול בערך ברירת המחדל של max_hops
-            max_hops = 3  # ערך ברירת מחדל
-            if "maxHops" in data:
-                try:
-                    max_hops = int(data["maxHops"])
-                    max_hops = min(max(1, max_hops), 10)  # הגבלה בין 1 ל-10
-                except (ValueError, TypeError):
-                    pass
-
-            # טיפול באולמות מועדפים
-            preferred_rooms = None
-            if "preferredRooms" in data and data["preferredRooms"]:
-                preferred_rooms = data["preferredRooms"]
-
-            if data["classification"]:
-                if data["classification"].lower() != "red+black":
-                    classification = ClassificationType(data["classification"])
-
-            constraints = RouteConstraints(
-                interface_type=interface_type,
-                min_free_ports=min_ports,
-                classification=classification,
-                max_hops=max_hops,
-                preferred_rooms=preferred_rooms,
-            )
-            logger.warning(f"Created constraints: {constraints}")
+            if key not in plans:
+                with panel_graph_cache.checkout(*key) as cached_map:
+                    plans[key] = (cached_map.routing_copy(), {}, {})
+            dc_map, applied, search_cache = plans[key]
+
+            # צריכת פורטים של זוגות קודמים, גם מגרפים של חלוקות אחרות
+            for panel_id, ports in consumed.items():
+                missing = ports - applied.get(panel_id, 0)
+                if missing > 0 and panel_id in dc_map.panels:
+                    dc_map.consume_ports([panel_id], missing)
+                    applied[panel_id] = ports
+                    search_cache.clear()
 
-            # Find routes
             routes = dc_map.find_all_routes(
-                data["startRack"], data["endRack"], constraints
+                data["startRack"],
+                data["endRack"],
+                constraints,
+                limit=limit,
+                search_cache=search_cache,
             )
+            formatted_routes = format_routes(dc_map, routes)
+        except Exception as e:
+            logger.error(f"Error finding batch route {index}: {str(e)}", exc_info=True)
+            results[index] = {"error": f"Error finding routes: {str(e)}"}
+            continue
+
+        if routes:
+            for panel_id in {panel_id for step in routes[0] for panel_id in step}:
+                consumed[panel_id] = consumed.get(panel_id, 0) + constraints.min_free_ports
+        results[index] = {
+            "routes": formatted_routes,
+            "plannedRoute": formatted_routes[0] if formatted_routes else None,
+        }
 
-            logger.warning(f"Found {len(routes)} possible routes")
-
-            # Format routes for response
-            formatted_routes = []
-            for route in routes:
-                route_steps = []
-                for panel1_id, panel2_id in route:
-                    panel1 = dc_map.panels[panel1_id]
-                    panel2 = dc_map.panels[panel2_id]
-                    route_steps.append(
-                        {
-                            "panelId": panel1_id,
-                            "location": str(panel1.location),
-                            "destination": panel1.destination,
-                            "interfaceType": panel1.interface_type.value,
-                        }
-                    )
-                    if panel2_id == route[-1][1]:  # Add last panel
-                        route_steps.append(
-                            {
-                                "panelId": panel2_id,
-                                "location": str(panel2.location),
-                                "destination": panel2.destination,
-                                "interfaceType": panel2.interface_type.value,
-                            }
-                        )
-                formatted_routes.append(route_steps)
 
-            return jsonify(formatted_routes)
+def format_routes(dc_map, routes):
+    """Format routes for response, a list of panel steps per route"""
+    formatted_routes = []
+    for route in routes:
+        route_steps = []
+        for panel1_id, panel2_id in route:
+            panel1 = dc_map.panels[panel1_id]
+            panel2 = dc_map.panels[panel2_id]
+            route_steps.append(
+                {
+                    "panelId": panel1_id,
+                    "location": str(panel1.location),
+                    "destination": panel1.destination,
+                    "interfaceType": panel1.interface_type.value,
+                }
+            )
+            if panel2_id == route[-1][1]:  # Add last panel
+                route_steps.append(
+                    {
+                        "panelId": panel2_id,
+                        "location": str(panel2.location),
+                        "destination": panel2.destination,
+                        "interfaceType": panel2.interface_type.value,
+                    }
+                )
+        formatted_routes.append(route_steps)
+    return formatted_routes
+
+
+@bp.route("/api/routes/cache-stats", methods=["GET"])
+def route_cache_stats():
+    return jsonify(route_result_cache.stats())
+
+
+@bp.route("/api/reachability", methods=["GET"])
+def rack_reachability_query():
+    """
+    Whether two racks can be connected within maxHops, and the minimum route weight.
+    Query: startRack, endRack, interfaceType, classification, maxHops, minPorts.
+    Answered from the reachability index when it is up to date and minPorts is 1,
+    otherwise by a route search ("indexed": false).
+    """
+    data = {
+        "startRack": request.args.get("startRack"),
+        "endRack": request.args.get("endRack"),
+        "interfaceType": request.args.get("interfaceType"),
+        "classification": request.args.get("classification", ""),
+        "minPorts": request.args.get("minPorts", INDEX_MIN_PORTS),
+        "maxHops": request.args.get("maxHops", 3),
+    }
+    if not data["startRack"] or not data["endRack"]:
+        return jsonify({"error": "startRack and endRack are required"}), 400
+    try:
+        constraints, _ = parse_route_request(data)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid reachability request: {str(e)}"}), 400
 
-        except Exception as e:
-            logger.error(f"Error in route finding process: {str(e)}", exc_info=True)
-            return jsonify({"error": f"Error finding routes: {str(e)}"}), 500
+    try:
+        if constraints.min_free_ports == INDEX_MIN_PORTS:
+            result = rack_reachability.lookup(
+                data["interfaceType"],
+                data["classification"],
+                data["startRack"],
+                data["endRack"],
+                constraints.max_hops,
+            )
+            if result is not None:
+                result["indexed"] = True
+                return jsonify(result)
+
+        version = get_data_version("panels")
+        with panel_graph_cache.checkout(data["interfaceType"], data["classification"]) as dc_map:
+            best = next(dc_map.iter_routes(data["startRack"], data["endRack"], constraints), None)
+        return jsonify({
+            "reachable": best is not None,
+            "minWeight": best[1] if best else None,
+            "hops": len(best[0]) if best else None,
+            "dataVersion": version,
+            "indexed": False,
+        })
 
     except Exception as e:
-        logger.error(f"Error in find_routes: {str(e)}", exc_info=True)
+        logger.error(f"Error in rack_reachability_query: {str(e)}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 
+@bp.cli.command("build-reachability")
+def build_reachability_command():
+    """Build the rack reachability indexes of all partitions."""
+    for interface_type in InterfaceType:
+        for classification in ("", "red", "black", "red+black"):
+            key = partition_key(interface_type.value, classification)
+            index = rack_reachability.build(key)
+            click.echo(
+                f"{key}: {len(index.routes)} connected spine pairs, data version {index.version}"
+            )
+
+
 @bp.route('/api/rooms', methods=['GET'])
 def get_rooms():
     try:
@@ -738,6 +1041,7 @@ def get_rooms():
             SELECT DISTINCT room 
             FROM panels 
             WHERE room IS NOT NULL 
+              AND deleted_at IS NULL
               AND LOWER(room) != 'test'  
               AND room NOT LIKE '%test%' 
             ORDER BY room
@@ -793,200 +1097,14 @@ def refresh_translations():
 @bp.route("/get_panel_statistics", methods=["GET"])
 def get_panel_statistics():
     try:
-        db = get_db()
-        cursor = db.cursor()
-
-        # Get room statistics
-        room_stats = {}
-        cursor.execute("""
-            SELECT 
-                room,
-                COUNT(*) as panel_count,
-                SUM(CASE WHEN status = 'True' OR status = '1' THEN 1 ELSE 0 END) as active_panels,
-                COUNT(*) * 24 as total_ports,
-                SUM(CAST(COALESCE(NULLIF(how_many_ports_remain, ''), '0') AS INTEGER)) as ports_remain,
-                COUNT(DISTINCT rack) as rack_count,
-                COUNT(DISTINCT classification) as classification_count,
-                AVG(CAST(COALESCE(NULLIF(size, ''), '0') AS INTEGER)) as avg_size,
-                GROUP_CONCAT(DISTINCT interface) as interfaces,
-                GROUP_CONCAT(DISTINCT classification) as classifications,
-                SUM(CASE WHEN interface LIKE 'MM%' THEN 1 ELSE 0 END) as mm_count,
-                SUM(CASE WHEN interface LIKE 'SM%' THEN 1 ELSE 0 END) as sm_count,
-                SUM(CASE WHEN interface LIKE 'RJ%' THEN 1 ELSE 0 END) as rj_count,
-                MIN(CAST(COALESCE(NULLIF(size, ''), '0') AS INTEGER)) as min_size,
-                MAX(CAST(COALESCE(NULLIF(size, ''), '0') AS INTEGER)) as max_size,
-                COUNT(DISTINCT CASE WHEN destination IS NOT NULL AND destination != '' THEN destination END) as destinations_count,
-                GROUP_CONCAT(how_many_ports_remain) as all_ports_remain
-            FROM panels 
-            WHERE room IS NOT NULL 
-            GROUP BY room
-            ORDER BY panel_count DESC
-        """)
-        
-        for row in cursor.fetchall():
-            total_ports = row['total_ports']
-            
-            # Parse how_many_ports_remain more carefully
-            available_ports = 0
-            ports_remain_str = row['all_ports_remain']
-            if ports_remain_str:
-                for entry in ports_remain_str.split(','):
-                    entry = entry.strip()
-                    if ':' in entry:  # Format: "ROOM:24"
-                        try:
-                            port_num = entry.split(':')[1].strip()
-                            if port_num.isdigit():
-                                available_ports += int(port_num)
-                        except (IndexError, ValueError):
-                            continue
-                    elif entry.isdigit():  # Simple number
-                        available_ports += int(entry)
-            
-            used_ports = total_ports - available_ports
-            port_utilization = (used_ports / total_ports * 100) if total_ports > 0 else 0
-            interfaces = row['interfaces'].split(',') if row['interfaces'] else []
-            classifications = row['classifications'].split(',') if row['classifications'] else []
-            
-            room_stats[row['room']] = {
-                'panelCount': row['panel_count'],
-                'activePanels': row['active_panels'],
-                'totalPorts': total_ports,
-                'usedPorts': used_ports,
-                'availablePorts': available_ports,
-                'rackCount': row['rack_count'],
-                'classificationCount': row['classification_count'],
-                'avgSize': round(row['avg_size'], 1) if row['avg_size'] else 0,
-                'minSize': row['min_size'] or 0,
-                'maxSize': row['max_size'] or 0,
-                'interfaces': list(set(filter(None, interfaces))),
-                'classifications': list(set(filter(None, classifications))),
-                'mmCount': row['mm_count'] or 0,
-                'smCount': row['sm_count'] or 0,
-                'rjCount': row['rj_count'] or 0,
-                'destinationsCount': row['destinations_count'] or 0,
-                'portUtilization': round(port_utilization, 1)
-            }
-
-        # Get interface type statistics with classification breakdown
-        cursor.execute("""
-            SELECT 
-                interface,
-                classification,
-                COUNT(*) as type_count,
-                SUM(CASE WHEN status = 'True' OR status = '1' THEN 1 ELSE 0 END) as active_count
-            FROM panels 
-            WHERE interface IS NOT NULL 
-            GROUP BY interface, classification
-            ORDER BY interface, classification
-        """)
-        type_stats = {}
-        for row in cursor.fetchall():
-            interface = row['interface'] or 'לא מוגדר'
-            if interface not in type_stats:
-                type_stats[interface] = {
-                    'total': 0,
-                    'active': 0,
-                    'classifications': {}
-                }
-            type_stats[interface]['total'] += row['type_count']
-            type_stats[interface]['active'] += row['active_count']
-            if row['classification']:
-                type_stats[interface]['classifications'][row['classification']] = row['type_count']
-
-        # Get classification statistics
-        cursor.execute("""
-            SELECT 
-                classification,
-                COUNT(*) as count,
-                COUNT(DISTINCT room) as room_count,
-                COUNT(DISTINCT rack) as rack_count,
-                SUM(CASE WHEN status = 'True' OR status = '1' THEN 1 ELSE 0 END) as active_count
-            FROM panels 
-            WHERE classification IS NOT NULL
-            GROUP BY classification
-        """)
-        classification_stats = {
-            row['classification']: {
-                'count': row['count'],
-                'roomCount': row['room_count'],
-                'rackCount': row['rack_count'],
-                'activeCount': row['active_count']
-            } for row in cursor.fetchall()
-        }
-
-        # Get time-based statistics (panels added per month)
-        cursor.execute("""
-            SELECT 
-                strftime('%Y-%m', date_created) as month,
-                COUNT(*) as panel_count
-            FROM panels 
-            GROUP BY month
-            ORDER BY month DESC
-            LIMIT 12
-        """)
-        time_stats = {
-            row['month']: row['panel_count'] for row in cursor.fetchall()
-        }
+        payload, etag = panel_stats_cache.get()
 
-        # Get overall port statistics
-        cursor.execute("""
-            SELECT 
-                COUNT(*) * 24 as total_ports,
-                GROUP_CONCAT(how_many_ports_remain) as all_ports_remain,
-                COUNT(DISTINCT room) as total_rooms,
-                COUNT(DISTINCT rack) as total_racks,
-                COUNT(DISTINCT classification) as total_classifications,
-                COUNT(DISTINCT interface) as total_interfaces,
-                AVG(CAST(COALESCE(NULLIF(size, ''), '0') AS INTEGER)) as avg_panel_size,
-                COUNT(*) as total_panels,
-                SUM(CASE WHEN status = 'True' OR status = '1' THEN 1 ELSE 0 END) as active_panels
-            FROM panels
-        """)
-        summary_data = cursor.fetchone()
-        total_ports = summary_data['total_ports'] if summary_data['total_ports'] else 0
-        
-        # Parse how_many_ports_remain for summary
-        available_ports = 0
-        ports_remain_str = summary_data['all_ports_remain']
-        if ports_remain_str:
-            for entry in ports_remain_str.split(','):
-                entry = entry.strip()
-                if ':' in entry:  # Format: "ROOM:24"
-                    try:
-                        port_num = entry.split(':')[1].strip()
-                        if port_num.isdigit():
-                            available_ports += int(port_num)
-                    except (IndexError, ValueError):
-                        continue
-                elif entry.isdigit():  # Simple number
-                    available_ports += int(entry)
-        
-        used_ports = total_ports - available_ports
-        
-        summary_stats = {
-            'totalPanels': summary_data['total_panels'],
-            'activePanels': summary_data['active_panels'],
-            'totalRooms': summary_data['total_rooms'],
-            'totalRacks': summary_data['total_racks'],
-            'totalClassifications': summary_data['total_classifications'],
-            'totalInterfaces': summary_data['total_interfaces'],
-            'avgPanelSize': round(summary_data['avg_panel_size'], 1) if summary_data['avg_panel_size'] else 0,
-            'ports': {
-                'total': total_ports,
-                'used': used_ports,
-                'available': available_ports,
-                'utilization': round(((used_ports) / total_ports * 100), 1) if total_ports > 0 else 0
-            }
-        }
-
-        return jsonify({
-            'roomStats': room_stats,
-            'typeStats': type_stats,
-            'classificationStats': classification_stats,
-            'timeStats': time_stats,
-            'summaryStats': summary_stats
-        })
+        response = current_app.response_class(payload, mimetype="application/json")
+        response.set_etag(etag)
+        # Clients must revalidate, an unchanged dashboard gets a 304 without a body
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
     except Exception as e:
         current_app.logger.error(f"Error getting panel statistics: {str(e)}")
-        return jsonify({'error': str(e)}), 500  
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
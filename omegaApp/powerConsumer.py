@@ -11,6 +11,8 @@ from flask import (
 
 import requests
 
+from .modules.dcim_asset_store import dcim_asset_store
+
 bp = Blueprint("powerConsumer", __name__, url_prefix="/powerConsumer")
 
 MOCK_ASSETS = {
@@ -179,14 +181,17 @@ def get_all_asset_info_by_ids(assets: list):
 def get_assete_by_id(id: str):
     dcim_base_url = current_app.config["DCIM_BASE_URL"]
     
-    try:
-        url_id = f"{dcim_base_url}assets/{id}"
-        response = requests.get(
-            url_id, headers=session.get("authentication")[1], verify=False
-        )
+    headers = session.get("authentication")[1]
+
+    def fetch(asset_id):
+        url_id = f"{dcim_base_url}assets/{asset_id}?include=custom_properties"
+        response = requests.get(url_id, headers=headers, verify=False)
         response.raise_for_status()  # יזרוק חריגה אם הסטטוס לא 200
-        asset_data = response.json()
-        return asset_data
+        return response.json()
+
+    try:
+        # נקרא דרך המאגר המקומי, נכסים שכבר נשלפו לא נשלפים שוב מה-DCIM
+        return dcim_asset_store.get(id, fetch) or {}
     except requests.RequestException as e:
         print(f"Network error in get_assete_by_id: {str(e)}")
         return {}
@@ -1,12 +1,17 @@
-from flask import Blueprint, jsonify, request, current_app, session
+from flask import Blueprint, jsonify, request, current_app, session, Response, stream_with_context
 from ..modules.dcim_manager import DCIMManager
+from ..modules.dcim_asset_store import dcim_asset_store
 from ..logger_manager import LoggerManager
-from typing import Dict
+from typing import Dict, List, Tuple
+import json
+import time
 
 logger = LoggerManager().get_logger()
 dcim_api = Blueprint('dcim_api', __name__, url_prefix='/api/dcim')
 dcim_manager = DCIMManager()
 
+MAX_BULK_SEARCH_CRITERIA = 1000
+
 def _ensure_dcim_auth():
     """Ensure DCIM is authenticated"""
     if not dcim_manager.refresh_auth():
@@ -146,6 +151,21 @@ def get_all_assets():
             "error": str(e)
         }), 500
 
+@dcim_api.route('/assets/store/stats', methods=['GET'])
+def get_asset_store_stats():
+    """Hit rate of the local asset store in this worker, and its size"""
+    try:
+        return jsonify({
+            "status": "success",
+            "data": dcim_asset_store.stats()
+        })
+    except Exception as e:
+        logger.error(f"Error getting DCIM asset store stats: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "error": str(e)
+        }), 500
+
 @dcim_api.route('/assets/<asset_id>', methods=['GET'])
 def get_asset_details(asset_id):
     """Get detailed information about a specific asset"""
@@ -204,7 +224,14 @@ def update_asset(asset_id):
 # New route for bulk asset operations
 @dcim_api.route('/assets/bulk/search', methods=['POST'])
 def bulk_search_assets():
-    """Search for multiple assets using different criteria"""
+    """
+    Search for multiple assets using different criteria.
+    Identical criteria are searched once and the searches run concurrently.
+    Returns the found assets in the order of search_criteria. With
+    "Accept: application/x-ndjson" or ?stream=1 the results are streamed as
+    NDJSON in completion order instead, one line per unique criteria with its
+    indexes in search_criteria, then a summary line.
+    """
     auth_error = _ensure_dcim_auth()
     if auth_error:
         return auth_error
@@ -219,22 +246,98 @@ def bulk_search_assets():
                 "status": "error",
                 "error": "No search criteria provided"
             }), 400
-            
-        results = []
-        for criteria in search_criteria_list:
-            result = dcim_manager.client.search_asset(criteria, include_details)
-            if result:
-                results.append(result)
-                
-        return jsonify({
-            "status": "success",
-            "data": results,
-            "total_found": len(results)
-        })
-            
+        if len(search_criteria_list) > MAX_BULK_SEARCH_CRITERIA:
+            return jsonify({
+                "status": "error",
+                "error": f"At most {MAX_BULK_SEARCH_CRITERIA} search criteria per request"
+            }), 400
+        if not all(isinstance(criteria, dict) for criteria in search_criteria_list):
+            return jsonify({
+                "status": "error",
+                "error": "Every search criteria must be an object"
+            }), 400
+
+        unique_criteria, indexes = dedupe_criteria(search_criteria_list)
+        client = dcim_manager.client
+
+        if not wants_ndjson():
+            assets = [None] * len(unique_criteria)
+            for index, asset, error, _ in client.bulk_search(unique_criteria, include_details):
+                if error:
+                    logger.error(f"Error searching DCIM for {unique_criteria[index]}: {error}")
+                assets[index] = asset
+
+            position = {i: index for index, positions in enumerate(indexes) for i in positions}
+            results = [
+                assets[position[i]] for i in range(len(search_criteria_list))
+                if assets[position[i]]
+            ]
+            return jsonify({
+                "status": "success",
+                "data": results,
+                "total_found": len(results)
+            })
+
     except Exception as e:
         logger.error(f"Error in bulk asset search: {str(e)}")
         return jsonify({
             "status": "error",
             "error": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+    def results():
+        started = time.perf_counter()
+        counts = {"found": 0, "not_found": 0, "error": 0}
+        try:
+            for index, asset, error, latency_ms in client.bulk_search(unique_criteria, include_details):
+                status = "error" if error else "found" if asset else "not_found"
+                counts[status] += 1
+                yield json.dumps({
+                    "status": status,
+                    "criteria": unique_criteria[index],
+                    "indexes": indexes[index],
+                    "data": asset,
+                    "error": error,
+                    "latency_ms": latency_ms,
+                }, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"Error in bulk asset search: {str(e)}")
+            yield json.dumps({"status": "error", "error": str(e)}, ensure_ascii=False) + "\n"
+
+        yield json.dumps({
+            "summary": {
+                "total": len(search_criteria_list),
+                "unique": len(unique_criteria),
+                "total_found": counts["found"],
+                "not_found": counts["not_found"],
+                "errors": counts["error"],
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+        }) + "\n"
+
+    return Response(stream_with_context(results()), mimetype="application/x-ndjson")
+
+
+def wants_ndjson() -> bool:
+    """Whether the client asked for a streamed NDJSON response"""
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    accepted = request.accept_mimetypes
+    return accepted["application/x-ndjson"] > accepted["application/json"]
+
+
+def dedupe_criteria(search_criteria_list: List[Dict]) -> Tuple[List[Dict], List[List[int]]]:
+    """
+    Unique search criteria, empty values are ignored as the search ignores them
+    :return: Tuple of (unique criteria, indexes in search_criteria_list of every unique criteria)
+    """
+    unique_criteria, indexes, positions = [], [], {}
+    for index, criteria in enumerate(search_criteria_list):
+        criteria = {key: value for key, value in criteria.items() if value}
+        key = json.dumps(criteria, sort_keys=True, default=str)
+        if key not in positions:
+            positions[key] = len(unique_criteria)
+            unique_criteria.append(criteria)
+            indexes.append([])
+        indexes[positions[key]].append(index)
+    return unique_criteria, indexes
\ No newline at end of file
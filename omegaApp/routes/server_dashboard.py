@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, render_template, current_app, request, session
 from ..modules.server_dashboard import ServerDataManager
+from ..modules.server_index import RANGE_FIELDS, VALUE_FIELDS
 from ..modules.dcim_manager import DCIMManager
 from ..logger_manager import LoggerManager
 import os
@@ -9,19 +10,40 @@ server_manager = None
 dcim_manager = DCIMManager()  # Singleton instance
 logger = LoggerManager().get_logger()
 
-def get_server_manager():
-    """Get or create the ServerDataManager singleton"""
+dcim_initialized = False
+
+# Largest page of /api/servers/query
+QUERY_MAX_PAGE_SIZE = 500
+
+def create_server_manager(app) -> ServerDataManager:
+    """
+    Create the ServerDataManager singleton at app start.
+    Its data is loaded in the background, by a pool of SERVERS_LOAD_WORKERS processes.
+    """
     global server_manager
     if server_manager is None:
-        try:
-            # Get data directory configuration
-            data_dir = current_app.config.get('SERVERS_DATA_DIR')
-            if not data_dir:
-                raise ValueError("SERVERS_DATA_DIR must be configured")
+        # Get data directory configuration
+        data_dir = app.config.get('SERVERS_DATA_DIR')
+        if not data_dir:
+            raise ValueError("SERVERS_DATA_DIR must be configured")
 
-            # Initialize server manager
-            server_manager = ServerDataManager(data_dir)
-            
+        server_manager = ServerDataManager(
+            data_dir,
+            dcim_match_ttl=app.config.get('DCIM_MATCH_TTL', 900),
+            load_workers=app.config.get('SERVERS_LOAD_WORKERS', 1),
+            load_in_background=True,
+        )
+        logger.info("ServerDataManager initialized, loading server data in the background")
+    return server_manager
+
+def get_server_manager():
+    """Get or create the ServerDataManager singleton"""
+    global dcim_initialized
+    try:
+        manager = create_server_manager(current_app)
+
+        if not dcim_initialized:
+            dcim_initialized = True
             # Initialize DCIM if configured
             dcim_base_url = current_app.config.get('DCIM_BASE_URL')
             if dcim_base_url:
@@ -29,11 +51,11 @@ def get_server_manager():
             
             logger.info("ServerDataManager initialized successfully")
             
-        except Exception as e:
-            logger.error(f"Error initializing server manager: {str(e)}")
-            raise
+    except Exception as e:
+        logger.error(f"Error initializing server manager: {str(e)}")
+        raise
             
-    return server_manager
+    return manager
 
 @server_dashboard.route('/dashboard')
 def index():
@@ -45,12 +67,88 @@ def index():
 def get_servers():
     """Get all servers"""
     try:
-        servers = get_server_manager().get_all_assets()
-        return jsonify({"status": "success", "data": servers})
+        manager = get_server_manager()
+        servers = manager.get_all_assets()
+        # Until the initial load finishes data holds the servers loaded so far
+        return jsonify({
+            "status": "success",
+            "data": servers,
+            "ready": manager.is_ready,
+            "loading": manager.load_status(),
+        })
     except Exception as e:
         logger.error(f"Error getting servers: {str(e)}")
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@server_dashboard.route('/api/servers/status', methods=['GET'])
+def get_servers_status():
+    """Initial load progress, file watcher and DCIM match cache counters"""
+    try:
+        manager = get_server_manager()
+        return jsonify({
+            "status": "success",
+            "data": {
+                "load": manager.load_status(),
+                "reload": manager.reload_stats(),
+                "dcim_matches": manager.dcim_matches.stats(),
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error getting servers status: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+def _list_arg(name):
+    """Values of a query parameter, repeated and/or comma separated"""
+    return [value.strip() for arg in request.args.getlist(name) for value in arg.split(',') if value.strip()]
+
+def _number_arg(name):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+@server_dashboard.route('/api/servers/query', methods=['GET'])
+def query_servers():
+    """
+    Filtered, paginated servers with only the requested fields.
+    Filters: any of VALUE_FIELDS (e.g. vendor=HPE,Dell&rack=A1), <field>_min/<field>_max
+    for RANGE_FIELDS (memory, cores), dcim_status and q (hostname, serial or mgmt_ip).
+    Other parameters: fields, sort (-field for descending), page, page_size and facets.
+    """
+    try:
+        values = {field: _list_arg(field) for field in VALUE_FIELDS}
+        ranges = {field: (_number_arg(f"{field}_min"), _number_arg(f"{field}_max")) for field in RANGE_FIELDS}
+        try:
+            page = int(request.args.get('page', 1))
+            page_size = int(request.args.get('page_size', 50))
+        except ValueError:
+            raise ValueError("page and page_size must be integers")
+        if page < 1 or not 1 <= page_size <= QUERY_MAX_PAGE_SIZE:
+            raise ValueError(f"page must be at least 1 and page_size between 1 and {QUERY_MAX_PAGE_SIZE}")
+
+        manager = get_server_manager()
+        result = manager.query(
+            values=values,
+            ranges=ranges,
+            dcim_status=_list_arg('dcim_status'),
+            text=request.args.get('q'),
+            fields=_list_arg('fields') or None,
+            sort=request.args.get('sort') or 'mgmt_ip',
+            page=page,
+            page_size=page_size,
+            facets=_list_arg('facets'),
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error querying servers: {str(e)}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+    return jsonify({"status": "success", **result, "ready": manager.is_ready})
+
 @server_dashboard.route('/api/servers/<mgmt_ip>', methods=['GET'])
 def get_server(mgmt_ip):
     """Get specific server data"""
@@ -17,11 +17,46 @@ CREATE TABLE
     how_many_ports_remain TEXT,
     classification TEXT,
     date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    date_updated TIMESTAMP
-    -- CONSTRAINT idx_room CREATE INDEX IF NOT EXISTS idx_room ON panels(room),
-    -- CONSTRAINT idx_rack CREATE INDEX IF NOT EXISTS idx_rack ON panels(rack)
+    date_updated TIMESTAMP,
+    content_hash TEXT,
+    deleted_at TIMESTAMP,
+    is_active INTEGER NOT NULL DEFAULT 0,
+    size_units INTEGER NOT NULL DEFAULT 0,
+    ports_free INTEGER NOT NULL DEFAULT 0
   );
 
+CREATE TABLE
+  IF NOT EXISTS pull_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    phase TEXT NOT NULL DEFAULT '',
+    fetched INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    eta_seconds REAL,
+    message TEXT NOT NULL DEFAULT '',
+    summary TEXT,
+    error TEXT,
+    started_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TEXT
+  );
+
+CREATE TABLE
+  IF NOT EXISTS dcim_assets (
+    asset_id TEXT PRIMARY KEY,
+    serial TEXT,
+    name TEXT,
+    type TEXT,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+  );
+
+CREATE INDEX IF NOT EXISTS idx_dcim_assets_serial ON dcim_assets(serial);
+CREATE INDEX IF NOT EXISTS idx_dcim_assets_name ON dcim_assets(name);
+CREATE INDEX IF NOT EXISTS idx_dcim_assets_type ON dcim_assets(type);
+
 CREATE TABLE
   IF NOT EXISTS automations (
     instance_id TEXT PRIMARY KEY,
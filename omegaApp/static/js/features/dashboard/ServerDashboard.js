@@ -65,6 +65,10 @@ export default class ServerDashboard {
                         <span class="stat-label">צריכת חשמל כוללת</span>
                         <span class="stat-value" id="totalPower">8460W</span>
                     </div>
+                    <div class="stat-item hidden" id="loadProgressItem">
+                        <span class="stat-label">טעינת נתונים</span>
+                        <span class="stat-value" id="loadProgress"></span>
+                    </div>
                 </div>
             </div>
 
@@ -124,6 +128,7 @@ export default class ServerDashboard {
                 this.updateLocationsFilter();
                 this.filterServers();
                 this.updateDashboardStats();
+                this.updateLoadProgress();
             } else {
                 throw new Error('תבנית נתונים לא תקינה');
             }
@@ -134,6 +139,19 @@ export default class ServerDashboard {
         }
     }
 
+    updateLoadProgress() {
+        const status = ServerDashboardService.loadStatus;
+        document.getElementById('loadProgressItem')?.classList.toggle('hidden', !status);
+        if (!status) return;
+
+        const files = status.files_total == null ? '' : ` (${status.files_loaded}/${status.files_total} קבצים)`;
+        document.getElementById('loadProgress').textContent = `${status.servers} שרתים${files}`;
+
+        // השרת עדיין טוען נתונים - נטען שוב בעוד רגע
+        clearTimeout(this.loadProgressTimer);
+        this.loadProgressTimer = setTimeout(() => this.loadServers(), 2000);
+    }
+
     updateLocationsFilter() {
         const locations = new Set();
         this.servers.forEach(server => {
@@ -15,6 +15,8 @@ class ServerDashboardService {
 
             const data = await response.json();
             if (data.status === 'success') {
+                // Progress of the initial server data load, null once it finished
+                this.loadStatus = data.ready === false ? data.loading : null;
                 return data.data;
             }
             throw new Error(data.message || 'Failed to fetch servers data');
@@ -4,32 +4,31 @@ import { handleEditClick } from './modal.js';
 
 const { roomSelect, rackSelect, filterInput, spinnerContainer } = elements;
 
+// Incremented on every load, so pages of an older load stop being appended
+let loadGeneration = 0;
 
 export async function loadData(howChange) {
+    const generation = ++loadGeneration;
     try {
         spinnerContainer.style.display = 'flex';
         const userFilters = buildFilters(howChange);
 
-        const response = await fetch('get_panels', {
-            method: "POST",
-            headers: {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            },
-            body: JSON.stringify(userFilters)
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const data = await response.json();
+        // העמוד הראשון מוצג מיד, שאר העמודים נטענים ומתווספים לטבלה
+        let data = await fetchPanelsPage(userFilters, null);
+        if (generation !== loadGeneration) return;
 
         if (howChange === "room") {
             updateFilterForm(data.filterData);
         }
         updatePanelsTable(data.panelsData);
         filterInput.value = "";
+        spinnerContainer.style.display = 'none';
+
+        while (data.nextCursor) {
+            data = await fetchPanelsPage(userFilters, data.nextCursor);
+            if (generation !== loadGeneration) return;
+            updatePanelsTable(data.panelsData, true);
+        }
         
     } catch (error) {
         handleError(error, 'שגיאה בטעינת הנתונים');
@@ -38,6 +37,23 @@ export async function loadData(howChange) {
     }
 }
 
+async function fetchPanelsPage(userFilters, cursor) {
+    const response = await fetch('get_panels', {
+        method: "POST",
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        },
+        body: JSON.stringify({ ...userFilters, cursor })
+    });
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return response.json();
+}
+
 function buildFilters(howChange) {
     let filterRoom = "";
     let filterRack = "";
@@ -69,11 +85,13 @@ function updateFilterForm(filterRackData) {
     }
 }
 
-function updatePanelsTable(panelsData) {
+function updatePanelsTable(panelsData, append = false) {
     const tableBody = document.getElementById("panels-table");
     if (!tableBody) return;
 
-    tableBody.innerHTML = "";
+    if (!append) {
+        tableBody.innerHTML = "";
+    }
 
     panelsData.forEach(panel => {
         const row = createTableRow(panel);
@@ -86,8 +86,18 @@ async function handlePullAllPanels() {
         }
 
         const data = await response.json();
+        if (data.status === "error") {
+            throw new Error(data.message);
+        }
+
+        // המשיכה רצה ברקע, מעקב אחרי ההתקדמות עד לסיומה
+        const job = await followPullProgress(button);
+        if (!job || job.status !== "completed") {
+            throw new Error(job && job.message ? job.message : 'שגיאה במשיכת המידע');
+        }
+
         setButtonSuccess(button, originalText, 'הנתונים עודכנו!');
-        showNotification(data.message, 'success');
+        showNotification(job.message, 'success');
     } catch (error) {
         setButtonError(button, originalText, 'שגיאה בעדכון');
         handleError(error, 'שגיאה בעדכון המידע');
@@ -96,6 +106,41 @@ async function handlePullAllPanels() {
     }
 }
 
+// Follow the pull job over Server-Sent Events, resolves with the final job state
+function followPullProgress(button) {
+    return new Promise((resolve, reject) => {
+        const source = new EventSource('pull-status/stream');
+        let lastJob = null;
+
+        source.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            lastJob = data.job;
+
+            if (data.isUpdating && lastJob) {
+                if (lastJob.phase === 'fetch' && lastJob.total) {
+                    const eta = lastJob.eta_seconds ? ` (${Math.ceil(lastJob.eta_seconds)} שנ')` : '';
+                    button.textContent = `מושך נתונים... ${lastJob.fetched}/${lastJob.total}${eta}`;
+                } else if (lastJob.phase === 'save') {
+                    button.textContent = 'שומר נתונים...';
+                }
+                return;
+            }
+
+            source.close();
+            resolve(lastJob);
+        };
+
+        source.onerror = () => {
+            source.close();
+            if (lastJob) {
+                resolve(lastJob);
+            } else {
+                reject(new Error('החיבור למעקב המשיכה נותק'));
+            }
+        };
+    });
+}
+
 // Initialize download button
 function initializeDownloadButton() {
     const downloadBtn = document.querySelector('.download-btn');
@@ -89,23 +89,14 @@ async function loadRooms() {
 // Function to load rooms without translation in case of error
 async function loadDefaultRooms() {
     try {
-        const response = await fetch('/panels/get_panels', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                filterRoom: '',
-                filterRack: '',
-                filterTextInput: ''
-            })
-        });
+        const response = await fetch('/panels/api/rooms');
 
         if (!response.ok) throw new Error('שגיאה בטעינת נתוני החדרים');
 
         const data = await response.json();
-        // Extract unique room names from panels data
-        const rooms = new Set(data.panelsData.map(panel => panel.room));
+        if (!Array.isArray(data)) throw new Error('התקבל מבנה נתונים לא תקין מהשרת');
+        // שמות החדרים המקוריים, ללא תרגום
+        const rooms = new Set(data.map(room => room.value || room));
 
         const roomSelect = document.getElementById('room-select');
         if (!roomSelect) return;
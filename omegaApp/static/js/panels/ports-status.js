@@ -53,24 +53,33 @@ export class PortsStatusManager {
         try {
             elements.spinnerContainer.style.display = 'flex';
             
-            const response = await fetch('get_panels', {
-                method: "POST",
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    filterRoom: "",
-                    filterRack: "",
-                    filterTextInput: ""
-                })
-            });
+            // get_panels מחזיר עמודים, טוענים את כולם לפי nextCursor
+            const panelsData = [];
+            let cursor = null;
+            do {
+                const response = await fetch('get_panels', {
+                    method: "POST",
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        filterRoom: "",
+                        filterRack: "",
+                        filterTextInput: "",
+                        cursor
+                    })
+                });
+
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
 
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
+                const data = await response.json();
+                panelsData.push(...data.panelsData);
+                cursor = data.nextCursor;
+            } while (cursor);
 
-            const data = await response.json();
-            this.updatePortsStatusList(data.panelsData);
+            this.updatePortsStatusList(panelsData);
             this.openModal();
 
         } catch (error) {
@@ -274,7 +274,8 @@ export class RouteFinder {
                 headers: {
                     'Content-Type': 'application/json'
                 },
-                body: JSON.stringify({ filterRoom: "", filterRack: "", filterTextInput: "" })
+                // רק רשימת המסדים נדרשת, לא הפאנלים עצמם
+                body: JSON.stringify({ filterRoom: "", filterRack: "", filterTextInput: "", pageSize: 1 })
             });
 
             if (!response.ok) {
@@ -282,7 +283,8 @@ export class RouteFinder {
             }
 
             const data = await response.json();
-            const racks = [...new Set(data.panelsData.map(panel => panel.rack))].sort();
+            // filterData מכיל את כל המסדים (DISTINCT), לא רק את אלו שבעמוד הראשון
+            const racks = data.filterData || [];
 
             [this.startRackSelect, this.endRackSelect].forEach(select => {
                 select.innerHTML = '<option value="">בחר מסד</option>';
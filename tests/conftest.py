@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+import threading
+from collections import deque
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeDCIM:
+    """
+    Local stand-in for the DCIM API, served by aiohttp from its own event loop thread.
+    Answers asset search and details, with an optional delay per request and
+    injected error statuses, and records the requests it got.
+    """
+
+    def __init__(self, assets: int = 50):
+        self.assets = {
+            f"A{index}": {"id": f"A{index}", "name": f"server-{index}", "serialNumber": f"SN{index}"}
+            for index in range(assets)
+        }
+        self.auth_headers = {"Authorization": "Bearer good"}
+        self.delay = 0.0
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._statuses = deque()
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self.base_url = None
+
+    def fail_next(self, *statuses: int):
+        """Answer the next requests with these statuses, in order"""
+        self._statuses.extend(statuses)
+
+    def reset(self):
+        self.delay = 0.0
+        self.calls = self.in_flight = self.max_in_flight = 0
+        self._statuses.clear()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if request.headers.get("Authorization") != self.auth_headers["Authorization"]:
+                return web.json_response({"error": "Unauthorized"}, status=401)
+            if self._statuses:
+                return web.json_response({"error": "Injected"}, status=self._statuses.popleft())
+
+            asset_id = request.match_info.get("asset_id")
+            if asset_id is None:
+                assets = list(self.assets.values())
+                serial = request.query.get("serial")
+                if serial:
+                    assets = [asset for asset in assets if asset["serialNumber"] == serial]
+                return web.json_response(assets[:int(request.query.get("returnItemsLimit", 100))])
+            if asset_id not in self.assets:
+                return web.json_response({"error": "Not found"}, status=404)
+            return web.json_response(self.assets[asset_id])
+        finally:
+            self.in_flight -= 1
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/api/assets/search", self._handle)
+        app.router.add_get("/api/assets/{asset_id}", self._handle)
+        app.router.add_patch("/api/assets/{asset_id}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}/api"
+
+    def start(self):
+        threading.Thread(target=self._loop.run_forever, name="fake-dcim", daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(10)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+@pytest.fixture(scope="session")
+def _fake_dcim_server():
+    server = FakeDCIM()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_dcim(_fake_dcim_server):
+    """A running FakeDCIM, reset for every test"""
+    _fake_dcim_server.reset()
+    return _fake_dcim_server
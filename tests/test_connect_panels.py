@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from omegaApp.modules.panel_networkX import (
+    ClassificationType,
+    DataCenterMap,
+    InterfaceType,
+    Location,
+    Panel,
+)
+
+SPINES = ["A01", "A02", "B07"]
+
+
+def legacy_spine_and_cabinet(rack: str):
+    """Rack name parsing of the original connect_panels"""
+    parts = rack.split("-")
+    if len(parts) == 2:
+        return parts[0], int(parts[1][1:])
+    return "", 0
+
+
+def legacy_edges(dc_map: DataCenterMap):
+    """
+    Edges of the original O(n²) connect_panels, every pair compared in
+    insertion order, as a set of (u, v, weight)
+    """
+    edges = set()
+    panel_list = list(dc_map.panels.values())
+    for i in range(len(panel_list)):
+        for j in range(i + 1, len(panel_list)):
+            panel1 = panel_list[i]
+            panel2 = panel_list[j]
+
+            if not panel1.is_available() or not panel2.is_available() or \
+               panel1.how_many_ports_remain < 1 or panel2.how_many_ports_remain < 1:
+                continue
+            if panel1.interface_type != panel2.interface_type:
+                continue
+            if panel1.classification != panel2.classification and panel1.classification is not None and panel2.classification is not None:
+                continue
+
+            spine1, cabinet1 = legacy_spine_and_cabinet(panel1.destination)
+            spine2, cabinet2 = legacy_spine_and_cabinet(panel2.location.rack)
+
+            connection_weight = float("inf")
+            if panel1.destination == panel2.location.get_rack_identifier():
+                connection_weight = 1
+            elif spine1 == spine2 and abs(cabinet1 - cabinet2) == 1:
+                connection_weight = 2
+            elif spine1 == spine2 and abs(cabinet1 - cabinet2) == 2:
+                connection_weight = 3
+            elif spine1 == spine2 and abs(cabinet1 - cabinet2) <= 4:
+                connection_weight = 3 + abs(cabinet1 - cabinet2)
+
+            if connection_weight != float("inf"):
+                edges.add((*sorted((panel1.id, panel2.id)), connection_weight))
+    return edges
+
+
+def graph_edges(dc_map: DataCenterMap):
+    return {(*sorted((u, v)), data["weight"]) for u, v, data in dc_map.graph.edges(data=True)}
+
+
+def random_rack(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.1:
+        return "LAB"  # Unparsable, spine "" cabinet 0
+    cabinet = rng.randint(1, 14)
+    # "A01-C5" and "A01-C05" are the same cabinet under different names (weight 3)
+    name = f"C{cabinet}" if roll < 0.25 else f"C{cabinet:02d}"
+    return f"{rng.choice(SPINES)}-{name}"
+
+
+def random_panels(seed: int, count: int):
+    rng = random.Random(seed)
+    panels = []
+    for index in range(count):
+        panels.append(Panel(
+            id=f"P{index}",
+            room="R1",
+            location=Location(random_rack(rng), str(rng.randint(1, 42))),
+            interface_type=rng.choice(list(InterfaceType)),
+            status=rng.random() > 0.1,
+            how_many_ports_remain=rng.choice([0, 1, 2, 5, 12]),
+            classification=rng.choice([None, ClassificationType.RED, ClassificationType.BLACK]),
+            destination=random_rack(rng),
+        ))
+    return panels
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_indexed_edges_match_pairwise(seed):
+    dc_map = DataCenterMap()
+    for panel in random_panels(seed, 400):
+        dc_map.add_panel(panel)
+    dc_map.connect_panels()
+
+    expected = legacy_edges(dc_map)
+    assert graph_edges(dc_map) == expected
+    # The generated set covers the unparsable ("", 0) and same cabinet cases
+    assert {1, 2}.issubset({weight for _, _, weight in expected})
+    same_cabinet = [
+        (u, v) for u, v, weight in expected
+        if weight == 3 and any(
+            legacy_spine_and_cabinet(dc_map.panels[a].destination)
+            == legacy_spine_and_cabinet(dc_map.panels[b].location.rack)
+            for a, b in ((u, v), (v, u))
+        )
+    ]
+    assert any(dc_map.panels[u].location.rack != "LAB" for u, _ in same_cabinet)
+    assert any("LAB" in (dc_map.panels[u].location.rack, dc_map.panels[v].location.rack) for u, v in same_cabinet)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_connect_panel_matches_full_build(seed):
+    panels = random_panels(seed, 300)
+
+    full = DataCenterMap()
+    for panel in panels:
+        full.add_panel(panel)
+    full.connect_panels()
+
+    incremental = DataCenterMap()
+    for panel in panels:
+        incremental.add_panel(panel)
+        incremental.connect_panel(panel.id)
+
+    assert graph_edges(incremental) == graph_edges(full)
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from omegaApp.modules.dcim_async_client import (
+    AsyncDCIMClient,
+    CircuitBreaker,
+    DCIMAuthError,
+    DCIMError,
+    DCIMUnavailable,
+    dcim_event_loop,
+)
+from omegaApp.modules.dcim_client import DCIMClient
+
+
+def run_client(fake_dcim, scenario, **kwargs):
+    """Run scenario(client) on a fresh AsyncDCIMClient in its own event loop"""
+    kwargs.setdefault("backoff_factor", 0)
+
+    async def main():
+        async with AsyncDCIMClient(fake_dcim.base_url, headers=fake_dcim.auth_headers, **kwargs) as client:
+            return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def test_details_fan_out_within_max_in_flight(fake_dcim):
+    fake_dcim.delay = 0.05
+    asset_ids = [f"A{index}" for index in range(40)]
+
+    assets = run_client(fake_dcim, lambda client: client.get_assets_details(asset_ids), max_in_flight=4)
+
+    assert [asset["id"] for asset in assets] == asset_ids
+    assert fake_dcim.calls == 40
+    assert fake_dcim.max_in_flight == 4
+
+
+@pytest.mark.parametrize("statuses", [(503,), (429,), (500, 429, 502)])
+def test_get_retried_on_server_errors_and_throttling(fake_dcim, statuses):
+    fake_dcim.fail_next(*statuses)
+
+    asset = run_client(fake_dcim, lambda client: client.request("GET", "assets/A1"), retries=3)
+
+    assert asset["id"] == "A1"
+    assert fake_dcim.calls == len(statuses) + 1
+
+
+def test_get_fails_after_its_retries(fake_dcim):
+    fake_dcim.fail_next(503, 503, 503)
+
+    with pytest.raises(DCIMError, match="503"):
+        run_client(fake_dcim, lambda client: client.request("GET", "assets/A1"), retries=2)
+    assert fake_dcim.calls == 3
+
+
+def test_patch_not_retried(fake_dcim):
+    fake_dcim.fail_next(503)
+
+    with pytest.raises(DCIMError, match="503"):
+        run_client(fake_dcim, lambda client: client.update_asset("A1", {"name": "x"}), retries=3)
+    assert fake_dcim.calls == 1
+
+
+def test_unauthorized_marks_auth_invalid(fake_dcim):
+    async def scenario(client):
+        client.set_auth({"Authorization": "Bearer expired"})
+        with pytest.raises(DCIMAuthError):
+            await client.request("GET", "assets/A1")
+        assert client.auth_valid is False
+        # Rejected locally until new headers are set
+        with pytest.raises(DCIMAuthError):
+            await client.request("GET", "assets/A1")
+        client.set_auth(fake_dcim.auth_headers)
+        return await client.request("GET", "assets/A1")
+
+    assert run_client(fake_dcim, scenario)["id"] == "A1"
+    assert fake_dcim.calls == 2
+
+
+def test_circuit_breaker_opens_then_half_opens_then_closes(fake_dcim):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+
+    async def scenario(client):
+        fake_dcim.fail_next(500, 500)
+        for _ in range(2):
+            with pytest.raises(DCIMError):
+                await client.request("GET", "assets/A1")
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # Open: fails fast without calling DCIM
+        with pytest.raises(DCIMUnavailable):
+            await client.request("GET", "assets/A1")
+        assert fake_dcim.calls == 2
+
+        await asyncio.sleep(0.25)
+        # Half open: a single trial request goes through, the others fail fast
+        fake_dcim.delay = 0.1
+        trial = asyncio.ensure_future(client.request("GET", "assets/A1"))
+        await asyncio.sleep(0.02)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(DCIMUnavailable):
+            await client.request("GET", "assets/A2")
+
+        # The trial succeeded, the circuit closes
+        assert (await trial)["id"] == "A1"
+        assert breaker.state == CircuitBreaker.CLOSED
+        return await client.request("GET", "assets/A2")
+
+    assert run_client(fake_dcim, scenario, retries=0, breaker=breaker)["id"] == "A2"
+    assert fake_dcim.calls == 4
+
+
+def test_circuit_breaker_reopens_when_trial_fails():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_sync_client_runs_on_shared_event_loop(fake_dcim):
+    client = DCIMClient(fake_dcim.base_url, max_in_flight=4)
+    client.set_auth(fake_dcim.auth_headers)
+    fake_dcim.delay = 0.05
+    try:
+        assert client.get_asset_details("A3")["id"] == "A3"
+        session = client.client._session
+        # The session lives on the shared loop and is reused by the next calls
+        assert session._loop is dcim_event_loop._loop
+
+        assert client.search_asset({"serial": "SN7"})["id"] == "A7"
+        assets = client.get_all_assets(limit=20, include_details=True)
+        assert [asset["id"] for asset in assets] == [f"A{index}" for index in range(20)]
+        assert client.client._session is session
+        assert fake_dcim.max_in_flight == 4
+
+        results = sorted(client.bulk_search([{"serial": f"SN{index}"} for index in range(10)]))
+        assert [(index, asset["id"], error) for index, asset, error, _ in results] == [
+            (index, f"A{index}", None) for index in range(10)
+        ]
+    finally:
+        client.close()
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from omegaApp.migrations import MIGRATIONS
+from omegaApp.modules.panel_graph_cache import partition_filter
+from omegaApp.modules.panel_query import panel_filter, page_query
+from omegaApp.modules.panel_sync import TOMBSTONE_PANEL
+
+# The panels table before the delta sync and typed columns migrations
+LEGACY_PANELS = """
+    CREATE TABLE panels (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dcim_id TEXT,
+        room TEXT,
+        name TEXT,
+        rack TEXT,
+        u TEXT,
+        interface TEXT,
+        size TEXT,
+        destination TEXT,
+        status TEXT,
+        how_many_ports_remain TEXT,
+        classification TEXT,
+        date_created TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        date_updated TIMESTAMP
+    )
+"""
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "panels.sqlite"))
+    db.row_factory = sqlite3.Row
+    db.execute(LEGACY_PANELS)
+    db.executemany(
+        "INSERT INTO panels (dcim_id, room, rack, interface, status, how_many_ports_remain, classification)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (f"D{i}", f"ROOM{i % 5}", f"A0{i % 9}-C0{i % 7}", ["MM-LC", "SM", "RJ"][i % 3],
+             ["True", "False"][i % 2], "12", ["red", "black", ""][i % 3])
+            for i in range(300)
+        ],
+    )
+    for migration in MIGRATIONS:
+        migration.migrate(db)
+    db.commit()
+    yield db
+    db.close()
+
+
+def query_plan(db, query, params):
+    return [row["detail"] for row in db.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def assert_uses_index(plan, index):
+    assert any(f"USING INDEX {index}" in step for step in plan), plan
+    assert not any(step.startswith("SCAN panels") for step in plan), plan
+
+
+def test_migration_backfills_typed_columns(db):
+    row = db.execute("SELECT is_active, ports_free FROM panels WHERE dcim_id = 'D0'").fetchone()
+    assert (row["is_active"], row["ports_free"]) == (1, 12)
+
+
+@pytest.mark.parametrize("body, index", [
+    ({"filterRoom": "ROOM1"}, "idx_panels_room_rack"),
+    ({"filterRoom": "ROOM1", "filterRack": "A01-C01"}, "idx_panels_room_rack"),
+    ({"filterRack": "A01-C01"}, "idx_panels_rack"),
+])
+def test_panel_filters_use_partial_indexes(db, body, index):
+    where, params, _ = panel_filter(body)
+    query, params = page_query(where, params, 50)
+    assert_uses_index(query_plan(db, query, params), index)
+
+
+@pytest.mark.parametrize("key", [("MM", ""), ("SM", "red"), ("RJ", "red+black")])
+def test_route_partitions_use_nocase_index(db, key):
+    where, params = partition_filter(key)
+    plan = query_plan(db, f"SELECT * FROM panels {where} ORDER BY id", params)
+    assert_uses_index(plan, "idx_panels_route")
+    # The interface LIKE prefix is answered with a range on the NOCASE column
+    assert any("interface>? AND interface<?" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM panels WHERE dcim_id = ?",
+    TOMBSTONE_PANEL,
+])
+def test_dcim_id_lookups_use_unique_index(db, query):
+    assert_uses_index(query_plan(db, query, ("D1",)), "idx_panels_dcim_id")
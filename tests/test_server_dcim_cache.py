@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from omegaApp.modules.server_dcim_cache import PENDING_STATUS, DCIMMatchCache
+from omegaApp.modules.server_inventory import ServerRecord
+
+
+class BlockingAnalyzer:
+    """Analyses wait until released, so servers can change while they run"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def analyze_server(self, server):
+        self.started.release()
+        self.release.wait(5)
+        return {"status": "found_match", "dcim_data": None}
+
+
+def record(mgmt_ip: str, hostname: str) -> ServerRecord:
+    return ServerRecord({"HostName": hostname}, {"mgmt_ip": mgmt_ip, "hostname": hostname})
+
+
+def wait_idle(cache: DCIMMatchCache):
+    deadline = time.monotonic() + 5
+    while cache.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def cache():
+    return DCIMMatchCache(max_workers=2)
+
+
+def test_result_of_removed_server_is_dropped(cache):
+    analyzer, app = BlockingAnalyzer(), Flask(__name__)
+    server = record("10.0.0.1", "a")
+    cache.servers_changed([], {"10.0.0.1": server})
+
+    assert cache.get("10.0.0.1", server, analyzer, app)["dcim_status"] == PENDING_STATUS
+    assert analyzer.started.acquire(timeout=5)
+    cache.servers_changed(["10.0.0.1"], {})
+    analyzer.release.set()
+    wait_idle(cache)
+
+    assert cache.stats()["servers"] == 0
+    assert cache.servers_with_status("found_match") == set()
+    assert cache.status("10.0.0.1") == PENDING_STATUS
+
+
+def test_result_of_outdated_version_is_dropped(cache):
+    analyzer, app = BlockingAnalyzer(), Flask(__name__)
+    old, new = record("10.0.0.1", "a"), record("10.0.0.1", "b")
+    cache.servers_changed([], {"10.0.0.1": old})
+
+    cache.get("10.0.0.1", old, analyzer, app)
+    assert analyzer.started.acquire(timeout=5)
+    cache.servers_changed([], {"10.0.0.1": new})
+    analyzer.release.set()
+    wait_idle(cache)
+    assert cache.status("10.0.0.1") == PENDING_STATUS
+
+    # The current version is analyzed and kept
+    cache.get("10.0.0.1", new, analyzer, app)
+    wait_idle(cache)
+    assert cache.status("10.0.0.1") == "found_match"
+    assert cache.servers_with_status("found_match") == {"10.0.0.1"}
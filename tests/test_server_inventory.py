@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+
+from omegaApp.modules.server_dashboard import parse_server_file
+from omegaApp.modules.server_inventory import iter_json_object, read_json_item
+
+INVENTORY = {
+    "k0": {"Network": "10.0.0.0", "HostName": "a0", "BiosFirmware": "U30 v2.54", "Power": {"Max": 412.5}},
+    "k1": {"HostName": "a1", "Tags": [1, 2.25, None, True], "Name": "שרת"},
+    "k2": {"Network": "10.0.0.2", "ILOFIRMWARE": "2.19", "Empty": {}},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 16])
+def test_items_are_read_back_from_their_offsets(chunk_size):
+    text = json.dumps(INVENTORY, indent=2, ensure_ascii=False)
+    items = list(iter_json_object(io.StringIO(text), chunk_size))
+
+    assert [(key, value) for _, key, value in items] == list(INVENTORY.items())
+    for offset, key, value in items:
+        assert read_json_item(io.StringIO(text), offset, chunk_size) == (key, value)
+
+
+def test_records_keep_only_the_read_fields(tmp_path):
+    path = tmp_path / "inventory.json"
+    path.write_text(json.dumps(INVENTORY, ensure_ascii=False), encoding="utf-8")
+    servers = parse_server_file(path)
+
+    assert sorted(servers) == ["10.0.0.0", "10.0.0.2", "k1"]
+    server = servers["10.0.0.0"]
+    assert sorted(server.to_dict()) == ["BiosFirmware", "hostname", "last_updated", "mgmt_ip", "power"]
+    assert server.to_dict()["BiosFirmware"] == "U30 v2.54"
+    assert servers["10.0.0.2"].get("ILOFIRMWARE") == "2.19"
+    assert "Power" not in server
+
+    # The original data is read from the file, as it is there
+    for key, server in zip(INVENTORY, servers.values()):
+        assert server.to_dict(include_raw=True)["raw_data"] == INVENTORY[key]
+
+
+def test_raw_data_of_a_changed_file_is_none(tmp_path):
+    path = tmp_path / "inventory.json"
+    path.write_text(json.dumps(INVENTORY), encoding="utf-8")
+    servers = parse_server_file(path)
+
+    path.write_text(json.dumps({**INVENTORY, "k0": {**INVENTORY["k0"], "HostName": "b0"}}), encoding="utf-8")
+    assert servers["10.0.0.0"].raw_data() is None
+    assert servers["10.0.0.2"].raw_data() == INVENTORY["k2"]
+
+    path.unlink()
+    assert servers["10.0.0.2"].raw_data() is None
@@ -0,0 +1,135 @@
+import json
+import random
+
+import pytest
+
+from omegaApp.modules.server_dashboard import ServerDataManager
+from omegaApp.modules.server_index import (
+    BULK_UPDATE_SIZE, RANGE_FIELDS, SORT_FIELDS, SORTED_FIELDS, TEXT_FIELDS, VALUE_FIELDS,
+)
+
+VENDORS = ["HPE", "Dell", "Lenovo"]
+
+
+def make_server(index: int, rng: random.Random) -> dict:
+    server = {
+        "Network": f"10.{index >> 8 & 255}.{index & 255}.{rng.randint(0, 9)}",
+        "HostName": f"Host-{rng.randint(0, 300)}",
+    }
+    # Fields are left out at random, those servers sort last
+    if rng.random() < 0.9:
+        server["Vendor"] = rng.choice(VENDORS)
+    if rng.random() < 0.9:
+        server["Serial"] = f"SN{rng.randint(0, 99999):05d}"
+    if rng.random() < 0.8:
+        server["TotalSystemMemoryGiB"] = rng.choice([128, 256, 512])
+    if rng.random() < 0.5:
+        server["BiosFirmware"] = rng.choice(["U30", "U32"])
+    if rng.random() < 0.8:
+        server["Location"] = {
+            "DataCenter": "dc1", "Room": f"r{rng.randint(0, 4)}", "Rack": f"a{rng.randint(0, 40):02d}",
+        }
+    return server
+
+
+def write(path, servers: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(servers, f)
+
+
+def expected_page(manager, values, ranges, text, sort):
+    """The servers query() should return, filtered and sorted one by one"""
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    read = {**VALUE_FIELDS, **RANGE_FIELDS, **SORTED_FIELDS}
+
+    def value(ip):
+        if field == "mgmt_ip":
+            return ip
+        found = read[field](manager.servers_data[ip])
+        if found is None or found == "":
+            return None
+        return float(found) if field in RANGE_FIELDS else str(found)
+
+    def matches(ip):
+        server = manager.servers_data[ip]
+        for name, wanted in values.items():
+            if str(VALUE_FIELDS[name](server)) not in wanted:
+                return False
+        for name, (low, high) in ranges.items():
+            number = RANGE_FIELDS[name](server)
+            if number is None or (low is not None and number < low) or (high is not None and number > high):
+                return False
+        searched = (str(field_value(server) or "").lower() for field_value in TEXT_FIELDS.values())
+        return not text or any(text.lower() in value for value in searched)
+
+    ips = sorted(ip for ip in manager.servers_data if matches(ip))
+    keyed = sorted((ip for ip in ips if value(ip) is not None), key=value, reverse=descending)
+    return keyed + [ip for ip in ips if value(ip) is None]
+
+
+def check_random_queries(manager, rng: random.Random, count: int = 150):
+    for _ in range(count):
+        values, ranges = {}, {}
+        if rng.random() < 0.5:
+            values["vendor"] = rng.sample(VENDORS, rng.randint(1, 2))
+        if rng.random() < 0.3:
+            values["room"] = [f"r{rng.randint(0, 4)}"]
+        if rng.random() < 0.2:
+            values["firmware"] = ["U32"]
+        if rng.random() < 0.3:
+            ranges["memory"] = rng.choice([(200, None), (None, 256), (256, 256)])
+        text = rng.choice([None, None, "host-1", "HOST-2", "sn0", "10.1.", "nothing"])
+        sort = rng.choice(["", "-"]) + rng.choice(SORT_FIELDS)
+        expected = expected_page(manager, values, ranges, text, sort)
+
+        page_size = rng.choice([1, 7, 50, 400])
+        page = rng.randint(1, len(expected) // page_size + 2)
+        result = manager.query(
+            values=values, ranges=ranges, text=text, sort=sort, page=page, page_size=page_size,
+            fields=["mgmt_ip"], facets=["vendor"],
+        )
+
+        query = (values, ranges, text, sort, page, page_size)
+        start = (page - 1) * page_size
+        assert [server["mgmt_ip"] for server in result["data"]] == expected[start:start + page_size], query
+        assert result["total"] == len(expected), query
+        vendors = [VALUE_FIELDS["vendor"](manager.servers_data[ip]) for ip in expected]
+        assert sum(result["facets"]["vendor"].values()) == len([vendor for vendor in vendors if vendor]), query
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    rng = random.Random(1)
+    write(tmp_path / "a.json", {f"k{index}": make_server(index, rng) for index in range(BULK_UPDATE_SIZE + 200)})
+    write(tmp_path / "b.json", {f"k{index}": make_server(index, rng) for index in range(2000, 2100)})
+    return tmp_path
+
+
+@pytest.fixture
+def manager(data_dir):
+    manager = ServerDataManager(str(data_dir))
+    manager.observer.stop()
+    manager.observer.join()
+    return manager
+
+
+def test_random_queries_match_a_full_scan(manager):
+    check_random_queries(manager, random.Random(2))
+
+
+@pytest.mark.parametrize("file_name, changed", [("b.json", 40), ("a.json", BULK_UPDATE_SIZE + 100)])
+def test_random_queries_after_updates(manager, data_dir, file_name, changed):
+    """A few changed servers are edited into the sorted lists, more than BULK_UPDATE_SIZE rebuild them"""
+    rng = random.Random(3)
+    path = data_dir / file_name
+    servers = json.loads(path.read_text(encoding="utf-8"))
+    for key in list(servers)[:changed]:
+        if rng.random() < 0.3:
+            del servers[key]
+        else:
+            servers[key] = make_server(rng.randint(0, 4000), rng)
+    write(path, servers)
+    assert manager.load_server_data(path)
+
+    check_random_queries(manager, rng)
@@ -0,0 +1,132 @@
+import json
+import time
+
+import pytest
+
+from omegaApp.modules import server_dashboard
+from omegaApp.modules.server_dashboard import ServerDataManager
+
+
+def server(ip: str, hostname: str) -> dict:
+    return {"Network": ip, "HostName": hostname, "Vendor": "HPE"}
+
+
+def write(path, servers):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({f"k{index}": data for index, data in enumerate(servers)}, f)
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    write(tmp_path / "a.json", [server(f"10.0.0.{i}", f"a{i}") for i in range(3)])
+    write(tmp_path / "b.json", [server("10.0.1.1", "b1")])
+    return tmp_path
+
+
+@pytest.fixture
+def manager(data_dir, monkeypatch):
+    monkeypatch.setattr(server_dashboard, "RELOAD_DEBOUNCE_SECONDS", 0.05)
+    manager = ServerDataManager(str(data_dir))
+    # Reloads are driven by the tests, not by the file events
+    manager.observer.stop()
+    manager.observer.join()
+    return manager
+
+
+def reload(manager, path):
+    manager._reload_file(str(path.absolute()), time.monotonic())
+
+
+def server_changes(manager, before):
+    """(added, updated, removed) servers since the before reload_stats()"""
+    stats = manager.reload_stats()
+    return tuple(stats[f"servers_{kind}"] - before[f"servers_{kind}"] for kind in ("added", "updated", "removed"))
+
+
+def test_initial_load(manager):
+    assert sorted(manager.servers_data) == ["10.0.0.0", "10.0.0.1", "10.0.0.2", "10.0.1.1"]
+    assert manager.load_status()["files_loaded"] == 2
+
+
+def test_same_content_is_unchanged(manager, data_dir):
+    before = manager.servers_data
+    write(data_dir / "a.json", [server(f"10.0.0.{i}", f"a{i}") for i in range(3)])
+    reload(manager, data_dir / "a.json")
+
+    stats = manager.reload_stats()
+    assert (stats["unchanged"], stats["reloads"]) == (1, 0)
+    assert manager.servers_data is before
+
+
+def test_one_changed_server_is_one_update(manager, data_dir):
+    before, stats_before = manager.servers_data, manager.reload_stats()
+    unchanged = before["10.0.0.0"]
+    write(data_dir / "a.json", [server("10.0.0.0", "a0"), server("10.0.0.1", "renamed"), server("10.0.0.2", "a2")])
+    reload(manager, data_dir / "a.json")
+
+    assert manager.reload_stats()["reloads"] == 1
+    assert server_changes(manager, stats_before) == (0, 1, 0)
+    # Copy on write: the previous snapshot is untouched, unchanged servers are kept
+    assert manager.servers_data is not before
+    assert before["10.0.0.1"].hostname == "a1"
+    assert manager.servers_data["10.0.0.1"].hostname == "renamed"
+    assert manager.servers_data["10.0.0.0"] is unchanged
+
+
+def test_deleted_file_removes_its_servers(manager, data_dir):
+    stats_before = manager.reload_stats()
+    (data_dir / "a.json").unlink()
+    reload(manager, data_dir / "a.json")
+
+    assert manager.reload_stats()["files_removed"] == 1
+    assert server_changes(manager, stats_before) == (0, 0, 3)
+    assert sorted(manager.servers_data) == ["10.0.1.1"]
+    assert manager.query(values={"vendor": ["HPE"]})["total"] == 1
+
+
+def test_server_moved_between_files(manager, data_dir):
+    stats_before = manager.reload_stats()
+    write(data_dir / "b.json", [server("10.0.1.1", "b1"), server("10.0.0.2", "moved")])
+    reload(manager, data_dir / "b.json")
+    write(data_dir / "a.json", [server("10.0.0.0", "a0"), server("10.0.0.1", "a1")])
+    reload(manager, data_dir / "a.json")
+
+    # Taken over by b.json, then not removed with a.json's copy
+    assert server_changes(manager, stats_before) == (0, 1, 0)
+    assert manager.servers_data["10.0.0.2"].hostname == "moved"
+    assert len(manager.servers_data) == 4
+
+
+def test_events_are_debounced(manager, data_dir):
+    write(data_dir / "a.json", [server("10.0.0.0", "x")])
+    for _ in range(5):
+        manager.schedule_reload(str(data_dir / "a.json"))
+
+    wait_for(lambda: manager.reload_stats()["reloads"] == 1)
+    time.sleep(0.2)
+    stats = manager.reload_stats()
+    assert (stats["events"], stats["reloads"], stats["pending"]) == (5, 1, 0)
+    assert sorted(manager.servers_data) == ["10.0.0.0", "10.0.1.1"]
+
+
+def test_half_written_file_is_retried(manager, data_dir):
+    path = data_dir / "a.json"
+    path.write_text('{"k0": {"Network": "10.0.0.9", "HostN')
+    reload(manager, path)
+
+    stats = manager.reload_stats()
+    assert (stats["failed"], stats["pending"]) == (1, 1)
+    assert manager.servers_data["10.0.0.0"].hostname == "a0"
+
+    # The writer finishes before the retry runs
+    write(path, [server("10.0.0.9", "complete")])
+    wait_for(lambda: manager.reload_stats()["reloads"] == 1)
+    assert sorted(manager.servers_data) == ["10.0.0.9", "10.0.1.1"]
+    assert manager.servers_data["10.0.0.9"].hostname == "complete"